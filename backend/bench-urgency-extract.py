@@ -0,0 +1,162 @@
+"""
+Benchmark and parity check for the urgency-section extractor.
+
+Compares the heading-anchored extractor (htmlextract.extract_bills_from_urgency_section)
+with the regex version it replaced (extract_bills_from_urgency_section_regex)
+and with the per-markup parsers (markupversions.extract_urgency_bills, no
+version hint) on:
+    - real daily-progress pages from the HTTP cache (httpcache.sqlite3) and the
+      network archive (netarchive.sqlite3), if they exist,
+    - synthetic pages from fakeparliament.py in both markups, bare and
+      wrapped in site chrome (navigation menus, footer) the size of a real
+      parliament.nz page,
+    - variants of those with upper-case headings (<h3>URGENCY</h3>) and with
+      attributes on every heading (<h3 class="x">); the regex never matched
+      the latter, so they are checked against the regex's result for the
+      unmodified page,
+    - stress pages: a very large page, and an Urgency heading with no
+      Government business heading after it.
+
+Prints any page where either extractor disagrees with the regex, then the
+time per page for each.
+
+Usage: python bench-urgency-extract.py
+"""
+import os
+import sqlite3
+import time
+import zlib
+
+from fakeparliament import FakeSite
+from htmlextract import (
+    extract_bills_from_urgency_section,
+    extract_bills_from_urgency_section_regex,
+)
+from httpcache import CACHE_PATH
+from markupversions import extract_urgency_bills
+from netarchive import ARCHIVE_PATH
+
+REPEAT = 5
+SYNTHETIC_PAGES = 400
+
+
+def real_pages() -> list[tuple[str, str]]:
+    pages = []
+    sources = [
+        (CACHE_PATH, "SELECT url, body FROM responses WHERE url LIKE '%daily-progress-for-%'"),
+        (ARCHIVE_PATH, "SELECT url, body FROM exchanges WHERE url LIKE '%daily-progress-for-%'"),
+    ]
+    for path, query in sources:
+        if not os.path.exists(path):
+            continue
+        conn = sqlite3.connect(path)
+        try:
+            for url, body in conn.execute(query):
+                pages.append((url, zlib.decompress(body).decode("utf-8", "replace")))
+        except sqlite3.Error as e:
+            print(f"Skipping {path}: {e}")
+        conn.close()
+    return pages
+
+
+def synthetic_pages() -> list[tuple[str, str]]:
+    site = FakeSite()
+    # Urgent days first so both markups are well represented
+    days = sorted(site.days, key=lambda d: d not in site.urgent_days)[:SYNTHETIC_PAGES]
+    return [
+        (f"fake:{d}", site.daily_progress_page(d, "https://bills.parliament.nz"))
+        for d in days
+    ]
+
+
+def with_chrome(html: str) -> str:
+    """Add a real-page-sized header menu and footer around the content."""
+    menu = "".join(
+        f'<li class="nav__item"><a class="nav__link" href="/en/section-{i}/">Section {i}</a>'
+        f'<div class="nav__sub"><span>More about section {i}</span></div></li>'
+        for i in range(400)
+    )
+    header = f'<header class="site-header"><nav><ul class="nav">{menu}</ul></nav></header>'
+    footer = f'<footer class="site-footer"><ul>{menu}</ul></footer>'
+    return html.replace("<body>", "<body>" + header, 1).replace("</body>", footer + "</body>", 1)
+
+
+def upper_case(html: str) -> str:
+    return html.replace(">Urgency<", ">URGENCY<").replace("Government business", "GOVERNMENT BUSINESS")
+
+
+def with_attributes(html: str) -> str:
+    return html.replace("<h3>", '<h3 class="x">')
+
+
+def stress_pages(sample: str) -> list[tuple[str, str]]:
+    filler = "<h3>Oral questions</h3>" + "<p>Question to Minister answered.</p>" * 20
+    head, _, tail = sample.partition("<main>")
+    big = head + "<main>" + filler * 2000 + tail + filler * 2000
+    no_end = sample.replace("Government business", "Members' business")
+    return [("stress:large", big), ("stress:no-end", no_end + filler * 2000)]
+
+
+def versioned(html: str):
+    return extract_urgency_bills(html)[0]
+
+
+def time_per_page(fn, pages) -> float:
+    # A new copy of each page per call, so htmlextract.find_urgency_heading()
+    # cannot answer from the previous call on the same page
+    copies = [[(" " + html)[1:] for _, html in pages] for _ in range(REPEAT)]
+    t0 = time.perf_counter()
+    for batch in copies:
+        for html in batch:
+            fn(html)
+    return (time.perf_counter() - t0) / (REPEAT * len(pages))
+
+
+def report(name: str, pages, reference=None):
+    """
+    `reference` maps a page's url to the html the regex is run on for the
+    expected result (default: the page itself).
+    """
+    if not pages:
+        print(f"{name}: no pages")
+        return
+    reference = reference or {}
+    mismatches = 0
+    for url, html in pages:
+        old = extract_bills_from_urgency_section_regex(reference.get(url, html))
+        for label, fn in (("new", extract_bills_from_urgency_section), ("versioned", versioned)):
+            new = fn(html)
+            if new != old:
+                mismatches += 1
+                print(f"  MISMATCH {url}\n    {label}: {new}\n    regex: {old}")
+
+    regex_s = time_per_page(extract_bills_from_urgency_section_regex, pages)
+    new_s = time_per_page(extract_bills_from_urgency_section, pages)
+    versioned_s = time_per_page(versioned, pages)
+    size = sum(len(html) for _, html in pages) / len(pages)
+    print(
+        f"{name}: {len(pages)} pages (avg {size / 1024:.0f} KiB), {mismatches} mismatches; "
+        f"ms/page: regex {regex_s * 1000:.3f}, new {new_s * 1000:.3f} "
+        f"({regex_s / new_s:.2f}x), versioned {versioned_s * 1000:.3f} "
+        f"({regex_s / versioned_s:.2f}x)"
+    )
+
+
+def main():
+    synthetic = synthetic_pages()
+    report("real", real_pages())
+    report("synthetic", synthetic)
+    chrome = [(url, with_chrome(html)) for url, html in synthetic]
+    report("synthetic+chrome", chrome)
+    report("upper-case", [(url, upper_case(html)) for url, html in chrome])
+    report(
+        "attributes",
+        [(url, with_attributes(html)) for url, html in chrome],
+        reference=dict(chrome),
+    )
+    for url, html in stress_pages(synthetic[0][1]):
+        report(url, [(url, html)])
+
+
+if __name__ == "__main__":
+    main()
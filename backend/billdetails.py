@@ -1,8 +1,11 @@
 import asyncio
-import sqlite3
 from datetime import datetime
 
-from playwright.async_api import async_playwright
+from htmlextract import bill_details
+from httpfetch import open_fetcher
+from jsextractors import USE_JS, bill_details_js
+from navprofile import READY_BILL
+from schema import connect
 
 DB_PATH = "urgency.sqlite3"
 
@@ -12,7 +15,7 @@ def ensure_bills_columns():
     Make sure the `bills` table has `mps` and `desc` columns.
     Safe to run multiple times.
     """
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect(DB_PATH)
     cursor = conn.cursor()
 
     cursor.execute("PRAGMA table_info(bills)")
@@ -31,7 +34,7 @@ def get_bills_needing_details():
     """
     Return list of (id, url) for bills where mps or desc is NULL.
     """
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect(DB_PATH)
     cursor = conn.cursor()
     cursor.execute("SELECT id, url FROM bills WHERE mps IS NULL OR desc IS NULL")
     rows = cursor.fetchall()
@@ -39,79 +42,20 @@ def get_bills_needing_details():
     return rows
 
 
-async def scrape_details_for_bill(page, url: str):
+async def scrape_details_for_bill(fetcher, url: str):
     """
-    Given a Playwright page and a bill URL, return (mps, desc) or (None, None)
-    if they cannot be found.
+    Fetch a bill page through the shared fetcher/cache and return (mps, desc)
+    or (None, None) if they cannot be found. The page is parsed in Python
+    (htmlextract.bill_details), so no browser page is needed, unless
+    NZPT_JS_EXTRACTORS=1 (jsextractors.py).
     """
-    await page.goto(url, wait_until="networkidle")
-
-    #Member(s) in charge: first name in the table cell
-    mps = await page.evaluate(
-        """
-        () => {
-          const ths = Array.from(document.querySelectorAll('th'));
-          const th = ths.find(t => t.textContent.trim().startsWith('Member(s) in charge:'));
-          if (!th) return null;
-          const td = th.nextElementSibling;
-          if (!td) return null;
-          const raw = td.textContent.trim();
-          if (!raw) return null;
-
-          // If there are multiple MPs, return only the first
-          let first = raw.split(',')[0];
-          if (first.includes(' and ')) {
-            first = first.split(' and ')[0];
-          }
-          first = first.trim();
-          return first || null;
-        }
-        """
-    )
-
-    # Description: text immediately following the generic paragraph
-    desc = await page.evaluate(
-        """
-        () => {
-          const genericText =
-            'Bills are proposals to make a new law or to change an existing one. ' +
-            'Only Parliament can pass a bill. Each bill goes through several stages, ' +
-            'giving MPs and the public the chance to have their say.';
-
-          const ps = Array.from(document.querySelectorAll('p'));
-          const generic = ps.find(p => p.textContent.trim().startsWith('Bills are proposals to make a new law'));
-          if (!generic) return null;
-
-          // Look at subsequent siblings for the specific bill description
-          let node = generic.nextSibling;
-          while (node) {
-            if (node.nodeType === Node.TEXT_NODE) {
-              const text = node.textContent.trim();
-              if (text && text !== genericText) {
-                return text;
-              }
-            } else if (node.nodeType === Node.ELEMENT_NODE) {
-              const text = node.textContent.trim();
-              if (text && text !== genericText) {
-                return text;
-              }
-            }
-            node = node.nextSibling;
-          }
-
-          return null;
-        }
-        """
-    )
-
-    # Normalise whitespace a bit
-    if isinstance(desc, str):
-        desc = " ".join(desc.split())
-
-    return mps, desc
-
-
-async def scrape_all_bill_details():
+    html = await fetcher.get_text(url, READY_BILL)
+    if USE_JS:
+        return await bill_details_js(fetcher, url, html)
+    return bill_details(html)
+
+
+async def scrape_all_bill_details(fetcher=None):
     ensure_bills_columns()
     bills = get_bills_needing_details()
 
@@ -123,24 +67,19 @@ async def scrape_all_bill_details():
 
     updates = []  # (mps, desc, id)
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
-
+    async with open_fetcher(fetcher, db_path=DB_PATH) as fetcher:
         for bill_id, url in bills:
             print(f"Scraping details for bill {bill_id} -> {url}")
             try:
-                mps, desc = await scrape_details_for_bill(page, url)
+                mps, desc = await scrape_details_for_bill(fetcher, url)
                 print(f"  MP in charge: {mps!r}, desc present: {bool(desc)}")
                 updates.append((mps, desc, bill_id))
             except Exception as e:
                 print(f"  Error scraping {url}: {e}")
 
-        await browser.close()
-
     # Write to SQLite
     if updates:
-        conn = sqlite3.connect(DB_PATH)
+        conn = connect(DB_PATH)
         cursor = conn.cursor()
         cursor.executemany(
             "UPDATE bills SET mps = ?, desc = ? WHERE id = ?",
@@ -1,44 +1,24 @@
 import asyncio
-import sqlite3
-from datetime import datetime, date
-import re
+from datetime import datetime
 
-from playwright.async_api import async_playwright
+from fetchpool import CONCURRENCY
+from httpfetch import open_fetcher
+from pagepipeline import processed_urls, run_pipeline
+from schema import connect, init_bills_table, init_tables
+from siteconfig import build_daily_progress_url
 
 DB_PATH = "urgency.sqlite3"
-BASE_URL = "https://www3.parliament.nz"
 
 # Example target:
 # https://www3.parliament.nz/en/pb/daily-progress-in-the-house/daily-progress-for-tuesday-9-december-2025
 
 
-def init_bills_table():
-    """
-    Ensure the `bills` table exists and `url` is unique.
-    """
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS bills (
-            id INTEGER PRIMARY KEY,
-            bill_name TEXT,
-            url TEXT
-        )
-    """)
-    # Enforce URL uniqueness, even if the table already existed
-    cursor.execute("""
-        CREATE UNIQUE INDEX IF NOT EXISTS idx_bills_url ON bills(url)
-    """)
-    conn.commit()
-    conn.close()
-
-
 def get_urgent_dates():
     """
     Read all dates from `urgency` where in_urgency = 1.
     Returns a set of datetime.date objects.
     """
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect(DB_PATH)
     cursor = conn.cursor()
     cursor.execute("SELECT date FROM urgency WHERE in_urgency = 1")
     rows = cursor.fetchall()
@@ -55,72 +35,7 @@ def get_urgent_dates():
     return urgent_dates
 
 
-def build_daily_progress_url(d: date) -> str:
-    """
-    Build the daily progress URL from a date, e.g.:
-
-    date(2025, 12, 9) ->
-      https://www3.parliament.nz/en/pb/daily-progress-in-the-house/
-      daily-progress-for-tuesday-9-december-2025
-    """
-    weekday = d.strftime("%A").lower()      # 'tuesday'
-    day = str(d.day)                        # '9' (no leading zero)
-    month = d.strftime("%B").lower()        # 'december'
-    year = d.year                           # 2025
-
-    slug = f"daily-progress-for-{weekday}-{day}-{month}-{year}"
-    return f"{BASE_URL}/en/pb/daily-progress-in-the-house/{slug}"
-
-
-def extract_bills_from_urgency_section(html_content: str):
-    """
-    Extract bill names and URLs from the urgency section.
-    Returns a list of (bill_name, url) tuples.
-
-    Handles two formats for the Urgency heading:
-      Old: <h3>Urgency</h3>
-      New: <h3><span>Urgency</span></h3>
-
-    Looks between that heading and the next Government business header:
-      <h3>Government business—<em>continued</em></h3>
-    (matched loosely to be robust to markup/dash variations).
-
-    Handles two formats for bill list items:
-      Old: <li>anytext<a rel="noopener" href="billurl" target="_blank">Bill Name</a>anytext</li>
-      New: <li><span>anytext<a href="billurl">Bill Name</a>anytext</span></li>
-    """
-    bills = []
-
-    # Match <h3>Urgency</h3> or <h3><span>Urgency</span></h3>
-    urgency_pattern = (
-        r"<h3>\s*(?:<span>\s*)?Urgency\s*(?:</span>\s*)?</h3>(.*?)"
-        r"<h3>\s*(?:<span>\s*)?[^<]*Government business.*?</h3>"
-    )
-    m = re.search(urgency_pattern, html_content, re.DOTALL | re.IGNORECASE)
-    if not m:
-        return bills
-
-    urgency_section = m.group(1)
-
-    # Find all <a href="..."> ... </a> links in this section
-    link_pattern = r'<a[^>]+href="([^"]+)"[^>]*>(.*?)</a>'
-    links = re.findall(link_pattern, urgency_section, re.DOTALL | re.IGNORECASE)
-
-    for url, raw_text in links:
-        url = url.strip()
-
-        # Strip any inner HTML from the anchor text, keep plain text
-        text_no_tags = re.sub(r"<.*?>", "", raw_text, flags=re.DOTALL)
-        bill_name = " ".join(text_no_tags.split()).strip()
-
-        if not bill_name or not url:
-            continue
-        bills.append((bill_name, url))
-
-    return bills
-
-
-async def scrape_bills_for_urgent_sittings():
+async def scrape_bills_for_urgent_sittings(concurrency: int = CONCURRENCY, fetcher=None):
     urgent_dates = get_urgent_dates()
     if not urgent_dates:
         print("No urgent sittings recorded in `urgency`; nothing to do.")
@@ -128,47 +43,28 @@ async def scrape_bills_for_urgent_sittings():
 
     print(f"Found {len(urgent_dates)} urgent dates in DB.")
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
-
-        all_bills: list[tuple[str, str]] = []
-
-        # 1. For each urgent date, build the URL directly and scrape bills
-        for d in sorted(urgent_dates):
-            url = build_daily_progress_url(d)
-            print(f"Scraping bills for {d} -> {url}")
-            try:
-                await page.goto(url, wait_until="networkidle")
-                content = await page.content()
-            except Exception as e:
-                print(f"  Failed to load {url}: {e}")
-                continue
-
-            bills = extract_bills_from_urgency_section(content)
-            print(f"  Found {len(bills)} bills in urgency section")
-            all_bills.extend(bills)
-
-        await browser.close()
-
-    # 2. Insert bills into SQLite (skip duplicates via UNIQUE url index)
-    if all_bills:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.executemany(
-            "INSERT OR IGNORE INTO bills (bill_name, url) VALUES (?, ?)",
-            all_bills,
-        )
-        conn.commit()
-        conn.close()
-        print(f"Tried to insert {len(all_bills)} bills (duplicates ignored).")
-    else:
-        print("No bills extracted; nothing to insert.")
-
-
-async def main():
-    init_bills_table()
-    await scrape_bills_for_urgent_sittings()
+    # 1. For each urgent date, build the URL directly. Pages the pipeline
+    #    has already extracted (e.g. tonight's scrapewebpage.py run) have
+    #    their bills in the table and are not fetched again.
+    items = [(d, build_daily_progress_url(d)) for d in sorted(urgent_dates)]
+    done = processed_urls(DB_PATH)
+    todo = [item for item in items if item[1] not in done]
+    print(f"{len(items) - len(todo)} urgent sittings already extracted; fetching {len(todo)}.")
+    if not todo:
+        return
+
+    # 2. Fetch the rest once; the pipeline upserts their bills (on the
+    #    UNIQUE url index) along with the other extractors.
+    async with open_fetcher(fetcher, db_path=DB_PATH, concurrency=concurrency) as fetcher:
+        results = await run_pipeline(fetcher, todo, db_path=DB_PATH)
+
+    found = sum(len(r.get("urgency_bills", [])) for r in results if r)
+    print(f"Found {found} bills in the urgency sections of {len(todo)} sittings.")
+
+
+async def main(fetcher=None):
+    init_tables(init_bills_table, db_path=DB_PATH)
+    await scrape_bills_for_urgent_sittings(fetcher=fetcher)
 
 
 if __name__ == "__main__":
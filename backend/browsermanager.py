@@ -0,0 +1,83 @@
+"""
+browsermanager.py
+
+One Chromium instance for a whole nightly run.
+
+new-gen-automation.py used to run four steps that each did their own
+async_playwright() + chromium.launch() + browser.close(). A BrowserManager is
+owned by the orchestrator and handed to every step (through the shared
+Fetcher), so Chromium starts at most once per run -- and not at all if every
+page comes over plain HTTP.
+
+Each step still gets its own isolated browser contexts. When a context is
+released, its cookies/storage are kept and used to seed the next context, so
+a challenge cookie earned by one step is reused by the next instead of every
+step being challenged again.
+"""
+import asyncio
+
+from playwright.async_api import async_playwright
+
+
+class BrowserManager:
+    """
+    Lazily launched, shared Chromium. Use as:
+
+        async with BrowserManager() as browsers:
+            context = await browsers.new_context()
+            ...
+            await browsers.release(context)
+    """
+
+    def __init__(self, headless: bool = True):
+        self.headless = headless
+        self._playwright = None
+        self._browser = None
+        self._launch_lock = asyncio.Lock()
+        self._storage_state = None
+        self.launches = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def browser(self):
+        """The shared Browser, launched on first use."""
+        async with self._launch_lock:
+            if self._browser is None:
+                print("Launching shared headless browser...")
+                self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=self.headless)
+                self.launches += 1
+        return self._browser
+
+    async def new_context(self, **options):
+        """
+        A fresh, isolated BrowserContext seeded with the cookies/storage of
+        the last released context.
+        """
+        browser = await self.browser()
+        if self._storage_state is not None and "storage_state" not in options:
+            options["storage_state"] = self._storage_state
+        return await browser.new_context(**options)
+
+    async def release(self, context):
+        """Keep a context's cookies/storage for the next one, then close it."""
+        try:
+            self._storage_state = await context.storage_state()
+        except Exception:
+            pass
+        try:
+            await context.close()
+        except Exception:
+            pass
+
+    async def close(self):
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
@@ -0,0 +1,180 @@
+"""
+calendarprobe.py
+
+Find sitting days without paginating the listing.
+
+A sitting day's daily-progress URL can be derived from its date
+(siteconfig.build_daily_progress_url), so candidate dates are generated from
+the calendar and their URLs are probed concurrently with status-only (HEAD)
+requests:
+    - candidate dates fall on SITTING_WEEKDAYS and outside the recess
+      calendar (ANNUAL_RECESS plus any dated periods in the JSON file named
+      by NZPT_RECESS_CALENDAR),
+    - a 200 is a sitting day,
+    - a 404/410 is stored in the `probe_misses` negative cache in
+      urgency.sqlite3 so the date is never probed again. Only dates older
+      than NEGATIVE_MIN_AGE_DAYS are cached, because today's page may simply
+      not be published yet.
+
+The recess calendar file looks like:
+
+    {"periods": [["2023-09-09", "2023-11-27"], ["2020-09-07", "2020-11-24"]]}
+
+listingcrawler.collect_listing_items() uses this instead of the listing when
+NZPT_DISCOVERY=calendar.
+"""
+import json
+import os
+from datetime import date, datetime, timedelta
+from functools import partial
+
+from fetchpool import map_items
+from navprofile import READY_DAILY_PROGRESS
+from schema import connect
+from siteconfig import build_daily_progress_url
+
+DB_PATH = "urgency.sqlite3"
+
+# Mon=0 ... Sun=6. The House normally sits Tuesday to Thursday, but extended
+# sittings under urgency run into Mondays and Fridays.
+SITTING_WEEKDAYS = {
+    int(d) for d in os.environ.get("NZPT_SITTING_WEEKDAYS", "0,1,2,3,4").split(",") if d.strip()
+}
+# (month, day) ranges skipped every year; a range may wrap past New Year
+ANNUAL_RECESS = [((12, 24), (1, 31))]
+RECESS_CALENDAR_PATH = os.environ.get("NZPT_RECESS_CALENDAR", "")
+
+NEGATIVE_MIN_AGE_DAYS = 7
+MISS_STATUSES = {404, 410}
+
+
+def init_probe_table(db_path: str = DB_PATH):
+    """
+    Ensure the `probe_misses` negative cache exists.
+    """
+    conn = connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS probe_misses (
+            url TEXT PRIMARY KEY,
+            date TEXT,
+            status INTEGER,
+            probed_at TEXT
+        )
+    """)
+    conn.commit()
+    conn.close()
+
+
+def load_recess_periods(path: str = RECESS_CALENDAR_PATH) -> list[tuple[date, date]]:
+    """Dated recess periods from the JSON calendar file, if one is configured."""
+    if not path:
+        return []
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return [
+        (date.fromisoformat(start), date.fromisoformat(end))
+        for start, end in data.get("periods", [])
+    ]
+
+
+def in_annual_recess(d: date) -> bool:
+    md = (d.month, d.day)
+    for start, end in ANNUAL_RECESS:
+        if start <= end:
+            if start <= md <= end:
+                return True
+        elif md >= start or md <= end:
+            return True
+    return False
+
+
+def candidate_dates(since: date, until: date, weekdays=SITTING_WEEKDAYS,
+                    recess_periods=None) -> list[date]:
+    """Dates in [since, until] that could be sitting days, oldest first."""
+    if recess_periods is None:
+        recess_periods = load_recess_periods()
+    dates = []
+    d = since
+    while d <= until:
+        if (
+            d.weekday() in weekdays
+            and not in_annual_recess(d)
+            and not any(start <= d <= end for start, end in recess_periods)
+        ):
+            dates.append(d)
+        d += timedelta(days=1)
+    return dates
+
+
+def known_misses(db_path: str = DB_PATH) -> set[str]:
+    conn = connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("SELECT url FROM probe_misses")
+    urls = {url for (url,) in cursor.fetchall()}
+    conn.close()
+    return urls
+
+
+def _save_misses(misses, db_path: str = DB_PATH):
+    now = datetime.now().isoformat(timespec="seconds")
+    conn = connect(db_path)
+    cursor = conn.cursor()
+    cursor.executemany(
+        """
+        INSERT INTO probe_misses (url, date, status, probed_at) VALUES (?, ?, ?, ?)
+        ON CONFLICT(url) DO UPDATE SET status = excluded.status, probed_at = excluded.probed_at
+        """,
+        [(url, d.isoformat(), status, now) for d, url, status in misses],
+    )
+    conn.commit()
+    conn.close()
+
+
+async def _probe(fetcher, item):
+    d, url = item
+    return await fetcher.probe(url, READY_DAILY_PROGRESS)
+
+
+async def probe_sitting_days(fetcher, since: date, until: date | None = None,
+                             skip_urls=(), db_path: str = DB_PATH):
+    """
+    Probe the derived URL of every candidate date in [since, until] that is
+    neither in `skip_urls` (e.g. days already in the frontier) nor in the
+    negative cache. Returns [(sitting_date, url)] for the pages that exist.
+    """
+    init_probe_table(db_path)
+    until = min(until or date.today(), date.today())
+
+    skip = set(skip_urls) | known_misses(db_path)
+    items = []
+    for d in candidate_dates(since, until):
+        url = build_daily_progress_url(d)
+        if url not in skip:
+            items.append((d, url))
+    print(f"Probing {len(items)} candidate dates between {since} and {until}...")
+
+    statuses = await map_items(items, partial(_probe, fetcher), fetcher.max_concurrency)
+
+    found = []
+    misses = []
+    failed = 0
+    cache_before = date.today() - timedelta(days=NEGATIVE_MIN_AGE_DAYS)
+    for (d, url), status in zip(items, statuses):
+        if status is None:
+            failed += 1
+        elif 200 <= status < 300:
+            found.append((d, url))
+        elif status in MISS_STATUSES:
+            if d < cache_before:
+                misses.append((d, url, status))
+        else:
+            failed += 1
+            print(f"  Unexpected HTTP {status} probing {url}")
+
+    _save_misses(misses, db_path)
+    print(
+        f"Found {len(found)} sitting days; {len(misses)} non-sitting days added to "
+        f"the negative cache; {failed} probes failed."
+    )
+    return found
@@ -0,0 +1,170 @@
+"""
+Parity check between the Python extractors in htmlextract.py and the in-page
+JavaScript they replaced.
+
+The JavaScript (jsextractors.py) is the code the scrapers used to run with
+page.evaluate(), and still run with NZPT_JS_EXTRACTORS=1. Both versions are
+run on the same HTML and every difference is printed:
+
+    - listing pages   : listing_rows()          vs LISTING_ROWS_JS
+    - daily progress  : introduced_bill_hrefs() vs INTRODUCED_BILL_HREFS_JS
+    - bill pages      : bill_details()          vs MEMBER_IN_CHARGE_JS and
+                                                   BILL_DESCRIPTION_JS
+
+Pages come from the HTTP cache (httpcache.sqlite3) and the network archive
+(netarchive.sqlite3) if they exist, plus a sample of fakeparliament.py pages.
+Each page is loaded into Chromium at its own URL (so `a.href` resolves the
+same way it did on the live site) with scripts disabled and every other
+request aborted.
+
+Without Playwright installed only the Python extractors are run, which still
+shows whether they cope with every stored page.
+
+Usage: python check-extractor-parity.py
+"""
+import asyncio
+import os
+import sqlite3
+import zlib
+
+from fakeparliament import LIST_PATH, FakeSite, slug_for
+from htmlextract import bill_details, introduced_bill_hrefs, listing_rows
+from httpcache import CACHE_PATH
+from jsextractors import (
+    BILL_DESCRIPTION_JS,
+    BILL_URL_ARG,
+    INTRODUCED_BILL_HREFS_JS,
+    LISTING_ROWS_JS,
+    MEMBER_IN_CHARGE_JS,
+)
+from netarchive import ARCHIVE_PATH
+from siteconfig import BASE_URL, BILLS_URL, LIST_URL, is_bill_url
+
+try:
+    from playwright.async_api import async_playwright
+except ImportError:
+    async_playwright = None
+
+FAKE_SAMPLE = 60
+
+
+def page_kind(url: str) -> str | None:
+    if "daily-progress-for-" in url:
+        return "daily"
+    if url.split("?")[0].rstrip("/") == LIST_URL:
+        return "listing"
+    if is_bill_url(url):
+        return "bill"
+    return None
+
+
+def stored_pages() -> list[tuple[str, str, str]]:
+    """(kind, url, html) for every page in the HTTP cache and network archive."""
+    pages = []
+    sources = [
+        (CACHE_PATH, "SELECT url, body FROM responses"),
+        (ARCHIVE_PATH, "SELECT url, body FROM exchanges WHERE method = 'GET' AND status = 200"),
+    ]
+    for path, query in sources:
+        if not os.path.exists(path):
+            continue
+        conn = sqlite3.connect(path)
+        try:
+            for url, body in conn.execute(query):
+                kind = page_kind(url)
+                if kind:
+                    pages.append((kind, url, zlib.decompress(body).decode("utf-8", "replace")))
+        except sqlite3.Error as e:
+            print(f"Skipping {path}: {e}")
+        conn.close()
+    return pages
+
+
+def fake_pages() -> list[tuple[str, str, str]]:
+    site = FakeSite()
+    pages = []
+    for n in range(1, 4):
+        pages.append(("listing", f"{BASE_URL}{LIST_PATH}?page={n}", site.listing_page(n)))
+    # Days with introduced bills, both markups
+    days = [d for d in site.days if d in site.introduction_days]
+    for d in days[:FAKE_SAMPLE // 2] + days[-FAKE_SAMPLE // 2:]:
+        url = f"{BASE_URL}{LIST_PATH}/{slug_for(d)}"
+        pages.append(("daily", url, site.daily_progress_page(d, BILLS_URL)))
+    for guid in list(site.bills)[:FAKE_SAMPLE]:
+        pages.append(("bill", f"{BILLS_URL}/v/6/{guid}", site.bill_page(guid)))
+    return pages
+
+
+def python_result(kind: str, url: str, html: str):
+    if kind == "listing":
+        return listing_rows(html)
+    if kind == "daily":
+        return introduced_bill_hrefs(html, url)
+    return bill_details(html)
+
+
+async def js_result(page, kind: str):
+    if kind == "listing":
+        return await page.evaluate(LISTING_ROWS_JS)
+    if kind == "daily":
+        hrefs = await page.evaluate(INTRODUCED_BILL_HREFS_JS, BILL_URL_ARG)
+        return [h for h in hrefs if h]
+    mps = await page.evaluate(MEMBER_IN_CHARGE_JS)
+    desc = await page.evaluate(BILL_DESCRIPTION_JS)
+    if isinstance(desc, str):
+        desc = " ".join(desc.split())
+    return mps, desc
+
+
+async def check_parity(pages):
+    current = {}
+
+    async def serve(route):
+        if route.request.url == current.get("url"):
+            await route.fulfill(status=200, content_type="text/html; charset=utf-8", body=current["html"])
+        else:
+            await route.abort()
+
+    mismatches = {}
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        context = await browser.new_context(java_script_enabled=False)
+        await context.route("**/*", serve)
+        page = await context.new_page()
+
+        for kind, url, html in pages:
+            current["url"], current["html"] = url, html
+            await page.goto(url, wait_until="domcontentloaded")
+            expected = await js_result(page, kind)
+            actual = python_result(kind, url, html)
+            if actual != expected:
+                mismatches[kind] = mismatches.get(kind, 0) + 1
+                print(f"  MISMATCH ({kind}) {url}\n    python: {actual!r}\n    js:     {expected!r}")
+
+        await browser.close()
+    return mismatches
+
+
+def main():
+    pages = stored_pages() + fake_pages()
+    counts = {}
+    for kind, _, _ in pages:
+        counts[kind] = counts.get(kind, 0) + 1
+    print("Pages: " + ", ".join(f"{n} {kind}" for kind, n in sorted(counts.items())))
+
+    if async_playwright is None:
+        print("Playwright is not installed; running the Python extractors only.")
+        found = 0
+        for kind, url, html in pages:
+            result = python_result(kind, url, html)
+            found += bool(result if kind != "bill" else any(result))
+        print(f"Python extractors found something on {found}/{len(pages)} pages.")
+        return
+
+    mismatches = asyncio.run(check_parity(pages))
+    for kind, n in sorted(counts.items()):
+        print(f"{kind}: {mismatches.get(kind, 0)} of {n} pages differ")
+
+
+if __name__ == "__main__":
+    main()
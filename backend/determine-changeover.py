@@ -18,12 +18,14 @@ Usage:
 """
 
 import asyncio
-import re
 from datetime import date, timedelta
 
 from playwright.async_api import async_playwright
 
-BASE_URL = "https://www3.parliament.nz"
+from markupversions import detect_layout
+from navprofile import NAV_STATS, READY_DAILY_PROGRESS, goto_ready, install_blocking
+from netarchive import install_archive_routing, open_archive
+from siteconfig import build_daily_progress_url as build_url
 
 # Known bounds (inclusive). Adjust if needed.
 LOWER_BOUND = date(2026, 3, 31)   # last known OLD structure
@@ -33,16 +35,6 @@ UPPER_BOUND = date(2026, 5, 28)   # first known NEW structure
 SITTING_DAYS = {0, 1, 2, 3}  # Mon=0 … Thu=3
 
 
-def build_url(d: date) -> str:
-    weekday = d.strftime("%A").lower()
-    day = str(d.day)
-    month = d.strftime("%B").lower()
-    return (
-        f"{BASE_URL}/en/pb/daily-progress-in-the-house/"
-        f"daily-progress-for-{weekday}-{day}-{month}-{d.year}"
-    )
-
-
 def sitting_days_in_range(start: date, end: date) -> list[date]:
     """Return Mon–Thu dates between start and end (inclusive)."""
     days = []
@@ -56,27 +48,20 @@ def sitting_days_in_range(start: date, end: date) -> list[date]:
 
 def detect_structure(html: str) -> str | None:
     """
-    Returns 'new' if <h3><span>…</span></h3> headings are found,
-            'old' if plain <h3>…</h3> headings are found,
-            None  if no h3 content headings detected (404 / non-sitting day).
+    Returns the page's markup version from the markupversions registry
+    ('span-headings' for <h3><span>…</span></h3>, 'plain-headings' for plain
+    <h3>…</h3>), or None if no h3 content headings are detected (404 /
+    non-sitting day). Any heading counts, so days without urgency do too.
     """
-    if re.search(r"<h3>\s*<span>", html, re.IGNORECASE):
-        return "new"
-    if re.search(
-        r"<h3>\s*(?:Urgency|Government business|Introduction|Oral questions)",
-        html, re.IGNORECASE
-    ):
-        return "old"
-    return None
+    version = detect_layout(html)
+    return version.name if version else None
 
 
 async def fetch_structure(browser_page, d: date) -> str | None:
     """Fetch a daily progress page and return its structure tag, or None."""
     url = build_url(d)
     try:
-        response = await browser_page.goto(
-            url, wait_until="domcontentloaded", timeout=20_000
-        )
+        response = await goto_ready(browser_page, url, READY_DAILY_PROGRESS)
         if response and response.status == 404:
             return None
         html = await browser_page.content()
@@ -129,7 +114,7 @@ async def binary_search(browser_page, days: list[date]) -> tuple[date, date] | N
               "Widen the search range.")
         return None
 
-    # Invariant: days[lo] is old, days[hi] is new
+    # Invariant: days[lo] has the old markup, days[hi] the new one
     last_old_idx = lo
     first_new_idx = hi
 
@@ -145,7 +130,7 @@ async def binary_search(browser_page, days: list[date]) -> tuple[date, date] | N
         mid_idx, mid_struct = result
         print(f"    Checked {days[mid_idx]} → {mid_struct}")
 
-        if mid_struct == "old":
+        if mid_struct == lo_struct:
             last_old_idx = mid_idx
             lo = mid_idx          # mid_idx is guaranteed > lo (or loop would have ended)
         else:
@@ -168,15 +153,23 @@ async def main():
     days = sitting_days_in_range(LOWER_BOUND, UPPER_BOUND)
     print(f"Candidate sitting days (Mon–Thu): {len(days)}\n")
 
+    archive = open_archive()
     async with async_playwright() as p:
         browser = await p.chromium.launch(headless=True)
         browser_page = await browser.new_page()
+        await install_archive_routing(browser_page, archive)
+        await install_blocking(browser_page)
 
         print("Running binary search...")
         result = await binary_search(browser_page, days)
 
         await browser.close()
 
+    NAV_STATS.report()
+    if archive is not None:
+        archive.report()
+        archive.close()
+
     print()
     if result:
         last_old, first_new = result
@@ -0,0 +1,334 @@
+"""
+fakeparliament.py
+
+Local stand-in for www3.parliament.nz / bills.parliament.nz, for running the
+backend at scale without touching the real site.
+
+It generates a deterministic sitting calendar and serves:
+    - the "Daily Progress in the House" listing (?page=N), with rows matching
+      `table.table--list tbody tr.list__row`,
+    - daily-progress pages, in the old `<h3>Urgency</h3>` markup before
+      CHANGEOVER and the new `<h3><span>Urgency</span></h3>` markup after it,
+      with Urgency, Government business and Introduction of bills sections,
+    - the RSS feed at /en/highvolumegenericlisting/rss/1667,
+    - bill pages under /bills with `Member(s) in charge:` and a description
+      after the generic "Bills are proposals..." paragraph,
+    - a 404 for any other (non-sitting) day.
+
+NZPT_FAKE_SCALE multiplies the number of sitting days by extending the
+calendar back in time (1 = roughly the real history since the 52nd
+Parliament). NZPT_FAKE_LATENCY_MS adds a per-request delay and
+NZPT_FAKE_ERROR_RATE answers that fraction of requests with a 503, to
+exercise the fetcher's rate control.
+
+Run it, then point the scripts at it with siteconfig's variables:
+
+    python fakeparliament.py
+    NZPT_BASE_URL=http://127.0.0.1:8765 NZPT_BILLS_URL=http://127.0.0.1:8765/bills \\
+        python scrapewebpage.py
+"""
+import hashlib
+import os
+import random
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from email.utils import format_datetime
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+HOST = os.environ.get("NZPT_FAKE_HOST", "127.0.0.1")
+PORT = int(os.environ.get("NZPT_FAKE_PORT", "8765"))
+SCALE = int(os.environ.get("NZPT_FAKE_SCALE", "1"))
+LATENCY_MS = int(os.environ.get("NZPT_FAKE_LATENCY_MS", "0"))
+ERROR_RATE = float(os.environ.get("NZPT_FAKE_ERROR_RATE", "0"))
+
+HISTORY_START = date(2017, 11, 7)
+HISTORY_END = date(2026, 10, 15)
+CHANGEOVER = date(2026, 4, 28)  # first day in the new markup
+
+ROWS_PER_PAGE = 10
+RSS_ITEMS = 20
+URGENT_RATE = 0.12
+
+LIST_PATH = "/en/pb/daily-progress-in-the-house"
+RSS_PATH = "/en/highvolumegenericlisting/rss/1667"
+BILLS_PREFIX = "/bills"
+
+URGENCY_PHRASE = "A motion to accord urgency to the following business was agreed to"
+GENERIC_BILL_TEXT = (
+    "Bills are proposals to make a new law or to change an existing one. "
+    "Only Parliament can pass a bill. Each bill goes through several stages, "
+    "giving MPs and the public the chance to have their say."
+)
+
+SUBJECTS = [
+    "Resource Management", "Fast-track Approvals", "Regulatory Standards",
+    "Crimes", "Education and Training", "Land Transport", "Local Government",
+    "Taxation", "Electricity", "Immigration", "Social Security", "Fisheries",
+    "Health", "Employment Relations", "Building", "Customs and Excise",
+]
+KINDS = ["Amendment Bill", "Bill", "Repeal Bill", "(Miscellaneous Matters) Amendment Bill"]
+MEMBERS = [
+    "Hon Chris Bishop", "Hon Nicola Willis", "Hon Paul Goldsmith", "Hon Erica Stanford",
+    "Hon Simeon Brown", "Hon Brooke van Velden", "Hon Shane Jones", "Hon Judith Collins",
+]
+
+
+def slug_for(d: date) -> str:
+    return (
+        f"daily-progress-for-{d.strftime('%A').lower()}-{d.day}-"
+        f"{d.strftime('%B').lower()}-{d.year}"
+    )
+
+
+def sitting_calendar(scale: int = SCALE) -> list[date]:
+    """
+    Sitting days, newest first: Tuesday to Thursday in three of every five
+    weeks outside the summer recess, from HISTORY_END back `scale` times the
+    real history.
+    """
+    start = HISTORY_END - (HISTORY_END - HISTORY_START) * scale
+    days = []
+    d = HISTORY_END
+    while d >= start:
+        week = d.toordinal() // 7
+        summer = (d.month, d.day) >= (12, 24) or d.month == 1
+        if d.weekday() in (1, 2, 3) and week % 5 < 3 and not summer:
+            days.append(d)
+        d -= timedelta(days=1)
+    return days
+
+
+class Bill:
+    def __init__(self, n: int):
+        rng = random.Random(f"bill-{n}")
+        self.name = f"{rng.choice(SUBJECTS)} {rng.choice(KINDS)}"
+        if n >= len(SUBJECTS) * len(KINDS):
+            self.name = self.name.replace(" Bill", f" (No {n}) Bill")
+        self.guid = str(uuid.uuid5(uuid.NAMESPACE_URL, f"nzpt-fake-bill-{n}"))
+        self.members = ", ".join(rng.sample(MEMBERS, rng.choice((1, 1, 2))))
+        self.desc = f"This bill amends the {self.name.split(' (')[0].replace(' Bill', ' Act')} to make changes {n}."
+
+
+class FakeSite:
+    """Everything the server knows, generated up front from the calendar."""
+
+    def __init__(self, scale: int = SCALE):
+        self.days = sitting_calendar(scale)
+        self.by_slug = {slug_for(d): d for d in self.days}
+        self.bills: dict[str, Bill] = {}
+        self._introduced: dict[date, list[Bill]] = {}
+        self._urgent: dict[date, list[Bill]] = {}
+
+        # Oldest first, so bill numbers grow with time
+        n = 0
+        for d in reversed(self.days):
+            rng = random.Random(d.toordinal())
+            introduced = []
+            for _ in range(rng.choice((0, 0, 1, 1, 2))):
+                bill = Bill(n)
+                n += 1
+                self.bills[bill.guid] = bill
+                introduced.append(bill)
+            self._introduced[d] = introduced
+            if rng.random() < URGENT_RATE and self.bills:
+                pool = list(self.bills.values())[-30:]
+                self._urgent[d] = rng.sample(pool, min(len(pool), rng.choice((1, 2, 3))))
+
+    @property
+    def urgent_days(self) -> set[date]:
+        """Sitting days with an Urgency section."""
+        return set(self._urgent)
+
+    @property
+    def introduction_days(self) -> set[date]:
+        """Sitting days with an Introduction of bills section."""
+        return {d for d, bills in self._introduced.items() if bills}
+
+    # -- pages ---------------------------------------------------------------
+    def listing_page(self, page_num: int) -> str | None:
+        start = (page_num - 1) * ROWS_PER_PAGE
+        rows = self.days[start:start + ROWS_PER_PAGE]
+        if page_num < 1 or (not rows and page_num != 1):
+            return None
+        body = []
+        for d in rows:
+            updated = d + timedelta(days=1)
+            body.append(
+                f'<tr class="list__row">'
+                f'<td class="list__cell"><a class="list__cell-heading" href="{LIST_PATH}/{slug_for(d)}">'
+                f'Daily progress for {d.strftime("%A")}, {d.day} {d.strftime("%B %Y")}</a></td>'
+                f'<td class="list__cell">{updated.day}&nbsp;{updated.strftime("%B")}&nbsp;{updated.year}</td>'
+                f'</tr>'
+            )
+        return (
+            "<!DOCTYPE html><html><head><title>Daily Progress in the House</title></head><body>"
+            "<h1>Daily Progress in the House</h1>"
+            '<table class="table table--list"><thead><tr><th>Title</th><th>Last updated</th></tr></thead>'
+            f"<tbody>{''.join(body)}</tbody></table>"
+            f'<nav class="pagination"><a href="{LIST_PATH}?page={page_num + 1}">Next</a></nav>'
+            "</body></html>"
+        )
+
+    def daily_progress_page(self, d: date, bills_base: str) -> str:
+        new = d >= CHANGEOVER
+
+        def h3(text):
+            return f"<h3><span>{text}</span></h3>" if new else f"<h3>{text}</h3>"
+
+        def item(bill, before="", after=""):
+            link = (
+                f'<a href="{bills_base}/v/6/{bill.guid}">{escape(bill.name)}</a>' if new else
+                f'<a rel="noopener" href="{bills_base}/v/6/{bill.guid}" target="_blank">{escape(bill.name)}</a>'
+            )
+            inner = f"{before}{link}{after}"
+            return f"<li><span>{inner}</span></li>" if new else f"<li>{inner}</li>"
+
+        parts = [
+            "<!DOCTYPE html><html><head>",
+            f"<title>Daily progress for {d.strftime('%A')}, {d.day} {d.strftime('%B %Y')}</title>",
+            "</head><body><main>",
+            f"<h1>Daily progress for {d.strftime('%A')}, {d.day} {d.strftime('%B %Y')}</h1>",
+            h3("Prayer"),
+            "<p>The Speaker read the prayer.</p>",
+        ]
+        introduced = self._introduced.get(d, [])
+        if introduced:
+            parts.append(h3("Introduction of bills"))
+            parts.append("<ul>" + "".join(item(b, "The ", " was introduced.") for b in introduced) + "</ul>")
+        parts.append(h3("Oral questions"))
+        parts.append("<p>Questions to Ministers were answered.</p>")
+        urgent = self._urgent.get(d)
+        if urgent:
+            parts.append(h3("Urgency"))
+            parts.append(f"<p>{URGENCY_PHRASE}:</p>")
+            parts.append("<ul>" + "".join(item(b, "", ", all stages.") for b in urgent) + "</ul>")
+        parts.append(h3("Government business—<em>continued</em>"))
+        parts.append("<p>The House adjourned.</p>")
+        parts.append("</main></body></html>")
+        return "\n".join(parts)
+
+    def rss(self, base: str) -> str:
+        items = []
+        for d in self.days[:RSS_ITEMS]:
+            pub = format_datetime(datetime(d.year, d.month, d.day, tzinfo=timezone.utc), usegmt=True)
+            items.append(
+                "<item>"
+                f"<title>Daily progress for {d.strftime('%A')}, {d.day} {d.strftime('%B %Y')}</title>"
+                f"<link>{base}{LIST_PATH}/{slug_for(d)}</link>"
+                f"<pubDate>{pub}</pubDate>"
+                "</item>"
+            )
+        return (
+            '<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel>'
+            "<title>Daily Progress in the House</title>"
+            f"{''.join(items)}</channel></rss>"
+        )
+
+    def bill_page(self, guid: str) -> str | None:
+        bill = self.bills.get(guid)
+        if bill is None:
+            return None
+        return (
+            f"<!DOCTYPE html><html><head><title>{escape(bill.name)}</title></head><body>"
+            f"<h1>{escape(bill.name)}</h1>"
+            '<div class="bill-summary">'
+            f"<p>{GENERIC_BILL_TEXT}</p>"
+            f"<p>{escape(bill.desc)}</p>"
+            "</div>"
+            "<table><tbody>"
+            f"<tr><th>Member(s) in charge:</th><td>{escape(bill.members)}</td></tr>"
+            "<tr><th>Type of bill:</th><td>Government</td></tr>"
+            "</tbody></table>"
+            "</body></html>"
+        )
+
+
+SITE = None
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _send(self, status: int, body: str, content_type: str = "text/html; charset=utf-8"):
+        data = body.encode("utf-8")
+        etag = '"' + hashlib.sha1(data).hexdigest()[:16] + '"'
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        if status == 200:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(data)
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        if LATENCY_MS:
+            time.sleep(LATENCY_MS / 1000)
+        if ERROR_RATE and random.random() < ERROR_RATE:
+            self._send(503, "<html><body>Service Unavailable</body></html>")
+            return
+
+        parsed = urlparse(self.path)
+        path = parsed.path.rstrip("/")
+        base = f"http://{self.headers.get('Host', f'{HOST}:{PORT}')}"
+
+        if path == LIST_PATH:
+            try:
+                page_num = int(parse_qs(parsed.query).get("page", ["1"])[0])
+            except ValueError:
+                self._send(400, "<html><body><h1>Bad page number</h1></body></html>")
+                return
+            html = SITE.listing_page(page_num)
+        elif path.startswith(LIST_PATH + "/"):
+            d = SITE.by_slug.get(path.rsplit("/", 1)[-1])
+            html = SITE.daily_progress_page(d, base + BILLS_PREFIX) if d else None
+        elif path == RSS_PATH:
+            self._send(200, SITE.rss(base), "application/rss+xml; charset=utf-8")
+            return
+        elif path.startswith(BILLS_PREFIX + "/"):
+            html = SITE.bill_page(path.rsplit("/", 1)[-1])
+        else:
+            html = None
+
+        if html is None:
+            self._send(404, "<html><body><h1>Page not found</h1></body></html>")
+        else:
+            self._send(200, html)
+
+
+def main():
+    global SITE
+    SITE = FakeSite(SCALE)
+    urgent = len(SITE.urgent_days)
+    print(
+        f"Fake parliament.nz: {len(SITE.days)} sitting days "
+        f"({SITE.days[-1]} to {SITE.days[0]}), {urgent} urgent, {len(SITE.bills)} bills, "
+        f"{(len(SITE.days) + ROWS_PER_PAGE - 1) // ROWS_PER_PAGE} listing pages."
+    )
+    print(f"Serving on http://{HOST}:{PORT} (bills under {BILLS_PREFIX})")
+    server = ThreadingHTTPServer((HOST, PORT), Handler)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
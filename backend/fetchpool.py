@@ -0,0 +1,94 @@
+"""
+fetchpool.py
+
+Bounded concurrent page pool shared by the backend scrapers.
+
+A PagePool opens N isolated browser contexts with one page each and hands
+them out behind an asyncio semaphore (httpfetch.py uses one for its browser
+fallback). map_items() spreads work items across any async worker (e.g. the
+HTTP fetcher) and returns results in the same order as the input, so
+callers that pass date-sorted work items still write to the DB in date
+order.
+
+The concurrency level defaults to CONCURRENCY and can be overridden with
+the NZPT_CONCURRENCY environment variable.
+"""
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
+CONCURRENCY = int(os.environ.get("NZPT_CONCURRENCY", "4"))
+
+
+class PagePool:
+    """
+    A fixed set of browser pages, one per context, used as:
+
+        async with PagePool(browser, 4) as pool:
+            async with pool.page() as page:
+                ...
+    """
+
+    def __init__(self, browser, size: int = CONCURRENCY, setup=None):
+        # A Browser, or a browsermanager.BrowserManager so the contexts share
+        # the run's cookies
+        self.browser = browser
+        self.size = max(1, size)
+        # Optional `await setup(context)` hook run on each new context,
+        # e.g. navprofile.install_blocking
+        self.setup = setup
+        self._semaphore = asyncio.Semaphore(self.size)
+        self._free: asyncio.Queue = asyncio.Queue()
+        self._contexts = []
+
+    async def __aenter__(self):
+        for _ in range(self.size):
+            context = await self.browser.new_context()
+            if self.setup is not None:
+                await self.setup(context)
+            page = await context.new_page()
+            self._contexts.append(context)
+            self._free.put_nowait(page)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        release = getattr(self.browser, "release", None)
+        for context in self._contexts:
+            try:
+                if release is not None:
+                    await release(context)
+                else:
+                    await context.close()
+            except Exception:
+                pass
+        self._contexts = []
+
+    @asynccontextmanager
+    async def page(self):
+        """Borrow a page from the pool for the duration of the block."""
+        async with self._semaphore:
+            page = await self._free.get()
+            try:
+                yield page
+            finally:
+                self._free.put_nowait(page)
+
+
+async def map_items(items, worker, concurrency: int = CONCURRENCY):
+    """
+    Run `await worker(item)` for every item, at most `concurrency` at a time.
+    Returns a list of results in input order. An item whose worker raises
+    is logged and its result is None.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(item):
+        async with semaphore:
+            try:
+                return await worker(item)
+            except Exception as e:
+                print(f"  Failed to process {item}: {e}")
+                return None
+
+    return await asyncio.gather(*(run(item) for item in items))
+
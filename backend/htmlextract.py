@@ -0,0 +1,435 @@
+"""
+htmlextract.py
+
+Browser-free extractors that work on raw HTML, so pages fetched over plain
+HTTP can be parsed without a Chromium page.
+
+parse_dom() builds a small element tree with html.parser. The extractors
+below walk that tree the same way the in-page JavaScript they replace walks
+the DOM.
+"""
+import re
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlparse
+
+from siteconfig import is_bill_url
+
+URGENCY_PHRASE = "A motion to accord urgency to the following business was agreed to"
+
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+    "meta", "param", "source", "track", "wbr",
+}
+
+# Opening one of these closes an open element of the same group, the way
+# a browser's parser implies end tags.
+IMPLIED_END = {
+    "p": {"p"},
+    "li": {"li"},
+    "tr": {"tr", "td", "th"},
+    "td": {"td", "th"},
+    "th": {"td", "th"},
+    "option": {"option"},
+}
+# Block-level start tags also close an open <p>, so a paragraph that is
+# never closed ends where the browser would end it.
+for _tag in (
+    "address", "article", "aside", "blockquote", "div", "dl", "fieldset",
+    "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr",
+    "main", "nav", "ol", "pre", "section", "table", "ul",
+):
+    IMPLIED_END[_tag] = {"p"}
+
+# The boilerplate paragraph at the top of every bill page
+GENERIC_BILL_TEXT = (
+    "Bills are proposals to make a new law or to change an existing one. "
+    "Only Parliament can pass a bill. Each bill goes through several stages, "
+    "giving MPs and the public the chance to have their say."
+)
+
+
+class Element:
+    """A parsed HTML element. `children` holds Elements and text strings."""
+
+    def __init__(self, tag: str, attrs: dict, parent=None):
+        self.tag = tag
+        self.attrs = attrs
+        self.parent = parent
+        self.children: list = []
+
+    def text(self) -> str:
+        """Equivalent of DOM textContent."""
+        parts = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                parts.append(node)
+            else:
+                stack.extend(reversed(node.children))
+        return "".join(parts)
+
+    def has_class(self, name: str) -> bool:
+        return name in (self.attrs.get("class") or "").split()
+
+    def iter(self, tag: str | None = None):
+        """Yield descendant elements in document order."""
+        stack = list(reversed(self.children))
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                continue
+            if tag is None or node.tag == tag:
+                yield node
+            stack.extend(reversed(node.children))
+
+    def find(self, tag: str, cls: str | None = None):
+        for el in self.iter(tag):
+            if cls is None or el.has_class(cls):
+                return el
+        return None
+
+    def find_all(self, tag: str, cls: str | None = None) -> list:
+        return [el for el in self.iter(tag) if cls is None or el.has_class(cls)]
+
+    def next_siblings(self):
+        """Yield the nodes (Elements and text) after this one in its parent."""
+        if self.parent is None:
+            return
+        siblings = self.parent.children
+        idx = next(i for i, n in enumerate(siblings) if n is self)
+        yield from siblings[idx + 1:]
+
+    def next_element_sibling(self):
+        for node in self.next_siblings():
+            if isinstance(node, Element):
+                return node
+        return None
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Element("#document", {})
+        self.stack = [self.root]
+
+    def handle_starttag(self, tag, attrs):
+        closes = IMPLIED_END.get(tag)
+        if closes:
+            # Only look inside the nearest table/list so a <td> in a nested
+            # table does not close the outer one.
+            for i in range(len(self.stack) - 1, 0, -1):
+                open_tag = self.stack[i].tag
+                if open_tag in closes:
+                    del self.stack[i:]
+                    break
+                if open_tag in ("table", "ul", "ol", "div", "tbody", "thead"):
+                    break
+
+        parent = self.stack[-1]
+        el = Element(tag, {k: (v or "") for k, v in attrs}, parent)
+        parent.children.append(el)
+        if tag not in VOID_TAGS:
+            self.stack.append(el)
+
+    def handle_startendtag(self, tag, attrs):
+        parent = self.stack[-1]
+        parent.children.append(Element(tag, {k: (v or "") for k, v in attrs}, parent))
+
+    def handle_endtag(self, tag):
+        for i in range(len(self.stack) - 1, 0, -1):
+            if self.stack[i].tag == tag:
+                del self.stack[i:]
+                return
+
+    def handle_data(self, data):
+        self.stack[-1].children.append(data)
+
+
+def parse_dom(html: str) -> Element:
+    """Parse an HTML document into an Element tree rooted at '#document'."""
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.root
+
+
+def listing_rows(html: str) -> list[dict]:
+    """
+    Python version of the listing-page row extraction:
+    rows of `table.table--list tbody tr.list__row`, returning the
+    `a.list__cell-heading` href and title, and the second `td.list__cell`
+    text (the "Last updated" column).
+    """
+    rows = []
+    for table in parse_dom(html).find_all("table", "table--list"):
+        for tbody in table.find_all("tbody"):
+            for row in tbody.find_all("tr", "list__row"):
+                link = row.find("a", "list__cell-heading")
+                cells = row.find_all("td", "list__cell")
+                date_cell = cells[1] if len(cells) > 1 else None
+                rows.append({
+                    "href": link.attrs.get("href") if link else None,
+                    "titleText": link.text().strip() if link else None,
+                    "dateText": date_cell.text().strip() if date_cell else None,
+                })
+    return rows
+
+
+def introduced_bill_hrefs(html: str, page_url: str) -> list[str]:
+    """
+    Python version of billcounter's in-page extractor: bill hrefs from the
+    'Introduction of bills' section(s) only. Hrefs are resolved against
+    `page_url` (or the page's <base href>), as the browser's `a.href` would be.
+    """
+    results = []
+    root = parse_dom(html)
+    base = next((el for el in root.iter("base") if el.attrs.get("href")), None)
+    if base is not None:
+        page_url = urljoin(page_url, base.attrs["href"].strip())
+    h3s = root.find_all("h3")
+    for h3 in h3s:
+        if "introduction of bills" not in h3.text().strip().lower():
+            continue
+        for node in h3.next_siblings():
+            if not isinstance(node, Element):
+                continue
+            if node.tag == "h3":
+                # reached the next section
+                break
+            for a in node.iter("a"):
+                text = a.text().strip()
+                raw_href = a.attrs.get("href", "").strip()
+                href = urljoin(page_url, raw_href) if raw_href else ""
+                if not href or not text:
+                    continue
+                if is_bill_url(href) and "bill" in text.lower():
+                    results.append(href)
+    return results
+
+
+def _member_in_charge(root: Element) -> str | None:
+    th = next(
+        (t for t in root.iter("th") if t.text().strip().startswith("Member(s) in charge:")),
+        None,
+    )
+    if th is None:
+        return None
+    td = th.next_element_sibling()
+    if td is None:
+        return None
+    raw = td.text().strip()
+    if not raw:
+        return None
+
+    # If there are multiple MPs, return only the first
+    first = raw.split(",")[0]
+    if " and " in first:
+        first = first.split(" and ")[0]
+    first = first.strip()
+    return first or None
+
+
+def _bill_description(root: Element) -> str | None:
+    generic = next(
+        (p for p in root.iter("p")
+         if p.text().strip().startswith("Bills are proposals to make a new law")),
+        None,
+    )
+    if generic is None:
+        return None
+
+    # The first non-empty sibling after it that is not the generic text again
+    for node in generic.next_siblings():
+        text = (node if isinstance(node, str) else node.text()).strip()
+        if text and text != GENERIC_BILL_TEXT:
+            return text
+    return None
+
+
+def bill_details(html: str) -> tuple[str | None, str | None]:
+    """
+    Python version of billdetails' in-page extractors. Returns (mps, desc):
+      mps:  the first name in the `Member(s) in charge:` row's cell,
+      desc: the first text after the generic "Bills are proposals..."
+            paragraph, with whitespace collapsed.
+    Either is None if it cannot be found.
+    """
+    root = parse_dom(html)
+    mps = _member_in_charge(root)
+    desc = _bill_description(root)
+    if desc is not None:
+        desc = " ".join(desc.split())
+    return mps, desc
+
+
+def normalise_bill_id(href: str) -> str | None:
+    """
+    Given a bills.parliament.nz URL, return a stable bill identifier
+    based on the last path segment (GUID-like part).
+    """
+    try:
+        parsed = urlparse(href)
+    except Exception:
+        return None
+
+    if not is_bill_url(href):
+        return None
+
+    parts = [p for p in parsed.path.split("/") if p]
+    if not parts:
+        return None
+
+    guid = parts[-1].strip().lower()
+    return guid or None
+
+
+# The Urgency heading, whatever markup wraps its text:
+#     <h3>Urgency</h3>, <h3><span>Urgency</span></h3>, <h3 class="x">URGENCY</h3>
+URGENCY_HEADING_RE = re.compile(
+    r"<h3(?:\s[^>]*)?>\s*(?:<[^>]*>\s*)*urgency\s*(?:<[^>]*>\s*)*</h3\s*>",
+    re.IGNORECASE,
+)
+# The next Government business heading, which ends the urgency section:
+#     <h3>Government business—<em>continued</em></h3>
+# Only the text up to that heading's </h3> is looked at, so a heading that
+# does not match costs no more than its own length.
+GOVERNMENT_BUSINESS_RE = re.compile(
+    r"<h3(?:\s[^>]*)?>(?:[^<]|<(?!/h3)[^>]*>)*?government business",
+    re.IGNORECASE,
+)
+_LINK_RE = re.compile(r'<a[^>]+href="([^"]+)"[^>]*>(.*?)</a>', re.DOTALL | re.IGNORECASE)
+_TAG_RE = re.compile(r"<.*?>", re.DOTALL)
+
+
+# (page, match) of the last find_urgency_heading() call
+_last_heading = (None, None)
+
+
+def find_urgency_heading(html_content: str) -> re.Match | None:
+    """
+    URGENCY_HEADING_RE.search(html_content). The result for the last page
+    is kept, so markup detection and the extractors that run over the same
+    page only search it once.
+    """
+    global _last_heading
+    page, m = _last_heading
+    if page is not html_content:
+        m = URGENCY_HEADING_RE.search(html_content)
+        _last_heading = (html_content, m)
+    return m
+
+
+def urgency_section_span(html_content: str) -> tuple[int, int] | None:
+    """
+    (start, end) offsets of the urgency section: from the end of the
+    Urgency heading to the next Government business heading, or to the end
+    of the page if there is none. None if there is no Urgency heading.
+    """
+    start = find_urgency_heading(html_content)
+    if start is None:
+        return None
+    end = GOVERNMENT_BUSINESS_RE.search(html_content, start.end())
+    return start.end(), end.start() if end else len(html_content)
+
+
+def urgency_section_bills(html_content: str, heading: re.Pattern | None = None,
+                          terminator: re.Pattern | None = None):
+    """
+    (bill_name, url) links between the Urgency heading and the next
+    Government business heading, or [] if there is no such heading after it.
+
+    Returns None if there is no Urgency heading, or if `heading` (a pattern
+    the whole Urgency heading must match) or `terminator` (a pattern the
+    Government business heading must start with) is given and the page
+    does not write its headings that way.
+
+    Both searches are compiled patterns anchored on "<h3", and the link
+    search is bounded to the section, so nothing runs over the rest of the
+    page once the section has been found.
+    """
+    start = find_urgency_heading(html_content)
+    if start is None or (heading is not None and not heading.fullmatch(start.group())):
+        return None
+    end = GOVERNMENT_BUSINESS_RE.search(html_content, start.end())
+    if end is None:
+        return []
+    if terminator is not None and not terminator.match(html_content, end.start()):
+        return None
+
+    bills = []
+    for url, raw_text in _LINK_RE.findall(html_content, start.end(), end.start()):
+        url = url.strip()
+        bill_name = " ".join(_TAG_RE.sub("", raw_text).split()).strip()
+        if not bill_name or not url:
+            continue
+        bills.append((bill_name, url))
+    return bills
+
+
+def extract_bills_from_urgency_section(html_content: str):
+    """
+    Extract bill names and URLs from the urgency section.
+    Returns a list of (bill_name, url) tuples.
+
+    Handles two formats for the Urgency heading:
+      Old: <h3>Urgency</h3>
+      New: <h3><span>Urgency</span></h3>
+    (any markup, attributes or case, only the heading's text is compared).
+
+    Collects the links between that heading and the next Government business
+    header:
+      <h3>Government business—<em>continued</em></h3>
+    and returns nothing if there is no such header, as the regex version did.
+    Entities in link text and hrefs are kept as written.
+    """
+    return urgency_section_bills(html_content) or []
+
+
+def extract_bills_from_urgency_section_regex(html_content: str):
+    """
+    Regex version of extract_bills_from_urgency_section(), kept as the
+    reference for bench-urgency-extract.py.
+    Returns a list of (bill_name, url) tuples.
+
+    Handles two formats for the Urgency heading:
+      Old: <h3>Urgency</h3>
+      New: <h3><span>Urgency</span></h3>
+
+    Looks between that heading and the next Government business header:
+      <h3>Government business—<em>continued</em></h3>
+    (matched loosely to be robust to markup/dash variations).
+
+    Handles two formats for bill list items:
+      Old: <li>anytext<a rel="noopener" href="billurl" target="_blank">Bill Name</a>anytext</li>
+      New: <li><span>anytext<a href="billurl">Bill Name</a>anytext</span></li>
+    """
+    bills = []
+
+    # Match <h3>Urgency</h3> or <h3><span>Urgency</span></h3>
+    urgency_pattern = (
+        r"<h3>\s*(?:<span>\s*)?Urgency\s*(?:</span>\s*)?</h3>(.*?)"
+        r"<h3>\s*(?:<span>\s*)?[^<]*Government business.*?</h3>"
+    )
+    m = re.search(urgency_pattern, html_content, re.DOTALL | re.IGNORECASE)
+    if not m:
+        return bills
+
+    urgency_section = m.group(1)
+
+    # Find all <a href="..."> ... </a> links in this section
+    link_pattern = r'<a[^>]+href="([^"]+)"[^>]*>(.*?)</a>'
+    links = re.findall(link_pattern, urgency_section, re.DOTALL | re.IGNORECASE)
+
+    for url, raw_text in links:
+        url = url.strip()
+
+        # Strip any inner HTML from the anchor text, keep plain text
+        text_no_tags = re.sub(r"<.*?>", "", raw_text, flags=re.DOTALL)
+        bill_name = " ".join(text_no_tags.split()).strip()
+
+        if not bill_name or not url:
+            continue
+        bills.append((bill_name, url))
+
+    return bills
@@ -0,0 +1,148 @@
+"""
+httpcache.py
+
+Persistent, size-bounded HTTP response cache shared by all backend scripts.
+
+Responses are stored in their own SQLite file (httpcache.sqlite3, separate
+from urgency.sqlite3 so the web database stays small), keyed by URL:
+    - `body` is the zlib-compressed response text,
+    - `etag` / `last_modified` are the validators sent back as
+      If-None-Match / If-Modified-Since, so an unchanged page costs a 304,
+    - `last_access` drives LRU eviction once the stored bytes exceed the
+      budget.
+
+The location and budget can be changed with NZPT_HTTP_CACHE and
+NZPT_HTTP_CACHE_BYTES.
+"""
+import os
+import sqlite3
+import time
+import zlib
+from typing import NamedTuple
+
+CACHE_PATH = os.environ.get("NZPT_HTTP_CACHE", "httpcache.sqlite3")
+MAX_BYTES = int(os.environ.get("NZPT_HTTP_CACHE_BYTES", str(200 * 1024 * 1024)))
+
+
+class CachedResponse(NamedTuple):
+    url: str
+    status: int
+    etag: str | None
+    last_modified: str | None
+    text: str
+
+
+class ResponseCache:
+    """
+    URL -> compressed body + validators, with LRU eviction under a byte
+    budget. One instance is owned by each Fetcher; several processes can
+    share the file.
+    """
+
+    def __init__(self, path: str = CACHE_PATH, max_bytes: int = MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.stores = 0
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                status INTEGER,
+                etag TEXT,
+                last_modified TEXT,
+                body BLOB,
+                size INTEGER,
+                stored_at REAL,
+                last_access REAL
+            )
+        """)
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)"
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.evict()
+        self.conn.close()
+
+    def get(self, url: str) -> CachedResponse | None:
+        row = self.conn.execute(
+            "SELECT status, etag, last_modified, body FROM responses WHERE url = ?",
+            (url,),
+        ).fetchone()
+        if row is None:
+            return None
+        status, etag, last_modified, body = row
+        return CachedResponse(url, status, etag, last_modified, zlib.decompress(body).decode("utf-8"))
+
+    def conditional_headers(self, entry: CachedResponse | None) -> dict:
+        """Validators to send when revalidating `entry`."""
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def touch(self, url: str):
+        """Mark a cached entry as used (a hit or a 304)."""
+        self.conn.execute(
+            "UPDATE responses SET last_access = ? WHERE url = ?", (time.time(), url)
+        )
+        self.conn.commit()
+        self.hits += 1
+
+    def put(self, url: str, status: int, headers, text: str):
+        """Store a fresh 2xx response together with its validators."""
+        body = zlib.compress(text.encode("utf-8"), 6)
+        now = time.time()
+        self.conn.execute(
+            """
+            INSERT INTO responses (url, status, etag, last_modified, body, size, stored_at, last_access)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET
+                status = excluded.status,
+                etag = excluded.etag,
+                last_modified = excluded.last_modified,
+                body = excluded.body,
+                size = excluded.size,
+                stored_at = excluded.stored_at,
+                last_access = excluded.last_access
+            """,
+            (url, status, headers.get("etag"), headers.get("last-modified"),
+             body, len(body), now, now),
+        )
+        self.conn.commit()
+        self.stores += 1
+
+    def total_bytes(self) -> int:
+        return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def evict(self):
+        """Drop least-recently-used entries until the cache fits its budget."""
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        rows = self.conn.execute(
+            "SELECT url, size FROM responses ORDER BY last_access"
+        ).fetchall()
+        for url, size in rows:
+            if total <= self.max_bytes:
+                break
+            self.conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+            total -= size
+            evicted += 1
+        self.conn.commit()
+        print(f"HTTP cache: evicted {evicted} entries to stay under {self.max_bytes} bytes.")
+
+    def report(self):
+        print(
+            f"HTTP cache: {self.hits} served from cache (304), "
+            f"{self.stores} stored, {self.total_bytes()} bytes on disk."
+        )
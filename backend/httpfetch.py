@@ -0,0 +1,403 @@
+"""
+httpfetch.py
+
+Fetch layer shared by the backend scrapers: a plain-HTTP fast path with an
+automatic headless-browser fallback.
+
+Every URL is first tried with a pooled keep-alive httpx client (gzip, and
+brotli when the `brotli` package is installed). If the response looks like
+the script-block/challenge page parliament.nz serves to non-browsers (the
+reason scrape.py was deprecated), the URL is fetched again through
+Playwright instead. Chromium is only launched the first time a fallback is
+actually needed, through a BrowserManager (browsermanager.py) that can be
+shared by every step of a run.
+
+The path that worked is recorded per URL in the `fetch_paths` table so later
+runs go straight to the cheap one. A URL that has never been seen is tried
+over HTTP first. Only a blocked-looking response sends a URL to the
+browser; a network error on the HTTP path is retried like any other failure
+and does not change the recorded path.
+
+Successful responses are kept in the shared on-disk ResponseCache
+(httpcache.py). A cached URL is always revalidated with a conditional HTTP
+request first, so an unchanged page costs a 304 even when its first copy
+had to come through the browser.
+
+Requests are paced per host by a RateController (ratecontrol.py): the
+concurrency for each host grows while responses are healthy and halves on
+429/503/timeouts, and a fetch that fails or comes back 429/5xx is retried
+with jittered exponential backoff before it is given up on.
+
+With NZPT_NET_MODE=record/replay (netarchive.py) both paths are recorded to,
+or served from, the network archive instead.
+
+Requires: pip install "httpx[brotli]" playwright
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import NamedTuple
+from urllib.parse import urlparse
+
+import httpx
+from browsermanager import BrowserManager
+from fetchpool import CONCURRENCY, PagePool
+from httpcache import ResponseCache
+from navprofile import NAV_STATS, goto_ready, install_blocking
+from netarchive import ArchiveTransport, install_archive_routing, open_archive
+from ratecontrol import (
+    MAX_ATTEMPTS,
+    MAX_CONCURRENCY,
+    RETRY_STATUSES,
+    RateController,
+    backoff_delay,
+)
+from schema import connect
+
+DB_PATH = "urgency.sqlite3"
+
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/126.0 Safari/537.36 nzpt-urgency"
+)
+HTTP_TIMEOUT = 20.0
+
+# Statuses that mean "a browser might get through", as opposed to a real 404.
+BLOCK_STATUSES = {401, 403, 429, 503}
+
+# Markers of bot-challenge / script-block interstitials (lower case).
+BLOCK_MARKERS = (
+    "captcha",
+    "cf-chl",
+    "challenge-platform",
+    "just a moment...",
+    "_incapsula_resource",
+    "request unsuccessful",
+    "please enable javascript",
+    "enable javascript and cookies",
+    "access denied",
+)
+
+CHALLENGE_MAX_BYTES = 20_000
+
+VIA_HTTP = "http"
+VIA_BROWSER = "browser"
+
+
+class FetchResult(NamedTuple):
+    url: str
+    status: int
+    text: str
+    via: str
+
+
+class FetchError(Exception):
+    """Raised when a URL could not be fetched by any path."""
+
+
+def looks_blocked(status: int, text: str) -> bool:
+    """
+    True if an HTTP response is a script-block/challenge page rather than
+    the real content.
+    """
+    if status in BLOCK_STATUSES:
+        return True
+    # Challenge pages are small. Real pages can mention e.g. captcha in a
+    # contact form, so only small bodies are checked for the markers.
+    if len(text) > CHALLENGE_MAX_BYTES:
+        return False
+    lowered = text.lower()
+    return any(marker in lowered for marker in BLOCK_MARKERS)
+
+
+def init_fetch_paths_table(db_path: str = DB_PATH):
+    conn = connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS fetch_paths (
+            url TEXT PRIMARY KEY,
+            host TEXT,
+            via TEXT,
+            updated_at TEXT
+        )
+    """)
+    conn.commit()
+    conn.close()
+
+
+class Fetcher:
+    """
+    Shared fetcher. Use as:
+
+        async with Fetcher() as fetcher:
+            html = await fetcher.get_text(url)
+
+    Pass `browsers` to use a BrowserManager owned by the caller (e.g. the
+    nightly orchestrator); otherwise the Fetcher owns its own.
+    """
+
+    def __init__(self, db_path: str = DB_PATH, concurrency: int = CONCURRENCY,
+                 cache: ResponseCache | None = None,
+                 browsers: BrowserManager | None = None,
+                 max_concurrency: int = MAX_CONCURRENCY):
+        self.db_path = db_path
+        self.concurrency = concurrency
+        # Per-host limits start at `concurrency` and adapt up to this
+        self.max_concurrency = max(concurrency, max_concurrency)
+        self.rate = RateController(concurrency, self.max_concurrency)
+        self.cache = cache
+        self.client: httpx.AsyncClient | None = None
+        self._paths: dict[str, str] = {}
+        self._dirty: dict[str, str] = {}
+        self._owns_browsers = browsers is None
+        self.browsers = browsers if browsers is not None else BrowserManager()
+        self._pool: PagePool | None = None
+        self._pool_lock = asyncio.Lock()
+        self.archive = None
+        self.counts = {VIA_HTTP: 0, VIA_BROWSER: 0}
+
+    async def __aenter__(self):
+        init_fetch_paths_table(self.db_path)
+        conn = connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT url, via FROM fetch_paths")
+        self._paths = dict(cursor.fetchall())
+        conn.close()
+
+        self.archive = open_archive()
+        if self.cache is None:
+            # Record/replay needs full responses, not 304s from the shared cache
+            self.cache = ResponseCache(":memory:") if self.archive else ResponseCache()
+
+        transport = None
+        if self.archive is not None:
+            transport = ArchiveTransport(self.archive, httpx.AsyncHTTPTransport())
+
+        self.client = httpx.AsyncClient(
+            transport=transport,
+            headers={"User-Agent": USER_AGENT},
+            follow_redirects=True,
+            timeout=HTTP_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency * 2,
+                max_keepalive_connections=self.max_concurrency * 2,
+            ),
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._save_paths()
+        self.cache.report()
+        self.cache.close()
+        await self.client.aclose()
+        await self.close_pages()
+        if self._owns_browsers:
+            await self.browsers.close()
+        if self.archive is not None:
+            self.archive.report()
+            self.archive.close()
+        print(
+            f"Fetcher: {self.counts[VIA_HTTP]} pages over HTTP, "
+            f"{self.counts[VIA_BROWSER]} through the browser."
+        )
+        self.rate.report()
+        NAV_STATS.report()
+
+    def _save_paths(self):
+        if not self._dirty:
+            return
+        now = datetime.now().isoformat(timespec="seconds")
+        conn = connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.executemany(
+            "INSERT INTO fetch_paths (url, host, via, updated_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(url) DO UPDATE SET via = excluded.via, updated_at = excluded.updated_at",
+            [(url, urlparse(url).netloc, via, now) for url, via in self._dirty.items()],
+        )
+        conn.commit()
+        conn.close()
+        self._dirty = {}
+
+    def _remember(self, url: str, via: str):
+        if self._paths.get(url) != via:
+            self._dirty[url] = via
+        self._paths[url] = via
+
+    def preferred_path(self, url: str) -> str:
+        """The path to try first for `url`: whatever worked last time, else HTTP."""
+        return self._paths.get(url, VIA_HTTP)
+
+    async def _page_pool(self) -> PagePool:
+        async with self._pool_lock:
+            if self._pool is None:
+                self._pool = await PagePool(
+                    self.browsers, self.concurrency, setup=self._setup_context
+                ).__aenter__()
+        return self._pool
+
+    async def _setup_context(self, context):
+        await install_archive_routing(context, self.archive)
+        await install_blocking(context)
+
+    async def close_pages(self):
+        """
+        Close the fallback pages' contexts (keeping their cookies in the
+        BrowserManager). The next fallback opens fresh contexts, so each
+        pipeline step gets its own.
+        """
+        async with self._pool_lock:
+            if self._pool is not None:
+                await self._pool.__aexit__(None, None, None)
+                self._pool = None
+
+    async def fetch_http(self, url: str, cached=None) -> FetchResult:
+        """
+        Plain-HTTP fetch. With a `cached` entry the request is conditional,
+        and a 304 is answered from the cache.
+        """
+        async with self.rate.slot(url) as attempt:
+            response = await self.client.get(url, headers=self.cache.conditional_headers(cached))
+            attempt.status = response.status_code
+            attempt.bytes = len(response.content)
+        if response.status_code == 304 and cached is not None:
+            self.cache.touch(url)
+            return FetchResult(url, cached.status, cached.text, VIA_HTTP)
+
+        result = FetchResult(str(response.url), response.status_code, response.text, VIA_HTTP)
+        if 200 <= result.status < 300 and not looks_blocked(result.status, result.text):
+            self.cache.put(url, result.status, response.headers, result.text)
+        return result
+
+    async def fetch_browser(self, url: str, ready_selector: str | None = None) -> FetchResult:
+        pool = await self._page_pool()
+        async with pool.page() as page:
+            async with self.rate.slot(url) as attempt:
+                response = await goto_ready(page, url, ready_selector)
+                attempt.status = response.status if response else None
+            status = response.status if response else 0
+            if status in BLOCK_STATUSES and ready_selector and await page.query_selector(ready_selector):
+                # The challenge page reloaded into the real one
+                status = 200
+            content_type = (response.headers.get("content-type", "") if response else "")
+            if response is not None and "xml" in content_type:
+                # Chromium wraps XML in its viewer; keep the raw feed.
+                text = await response.text()
+            else:
+                text = await page.content()
+            final_url = page.url
+
+        if 200 <= status < 300:
+            self.cache.put(url, status, response.headers if response else {}, text)
+        return FetchResult(final_url, status, text, VIA_BROWSER)
+
+    async def fetch(self, url: str, ready_selector: str | None = None) -> FetchResult:
+        """
+        Fetch `url` by the cheapest path that works, retrying failures and
+        429/5xx responses up to MAX_ATTEMPTS times with jittered backoff.
+        Returns the FetchResult (which may carry a 404 or a final 5xx);
+        raises FetchError if every attempt failed. `ready_selector` is what
+        the browser path waits for before reading the page (see navprofile).
+        """
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            try:
+                result = await self._fetch_once(url, ready_selector)
+            except FetchError as e:
+                if attempt == MAX_ATTEMPTS:
+                    raise
+                reason = str(e)
+            else:
+                if result.status not in RETRY_STATUSES or attempt == MAX_ATTEMPTS:
+                    return result
+                reason = f"HTTP {result.status}"
+
+            delay = backoff_delay(attempt)
+            self.rate.record_retry(url)
+            print(f"  Retrying {url} in {delay:.1f}s (attempt {attempt + 1}/{MAX_ATTEMPTS}): {reason}")
+            await asyncio.sleep(delay)
+
+    async def _fetch_once(self, url: str, ready_selector: str | None = None) -> FetchResult:
+        cached = self.cache.get(url)
+        if self.preferred_path(url) == VIA_HTTP or cached is not None:
+            try:
+                result = await self.fetch_http(url, cached)
+            except httpx.HTTPError as e:
+                # A timeout or reset says nothing about blocking: retry over
+                # HTTP (fetch() backs off) and keep the URL's recorded path
+                raise FetchError(f"{url}: {e}") from e
+            if not looks_blocked(result.status, result.text):
+                self._remember(url, VIA_HTTP)
+                self.counts[VIA_HTTP] += 1
+                return result
+            print(f"  {url} looks script-blocked over HTTP ({result.status}); using the browser")
+
+        try:
+            result = await self.fetch_browser(url, ready_selector)
+        except Exception as e:
+            raise FetchError(f"{url}: {e}") from e
+
+        self._remember(url, VIA_BROWSER)
+        self.counts[VIA_BROWSER] += 1
+        return result
+
+    async def probe(self, url: str, ready_selector: str | None = None) -> int:
+        """
+        Cheap existence check: the status of a HEAD request (no body). If HEAD
+        is refused or looks blocked, falls back to a full fetch() and returns
+        its status. Raises FetchError if the URL could not be reached at all.
+        """
+        try:
+            async with self.rate.slot(url) as attempt:
+                response = await self.client.head(url)
+                attempt.status = response.status_code
+            status = response.status_code
+        except httpx.HTTPError as e:
+            print(f"  HEAD failed for {url}: {e}; fetching it instead")
+            status = None
+
+        if status is None or status in BLOCK_STATUSES or status in (405, 501):
+            return (await self.fetch(url, ready_selector)).status
+        self.counts[VIA_HTTP] += 1
+        return status
+
+    async def get_text(self, url: str, ready_selector: str | None = None) -> str:
+        """Fetch `url` and return its body, raising FetchError on a non-2xx status."""
+        result = await self.fetch(url, ready_selector)
+        if not 200 <= result.status < 300:
+            raise FetchError(f"{url}: HTTP {result.status}")
+        return result.text
+
+    async def evaluate_html(self, url: str, html: str, scripts: list[str], arg=None) -> list:
+        """
+        Load already-fetched `html` into a fallback page at `url` (served
+        from memory, so `a.href` resolves as on the live site and nothing is
+        fetched for the document itself) and return the result of each of
+        `scripts` run with page.evaluate(script, arg). Used by the JS
+        extractors (jsextractors.py).
+        """
+        async def serve(route):
+            await route.fulfill(status=200, content_type="text/html; charset=utf-8", body=html)
+
+        def is_document(request_url: str) -> bool:
+            return request_url == url
+
+        pool = await self._page_pool()
+        async with pool.page() as page:
+            await page.route(is_document, serve)
+            try:
+                await page.goto(url, wait_until="domcontentloaded")
+                return [await page.evaluate(script, arg) for script in scripts]
+            finally:
+                await page.unroute(is_document, serve)
+
+
+@asynccontextmanager
+async def open_fetcher(fetcher: Fetcher | None = None, **kwargs):
+    """
+    Yield `fetcher` if a step was handed one (it stays open for the next
+    step), otherwise a new Fetcher(**kwargs) for a standalone run.
+    """
+    if fetcher is not None:
+        yield fetcher
+        return
+    async with Fetcher(**kwargs) as own:
+        yield own
@@ -0,0 +1,169 @@
+"""
+jsextractors.py
+
+The in-page JavaScript extractors the scrapers used to run with
+page.evaluate() (billcounter, scrapewebpage, scrape-legacy, billdetails,
+lbilldetails), kept as a fallback for their htmlextract.py ports until
+check-extractor-parity.py has passed on real parliament.nz pages.
+
+Set NZPT_JS_EXTRACTORS=1 to have billdetails.py, lbilldetails.py,
+listingcrawler.py and pagepipeline.py run these in a browser page on the
+HTML they fetched (Fetcher.evaluate_html), instead of the Python ports.
+Pages are still fetched the usual way; only the parsing moves.
+
+INTRODUCED_BILL_HREFS_JS takes BILL_URL_ARG as its page.evaluate()
+argument, so it picks bill links with the same test as
+siteconfig.is_bill_url() (host contains the NZPT_BILLS_URL host, path
+starts with its path).
+"""
+import os
+from urllib.parse import urlparse
+
+from siteconfig import BILLS_HOST, BILLS_URL
+
+USE_JS = os.environ.get("NZPT_JS_EXTRACTORS") == "1"
+
+# page.evaluate() argument of INTRODUCED_BILL_HREFS_JS
+BILL_URL_ARG = {"host": BILLS_HOST, "path": urlparse(BILLS_URL).path}
+
+LISTING_ROWS_JS = """
+() => {
+  const rows = Array.from(
+    document.querySelectorAll("table.table--list tbody tr.list__row")
+  );
+  return rows.map(row => {
+    const link = row.querySelector("a.list__cell-heading");
+    const cells = row.querySelectorAll("td.list__cell");
+    const dateCell = cells.length > 1 ? cells[1] : null;
+    return {
+      href: link ? link.getAttribute("href") : null,
+      titleText: link ? link.textContent.trim() : null,
+      dateText: dateCell ? dateCell.textContent.trim() : null
+    };
+  });
+}
+"""
+
+INTRODUCED_BILL_HREFS_JS = """
+(bills) => {
+  const results = [];
+
+  const isBillUrl = href => {
+    try {
+      const url = new URL(href);
+      return url.host.includes(bills.host) && url.pathname.startsWith(bills.path);
+    } catch (e) {
+      return false;
+    }
+  };
+
+  const h3s = Array.from(document.querySelectorAll('h3'));
+  const introH3s = h3s.filter(h3 =>
+    h3.textContent.trim().toLowerCase().includes('introduction of bills')
+  );
+  if (!introH3s.length) {
+    return results;
+  }
+
+  for (const h3 of introH3s) {
+    let node = h3.nextSibling;
+    while (node) {
+      if (node.nodeType === Node.ELEMENT_NODE &&
+          node.tagName.toLowerCase() === 'h3') {
+        // reached the next section
+        break;
+      }
+
+      if (node.nodeType === Node.ELEMENT_NODE) {
+        const el = node;
+        const links = el.querySelectorAll('a');
+        links.forEach(a => {
+          const text = (a.textContent || '').trim();
+          const href = (a.href || '').trim();
+          if (!href || !text) return;
+
+          if (isBillUrl(href) && text.toLowerCase().includes('bill')) {
+            results.push(href);
+          }
+        });
+      }
+
+      node = node.nextSibling;
+    }
+  }
+
+  return results;
+}
+"""
+
+MEMBER_IN_CHARGE_JS = """
+() => {
+  const ths = Array.from(document.querySelectorAll('th'));
+  const th = ths.find(t => t.textContent.trim().startsWith('Member(s) in charge:'));
+  if (!th) return null;
+  const td = th.nextElementSibling;
+  if (!td) return null;
+  const raw = td.textContent.trim();
+  if (!raw) return null;
+
+  // If there are multiple MPs, return only the first
+  let first = raw.split(',')[0];
+  if (first.includes(' and ')) {
+    first = first.split(' and ')[0];
+  }
+  first = first.trim();
+  return first || null;
+}
+"""
+
+BILL_DESCRIPTION_JS = """
+() => {
+  const genericText =
+    'Bills are proposals to make a new law or to change an existing one. ' +
+    'Only Parliament can pass a bill. Each bill goes through several stages, ' +
+    'giving MPs and the public the chance to have their say.';
+
+  const ps = Array.from(document.querySelectorAll('p'));
+  const generic = ps.find(p => p.textContent.trim().startsWith('Bills are proposals to make a new law'));
+  if (!generic) return null;
+
+  // Look at subsequent siblings for the specific bill description
+  let node = generic.nextSibling;
+  while (node) {
+    if (node.nodeType === Node.TEXT_NODE) {
+      const text = node.textContent.trim();
+      if (text && text !== genericText) {
+        return text;
+      }
+    } else if (node.nodeType === Node.ELEMENT_NODE) {
+      const text = node.textContent.trim();
+      if (text && text !== genericText) {
+        return text;
+      }
+    }
+    node = node.nextSibling;
+  }
+
+  return null;
+}
+"""
+
+
+async def listing_rows_js(fetcher, url: str, html: str) -> list[dict]:
+    """Browser equivalent of htmlextract.listing_rows()."""
+    (rows,) = await fetcher.evaluate_html(url, html, [LISTING_ROWS_JS])
+    return rows
+
+
+async def introduced_bill_hrefs_js(fetcher, url: str, html: str) -> list[str]:
+    """Browser equivalent of htmlextract.introduced_bill_hrefs()."""
+    (hrefs,) = await fetcher.evaluate_html(url, html, [INTRODUCED_BILL_HREFS_JS], BILL_URL_ARG)
+    return [h for h in hrefs if h]
+
+
+async def bill_details_js(fetcher, url: str, html: str) -> tuple[str | None, str | None]:
+    """Browser equivalent of htmlextract.bill_details()."""
+    mps, desc = await fetcher.evaluate_html(url, html, [MEMBER_IN_CHARGE_JS, BILL_DESCRIPTION_JS])
+    if isinstance(desc, str):
+        desc = " ".join(desc.split())
+    return mps, desc
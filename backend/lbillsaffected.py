@@ -1,46 +1,16 @@
 # lbillsaffected.py
 import asyncio
-import sqlite3
-from datetime import datetime, date
-import re
+from datetime import datetime
+from functools import partial
 
-from playwright.async_api import async_playwright
+from fetchpool import CONCURRENCY, map_items
+from httpfetch import Fetcher
+from markupversions import extract_urgency_bills, load_versions, write_version
+from navprofile import READY_DAILY_PROGRESS
+from schema import connect, init_lbills_table, init_tables, upsert_lbills
+from siteconfig import build_daily_progress_url
 
 DB_PATH = "urgency.sqlite3"
-BASE_URL = "https://www3.parliament.nz"
-
-
-def init_lbills_table():
-    """
-    Ensure the `lbills` table exists with columns (bill_name, url, pnum)
-    and a UNIQUE index on url. If the table already exists but is missing
-    `pnum`, add it.
-    """
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS lbills (
-            id INTEGER PRIMARY KEY,
-            bill_name TEXT,
-            url TEXT,
-            pnum INTEGER
-        )
-    """)
-
-    # Check existing columns
-    cursor.execute("PRAGMA table_info(lbills)")
-    cols = {row[1] for row in cursor.fetchall()}
-
-    if "pnum" not in cols:
-        cursor.execute("ALTER TABLE lbills ADD COLUMN pnum INTEGER")
-
-    cursor.execute("""
-        CREATE UNIQUE INDEX IF NOT EXISTS idx_lbills_url ON lbills(url)
-    """)
-
-    conn.commit()
-    conn.close()
 
 
 def get_legacy_urgent_dates():
@@ -48,7 +18,7 @@ def get_legacy_urgent_dates():
     Read all (date, pnum) from `legacy` where in_urgency = 1.
     Returns a list of (datetime.date, pnum).
     """
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect(DB_PATH)
     cursor = conn.cursor()
     cursor.execute("SELECT date, pnum FROM legacy WHERE in_urgency = 1")
     rows = cursor.fetchall()
@@ -64,51 +34,26 @@ def get_legacy_urgent_dates():
     return result
 
 
-def build_daily_progress_url(d: date) -> str:
-    weekday = d.strftime("%A").lower()      # 'tuesday'
-    day = str(d.day)                        # '9'
-    month = d.strftime("%B").lower()        # 'december'
-    year = d.year
-
-    slug = f"daily-progress-for-{weekday}-{day}-{month}-{year}"
-    return f"{BASE_URL}/en/pb/daily-progress-in-the-house/{slug}"
-
-
-def extract_bills_from_urgency_section(html_content: str):
+async def scrape_legacy_urgent_day(fetcher, version_hints: dict, item):
     """
-    Extract bill names and URLs from the urgency section.
-    Returns a list of (bill_name, url) tuples.
+    Return ((bill_name, url) list, markup version) for one legacy urgent
+    sitting, or None on failure.
     """
-    bills = []
+    d, pnum = item
+    url = build_daily_progress_url(d)
+    print(f"Scraping bills for {d} (P{pnum}) -> {url}")
+    try:
+        content = await fetcher.get_text(url, READY_DAILY_PROGRESS)
+    except Exception as e:
+        print(f"  Failed to load {url}: {e}")
+        return None
 
-    urgency_pattern = (
-        r"<h3>\s*Urgency\s*</h3>(.*?)"
-        r"<h3>[^<]*Government business.*?</h3>"
-    )
-    m = re.search(urgency_pattern, html_content, re.DOTALL | re.IGNORECASE)
-    if not m:
-        return bills
+    bills, version = extract_urgency_bills(content, version_hints.get(d.isoformat()))
+    print(f"  Found {len(bills)} bills in urgency section for {d} ({version or 'unknown'} markup)")
+    return bills, version
 
-    urgency_section = m.group(1)
 
-    link_pattern = r'<a[^>]+href="([^"]+)"[^>]*>(.*?)</a>'
-    links = re.findall(link_pattern, urgency_section, re.DOTALL | re.IGNORECASE)
-
-    for url, raw_text in links:
-        url = url.strip()
-
-        text_no_tags = re.sub(r"<.*?>", "", raw_text, flags=re.DOTALL)
-        bill_name = " ".join(text_no_tags.split()).strip()
-
-        if not bill_name or not url:
-            continue
-
-        bills.append((bill_name, url))
-
-    return bills
-
-
-async def scrape_lbills_for_legacy():
+async def scrape_lbills_for_legacy(concurrency: int = CONCURRENCY):
     legacy_dates = get_legacy_urgent_dates()
     if not legacy_dates:
         print("No urgent sittings recorded in `legacy`; nothing to do.")
@@ -117,45 +62,43 @@ async def scrape_lbills_for_legacy():
     print(f"Found {len(legacy_dates)} legacy urgent dates in DB.")
     legacy_dates.sort(key=lambda tup: tup[0])
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
-
-        all_bills: list[tuple[str, str, int]] = []
-
-        for d, pnum in legacy_dates:
-            url = build_daily_progress_url(d)
-            print(f"Scraping bills for {d} (P{pnum}) -> {url}")
-            try:
-                await page.goto(url, wait_until="networkidle")
-                content = await page.content()
-            except Exception as e:
-                print(f"  Failed to load {url}: {e}")
-                continue
+    version_hints = load_versions(DB_PATH)
+    async with Fetcher(db_path=DB_PATH, concurrency=concurrency) as fetcher:
+        per_day = await map_items(
+            legacy_dates, partial(scrape_legacy_urgent_day, fetcher, version_hints),
+            fetcher.max_concurrency,
+        )
 
-            bills = extract_bills_from_urgency_section(content)
-            print(f"  Found {len(bills)} bills in urgency section")
-            for bill_name, bill_url in bills:
-                all_bills.append((bill_name, bill_url, pnum))
+    all_bills: list[tuple[str, str, int]] = []
+    versions: list[tuple[str, str]] = []
+    for (d, pnum), result in zip(legacy_dates, per_day):
+        if result is None:
+            continue
+        bills, version = result
+        versions.append((d.isoformat(), version))
+        for bill_name, bill_url in bills:
+            all_bills.append((bill_name, bill_url, pnum))
 
-        await browser.close()
+    conn = connect(DB_PATH)
+    cursor = conn.cursor()
+    for sitting_date, version in versions:
+        write_version(cursor, sitting_date, version)
+    conn.commit()
+    conn.close()
 
     if all_bills:
-        conn = sqlite3.connect(DB_PATH)
+        conn = connect(DB_PATH)
         cursor = conn.cursor()
-        cursor.executemany(
-            "INSERT OR IGNORE INTO lbills (bill_name, url, pnum) VALUES (?, ?, ?)",
-            all_bills,
-        )
+        upsert_lbills(cursor, all_bills)
         conn.commit()
         conn.close()
-        print(f"Tried to insert {len(all_bills)} legacy bills (duplicates ignored).")
+        print(f"Upserted {len(all_bills)} legacy bills.")
     else:
         print("No legacy bills extracted; nothing to insert.")
 
 
 async def main():
-    init_lbills_table()
+    init_tables(init_lbills_table, db_path=DB_PATH)
     await scrape_lbills_for_legacy()
 
 
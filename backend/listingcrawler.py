@@ -0,0 +1,479 @@
+"""
+listingcrawler.py
+
+Shared crawler for the "Daily Progress in the House" listing pages.
+
+Every sitting day seen on the listing is kept in a `sitting_days` frontier
+table inside urgency.sqlite3:
+    - `date` (TEXT): The sitting date, taken from the row title.
+    - `url` (TEXT, UNIQUE): The daily-progress page for that sitting.
+    - `last_updated` (TEXT): The listing's "Last updated" column.
+    - `status` (TEXT): 'pending', 'done' or 'failed' for the page fetch.
+    - `fetched_at` (TEXT): When the page was last fetched.
+
+The listing is newest -> oldest, so a refresh walks from page 1 and stops at
+the first row it already knows (same URL, same "Last updated"). A daily run
+therefore touches one or two listing pages instead of dozens. The first run,
+or a run asking for dates older than anything crawled so far, does a deep
+crawl back to the requested date and records how far back the table is
+complete in `crawl_state`.
+
+Listing pages are fetched in parallel windows that gallop: 1 page for an
+incremental refresh (4 for a deep crawl), then twice as many each round,
+capped by an estimate of how many pages are left to reach the cutoff date.
+Pages are still processed in order, and as soon as one of them reaches the
+cutoff the fetches for the pages after it are cancelled.
+
+Historic date ranges (e.g. scrape-legacy.py's Parliaments) don't need the
+listing walked from page 1: crawl_listing_ranges() binary-searches for the
+pages that bracket each range and fetches just those, all ranges at once.
+
+With NZPT_DISCOVERY=calendar, collect_listing_items() skips the listing
+altogether and finds sitting days by probing date-derived URLs
+(calendarprobe.py).
+"""
+import asyncio
+import math
+import os
+from datetime import datetime, date, timedelta
+
+from calendarprobe import probe_sitting_days
+from htmlextract import listing_rows
+from httpfetch import FetchError
+from jsextractors import USE_JS, listing_rows_js
+from navprofile import READY_LISTING
+from schema import connect
+from siteconfig import BASE_URL, LIST_URL
+
+DB_PATH = "urgency.sqlite3"
+
+# Safety upper bound; the listing went back to page 78 when the 52nd
+# Parliament backfill was written. Raise NZPT_MAX_LIST_PAGES for bigger
+# (e.g. fakeparliament.py) listings.
+MAX_LIST_PAGES = int(os.environ.get("NZPT_MAX_LIST_PAGES", "80"))
+
+# 'listing' (paginate the listing) or 'calendar' (probe derived URLs)
+DISCOVERY = os.environ.get("NZPT_DISCOVERY", "listing")
+
+# First window of listing pages fetched in parallel
+INCREMENTAL_WINDOW = 1
+DEEP_WINDOW = 4
+
+
+def init_frontier_table(db_path: str = DB_PATH):
+    """
+    Ensure the `sitting_days` frontier table and the `crawl_state`
+    key/value table exist.
+    """
+    conn = connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sitting_days (
+            id INTEGER PRIMARY KEY,
+            date TEXT,
+            url TEXT,
+            last_updated TEXT,
+            status TEXT DEFAULT 'pending',
+            fetched_at TEXT
+        )
+    """)
+    cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_sitting_days_url ON sitting_days(url)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_sitting_days_date ON sitting_days(date)
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS crawl_state (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+    """)
+    conn.commit()
+    conn.close()
+
+
+def parse_listing_date(date_text: str):
+    """
+    Dates on listing pages look like '17 December 2025' (with &nbsp;).
+    """
+    if not date_text:
+        return None
+    cleaned = date_text.replace("\xa0", " ").strip()
+    try:
+        return datetime.strptime(cleaned, "%d %B %Y").date()
+    except ValueError:
+        return None
+
+
+def parse_title_date(title_text: str):
+    """
+    Row titles look like 'Daily progress for Tuesday, 30 June 2026'.
+    This is the actual sitting date. The listing's second column is
+    'Last updated', which is a different date and must not be used
+    as the sitting date.
+    """
+    if not title_text:
+        return None
+    if "," not in title_text:
+        return None
+    date_part = title_text.rsplit(",", 1)[-1]
+    return parse_listing_date(date_part)
+
+
+def listing_page_url(page_num: int) -> str:
+    """Page 1 is the bare listing URL; later pages use ?page=N."""
+    if page_num == 1:
+        return LIST_URL
+    return f"{LIST_URL}?page={page_num}"
+
+
+async def fetch_listing_rows(fetcher, page_num: int):
+    """
+    Fetch one listing page and return its rows as a list of
+    (sitting_date, full_url, last_updated_text). Rows whose title does not
+    carry a parseable date are dropped. A page past the end of the listing
+    has no rows (whether it comes back empty or as a 404).
+    """
+    url = listing_page_url(page_num)
+    print(f"Listing page {page_num}: {url}")
+    result = await fetcher.fetch(url, READY_LISTING)
+    if result.status == 404:
+        return []
+    if not 200 <= result.status < 300:
+        raise FetchError(f"{url}: HTTP {result.status}")
+    if USE_JS:
+        raw_rows = await listing_rows_js(fetcher, url, result.text)
+    else:
+        raw_rows = listing_rows(result.text)
+
+    rows = []
+    for r in raw_rows:
+        href = r.get("href")
+        sitting_date = parse_title_date(r.get("titleText"))
+        if not href or not sitting_date:
+            continue
+        last_updated = (r.get("dateText") or "").replace("\xa0", " ").strip()
+        rows.append((sitting_date, BASE_URL + href, last_updated))
+    return rows
+
+
+def _get_state(cursor, key: str):
+    cursor.execute("SELECT value FROM crawl_state WHERE key = ?", (key,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def _set_state(cursor, key: str, value: str):
+    cursor.execute(
+        "INSERT INTO crawl_state (key, value) VALUES (?, ?) "
+        "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+        (key, value),
+    )
+
+
+def _known_rows(cursor) -> dict[str, str]:
+    """Return {url: last_updated} for every row already in the frontier."""
+    cursor.execute("SELECT url, last_updated FROM sitting_days")
+    return {url: last_updated for url, last_updated in cursor.fetchall()}
+
+
+def _upsert_rows(cursor, rows):
+    """
+    Insert new frontier rows. A row whose "Last updated" changed is reset to
+    'pending' so the page gets fetched again.
+    """
+    cursor.executemany(
+        """
+        INSERT INTO sitting_days (date, url, last_updated, status)
+        VALUES (?, ?, ?, 'pending')
+        ON CONFLICT(url) DO UPDATE SET
+            date = excluded.date,
+            last_updated = excluded.last_updated,
+            status = CASE
+                WHEN sitting_days.last_updated IS excluded.last_updated
+                THEN sitting_days.status
+                ELSE 'pending'
+            END
+        """,
+        [(d.isoformat(), u, lu) for d, u, lu in rows],
+    )
+
+
+async def refresh_frontier(fetcher, since: date, db_path: str = DB_PATH,
+                           max_pages: int = MAX_LIST_PAGES):
+    """
+    Bring the `sitting_days` frontier up to date for sittings on/after `since`.
+
+    If the frontier is already complete back to `since`, pagination stops at
+    the first row that is already known and unchanged. Otherwise the crawl
+    keeps going until it reaches dates older than `since`.
+    Returns the number of listing pages processed.
+    """
+    init_frontier_table(db_path)
+    conn = connect(db_path)
+    cursor = conn.cursor()
+
+    known = _known_rows(cursor)
+    complete_since = _get_state(cursor, "complete_since")
+    deep = complete_since is None or since.isoformat() < complete_since
+    if deep:
+        print(f"Frontier not complete back to {since}; doing a deep crawl.")
+
+    pages_loaded = 0
+    rounds = 0
+    reached_end = False
+    stop = False
+    newest_seen = oldest_seen = None
+
+    next_page = 1
+    window = DEEP_WINDOW if deep else INCREMENTAL_WINDOW
+    while not stop and next_page <= max_pages:
+        page_nums = list(range(next_page, min(next_page + window, max_pages + 1)))
+        tasks = [asyncio.create_task(fetch_listing_rows(fetcher, n)) for n in page_nums]
+        rounds += 1
+
+        try:
+            for task in tasks:
+                rows = await task
+                pages_loaded += 1
+
+                if not rows:
+                    print("No rows found on this listing page; assuming end of results.")
+                    reached_end = stop = True
+                    break
+
+                new_rows = []
+                hit_known = False
+                reached_older_than_since = False
+
+                for sitting_date, url, last_updated in rows:
+                    newest_seen = max(newest_seen or sitting_date, sitting_date)
+                    oldest_seen = min(oldest_seen or sitting_date, sitting_date)
+                    if sitting_date < since:
+                        reached_older_than_since = True
+                        continue
+                    if not deep and known.get(url) == last_updated:
+                        hit_known = True
+                        break
+                    new_rows.append((sitting_date, url, last_updated))
+
+                _upsert_rows(cursor, new_rows)
+                conn.commit()
+                print(f"  {len(new_rows)} new or updated sitting days on this page")
+
+                if hit_known:
+                    print("Reached a sitting day already in the frontier; stopping pagination.")
+                    stop = True
+                    break
+                if reached_older_than_since:
+                    print(f"Reached dates older than {since}; stopping pagination.")
+                    reached_end = stop = True
+                    break
+        finally:
+            # Pages past the cutoff (or after a failure) are not needed
+            pending = [t for t in tasks if not t.done()]
+            for t in pending:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if pending:
+                print(f"  Cancelled {len(pending)} listing page fetches past the cutoff")
+
+        next_page += len(page_nums)
+        window = _next_window(window, since, newest_seen, oldest_seen, pages_loaded)
+
+    if deep and reached_end:
+        _set_state(cursor, "complete_since", since.isoformat())
+        conn.commit()
+
+    conn.close()
+    print(f"Processed {pages_loaded} listing pages in {rounds} parallel rounds.")
+    return pages_loaded
+
+
+def _next_window(window: int, since: date, newest_seen, oldest_seen, pages_loaded: int) -> int:
+    """
+    Double the window, but not beyond the number of pages the dates seen so
+    far suggest are left before `since` (plus one for slack).
+    """
+    doubled = window * 2
+    if not oldest_seen or oldest_seen <= since or newest_seen == oldest_seen:
+        return doubled
+    days_per_page = (newest_seen - oldest_seen).days / pages_loaded
+    pages_left = math.ceil((oldest_seen - since).days / days_per_page)
+    return max(1, min(doubled, pages_left + 1))
+
+
+def frontier_items(since: date, until: date | None = None,
+                   status: str | None = None, db_path: str = DB_PATH):
+    """
+    Return [(sitting_date, url)] from the frontier for sittings in
+    [since, until], oldest first. Optionally filter by fetch status.
+    """
+    query = "SELECT date, url FROM sitting_days WHERE date >= ?"
+    params: list = [since.isoformat()]
+    if until is not None:
+        query += " AND date <= ?"
+        params.append(until.isoformat())
+    if status is not None:
+        query += " AND status = ?"
+        params.append(status)
+    query += " ORDER BY date, url"
+
+    conn = connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+    conn.close()
+
+    return [(datetime.strptime(d, "%Y-%m-%d").date(), u) for d, u in rows]
+
+
+async def discover_frontier(fetcher, since: date, until: date | None = None,
+                            db_path: str = DB_PATH):
+    """
+    Add sitting days in [since, until] to the frontier by probing the URLs
+    derived from candidate dates instead of paginating the listing. Days
+    already in the frontier are not probed and are left as they are.
+    Returns the number of sitting days found.
+    """
+    init_frontier_table(db_path)
+    conn = connect(db_path)
+    cursor = conn.cursor()
+    known = _known_rows(cursor)
+
+    found = await probe_sitting_days(fetcher, since, until, skip_urls=known, db_path=db_path)
+    cursor.executemany(
+        "INSERT OR IGNORE INTO sitting_days (date, url, status) VALUES (?, ?, 'pending')",
+        [(d.isoformat(), url) for d, url in found],
+    )
+    conn.commit()
+    conn.close()
+    return len(found)
+
+
+async def collect_listing_items(fetcher, since: date, until: date | None = None,
+                                db_path: str = DB_PATH):
+    """
+    Refresh the frontier incrementally, then return [(sitting_date, url)]
+    for all sitting days in [since, until], oldest first.
+    """
+    if DISCOVERY == "calendar":
+        await discover_frontier(fetcher, since, until, db_path=db_path)
+    else:
+        await refresh_frontier(fetcher, since, db_path=db_path)
+    items = frontier_items(since, until, db_path=db_path)
+    print(f"Collected {len(items)} listing items on/after {since}")
+    return items
+
+
+class ListingPages:
+    """
+    Listing pages fetched at most once per run. Concurrent seeks asking for
+    the same page share one fetch.
+    """
+
+    def __init__(self, fetcher):
+        self.fetcher = fetcher
+        self._tasks: dict[int, asyncio.Future] = {}
+
+    def rows(self, page_num: int):
+        """Awaitable of fetch_listing_rows() for `page_num`."""
+        if page_num not in self._tasks:
+            self._tasks[page_num] = asyncio.ensure_future(fetch_listing_rows(self.fetcher, page_num))
+        return self._tasks[page_num]
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def cancel(self):
+        """Drop fetches nobody is waiting for any more."""
+        for task in self._tasks.values():
+            task.cancel()
+
+
+async def seek_listing_page(pages: ListingPages, target: date,
+                            max_pages: int = MAX_LIST_PAGES) -> int:
+    """
+    Binary-search the listing (newest first) for the first page whose oldest
+    sitting date is on/before `target`. Returns max_pages + 1 if no page is.
+    Pages past the end of the listing are empty and count as "before".
+    """
+    lo, hi = 1, max_pages + 1
+    while lo < hi:
+        mid = (lo + hi) // 2
+        rows = await pages.rows(mid)
+        if not rows or min(r[0] for r in rows) <= target:
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
+async def _crawl_range(pages: ListingPages, start: date, end: date, max_pages: int):
+    """
+    (rows, complete): the rows of the listing pages covering [start, end],
+    filtered to the range, and False if the range runs past max_pages so
+    only its newer part was loaded.
+    """
+    first, last = await asyncio.gather(
+        seek_listing_page(pages, end, max_pages),
+        # The first page with anything older than `start` may still hold
+        # the start of the range, so it is included.
+        seek_listing_page(pages, start - timedelta(days=1), max_pages),
+    )
+    complete = last <= max_pages
+    last = min(last, max_pages)
+    print(f"Range {start} to {end}: listing pages {first}-{last}")
+
+    page_rows = await asyncio.gather(*(pages.rows(n) for n in range(first, last + 1)))
+    rows = [
+        row for rows in page_rows for row in rows
+        if start <= row[0] <= end
+    ]
+    return rows, complete
+
+
+async def crawl_listing_ranges(fetcher, ranges, db_path: str = DB_PATH,
+                               max_pages: int = MAX_LIST_PAGES):
+    """
+    Add every sitting day in each (start, end) range to the frontier,
+    loading only the listing pages that cover the ranges. The ranges are
+    crawled concurrently; a range crawled in full before is skipped. A
+    range that runs past `max_pages` is loaded up to it and not marked as
+    crawled, so it is tried again next time.
+    Returns the number of listing pages loaded.
+    """
+    init_frontier_table(db_path)
+    conn = connect(db_path)
+    cursor = conn.cursor()
+
+    todo = []
+    for start, end in ranges:
+        if _get_state(cursor, f"range:{start}:{end}"):
+            print(f"Range {start} to {end} already in the frontier.")
+        else:
+            todo.append((start, end))
+
+    pages = ListingPages(fetcher)
+    try:
+        results = await asyncio.gather(*(
+            _crawl_range(pages, start, end, max_pages) for start, end in todo
+        ))
+    finally:
+        pages.cancel()
+
+    for (start, end), (rows, complete) in zip(todo, results):
+        _upsert_rows(cursor, rows)
+        print(f"  {len(rows)} sitting days between {start} and {end}")
+        if complete:
+            _set_state(cursor, f"range:{start}:{end}", datetime.now().isoformat(timespec="seconds"))
+        else:
+            # Not marked as crawled, so the next run tries the whole range again
+            print(f"  WARNING: range {start} to {end} goes past listing page {max_pages}; "
+                  f"only the part up to that page was loaded.")
+    conn.commit()
+    conn.close()
+
+    print(f"Loaded {len(pages)} listing pages for {len(todo)} date ranges.")
+    return len(pages)
@@ -0,0 +1,185 @@
+"""
+markupversions.py
+
+Registry of the daily-progress page markups the site has used, so each page
+goes straight to the parser written for it.
+
+Between March and May 2026 (see determine-changeover.py) the headings
+changed from <h3>Urgency</h3> to <h3><span>Urgency</span></h3> and the list
+items gained a <span>. Each MarkupVersion has:
+    - `heading`: the exact form of its Urgency heading, which is also its
+      fingerprint: a page is of this version if its Urgency heading (found
+      by htmlextract.find_urgency_heading()) is written this way,
+    - `terminator`: the exact form of the Government business heading that
+      ends the urgency section (the heading must start with a match),
+    - `layout`: any heading of this markup, for telling the versions apart
+      on pages with no Urgency heading (determine-changeover.py),
+    - `extractors`: {pipeline extractor name: fn(html, url)}. The
+      urgency-bills one is htmlextract.urgency_section_bills() with the
+      version's heading and terminator, and returns None when the page does
+      not look like its version after all; the generic extractor is then
+      used instead. Detection, the version's parser and the generic
+      extractor share one search for the Urgency heading per page.
+
+Versions are tried newest first. The version found for a sitting date is
+stored in the `page_versions` table in urgency.sqlite3 and passed back as a
+hint next time, so a page that is parsed again (reparse-history.py, the
+legacy scrapers) skips detection entirely.
+
+New markups are added with register_version().
+"""
+import re
+from datetime import datetime
+from functools import partial
+from typing import NamedTuple
+
+from htmlextract import (
+    extract_bills_from_urgency_section,
+    find_urgency_heading,
+    urgency_section_bills,
+)
+from schema import connect
+
+DB_PATH = "urgency.sqlite3"
+
+
+class MarkupVersion(NamedTuple):
+    name: str
+    heading: re.Pattern
+    terminator: re.Pattern
+    layout: re.Pattern
+    extractors: dict       # {extractor name: fn(html, url)}
+
+
+VERSIONS: list[MarkupVersion] = []
+BY_NAME: dict[str, MarkupVersion] = {}
+
+
+def _urgency_bills(heading: re.Pattern, terminator: re.Pattern, html: str, url: str):
+    return urgency_section_bills(html, heading, terminator)
+
+
+def register_version(name: str, heading: str, terminator: str, layout: str):
+    """
+    Register a markup version by the regexes of its Urgency heading, of the
+    heading that ends the urgency section and of any of its headings.
+    Register newest first.
+    """
+    heading_re = re.compile(heading, re.IGNORECASE)
+    terminator_re = re.compile(terminator, re.IGNORECASE)
+    version = MarkupVersion(
+        name, heading_re, terminator_re, re.compile(layout, re.IGNORECASE),
+        {"urgency_bills": partial(_urgency_bills, heading_re, terminator_re)},
+    )
+    VERSIONS.append(version)
+    BY_NAME[name] = version
+    return version
+
+
+def detect_version(html: str) -> MarkupVersion | None:
+    """
+    The version whose `heading` is how this page writes its Urgency
+    heading, or None if it has none (or one no version knows).
+    """
+    m = find_urgency_heading(html)
+    if m is None:
+        return None
+    for version in VERSIONS:
+        if version.heading.fullmatch(m.group()):
+            return version
+    return None
+
+
+def detect_layout(html: str) -> MarkupVersion | None:
+    """The first registered version with any heading on the page, or None."""
+    for version in VERSIONS:
+        if version.layout.search(html):
+            return version
+    return None
+
+
+def resolve_version(html: str, hint: str | None = None) -> MarkupVersion | None:
+    """The hinted version if there is one, otherwise whatever detect_version() finds."""
+    if hint in BY_NAME:
+        return BY_NAME[hint]
+    return detect_version(html)
+
+
+def extract_urgency_bills(html: str, version_hint: str | None = None):
+    """
+    (bill_name, url) links in the urgency section, parsed by the page's
+    markup version (or the generic htmlextract scanner if it has none or it
+    misses). Returns (bills, version name or None).
+    """
+    version = resolve_version(html, version_hint)
+    if version is not None:
+        bills = version.extractors["urgency_bills"](html, "")
+        if bills is not None:
+            return bills, version.name
+        version = detect_version(html)
+    return extract_bills_from_urgency_section(html), version.name if version else None
+
+
+# ---------------------------------------------------------------------------
+# Versions, newest first
+# ---------------------------------------------------------------------------
+# <h3><span>Urgency</span></h3>, <li><span>... <a href>Bill</a> ...</span></li> (from 2026)
+register_version(
+    "span-headings",
+    heading=r"<h3>\s*<span>\s*Urgency\s*</span>\s*</h3>",
+    terminator=r"<h3>\s*<span>[^<]*Government business",
+    layout=r"<h3>\s*<span>",
+)
+# <h3>Urgency</h3>, <li>... <a rel="noopener" href>Bill</a> ...</li> (52nd Parliament to 2026)
+register_version(
+    "plain-headings",
+    heading=r"<h3>\s*Urgency\s*</h3>",
+    terminator=r"<h3>[^<]*Government business",
+    layout=r"<h3>\s*(?:Urgency|Government business|Introduction|Oral questions)",
+)
+
+
+# ---------------------------------------------------------------------------
+# Per-date cache
+# ---------------------------------------------------------------------------
+def init_versions_table(db_path: str = DB_PATH):
+    """
+    Ensure the `page_versions` table exists.
+    """
+    conn = connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS page_versions (
+            date TEXT PRIMARY KEY,
+            version TEXT,
+            detected_at TEXT
+        )
+    """)
+    conn.commit()
+    conn.close()
+
+
+def load_versions(db_path: str = DB_PATH) -> dict[str, str]:
+    """{sitting date (ISO): version name} for every page seen before."""
+    init_versions_table(db_path)
+    conn = connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("SELECT date, version FROM page_versions")
+    versions = dict(cursor.fetchall())
+    conn.close()
+    return versions
+
+
+def write_version(cursor, sitting_date: str, version: str | None):
+    """Store the version found for a date; None (no Urgency heading) drops any old hint."""
+    if version is None:
+        cursor.execute("DELETE FROM page_versions WHERE date = ?", (sitting_date,))
+        return
+    cursor.execute(
+        """
+        INSERT INTO page_versions (date, version, detected_at) VALUES (?, ?, ?)
+        ON CONFLICT(date) DO UPDATE SET
+            version = excluded.version, detected_at = excluded.detected_at
+        """,
+        (sitting_date, version, datetime.now().isoformat(timespec="seconds")),
+    )
@@ -0,0 +1,176 @@
+"""
+navprofile.py
+
+Lean navigation profile for the Playwright paths.
+
+The extractors only need the document itself: the <h3> sections of a
+daily-progress page, the `table.table--list` rows of a listing page or the
+`Member(s) in charge:` cell of a bill page. Waiting for `networkidle` means
+also waiting for every image, font, stylesheet and analytics beacon on
+parliament.nz. This profile:
+    - aborts image/media/font/stylesheet requests and anything not served
+      from a parliament.nz host,
+    - waits for `domcontentloaded` plus the selector the extractor needs,
+    - reports per page how long that took and how many requests were blocked.
+
+Set NZPT_NAV_COMPARE=1 to also time each page the old way (no blocking,
+`networkidle`) in a scratch page and report the time saved. This doubles
+the load on the site, so it is meant for one-off measurements only.
+"""
+import os
+import time
+import weakref
+from urllib.parse import urlparse
+
+from siteconfig import site_hosts
+
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet"}
+FIRST_PARTY_SUFFIX = "parliament.nz"
+
+# Selectors each extractor waits on before reading the page
+READY_LISTING = "table.table--list tbody tr.list__row"
+READY_DAILY_PROGRESS = "h3"
+READY_BILL = "th"
+READY_FEED = "item, entry"
+
+# Statuses a script challenge is served with before it reloads into the
+# real page
+CHALLENGE_STATUSES = {401, 403, 429, 503}
+
+READY_TIMEOUT_MS = 10_000
+NAV_TIMEOUT_MS = 30_000
+
+COMPARE = os.environ.get("NZPT_NAV_COMPARE") == "1"
+
+
+class NavStats:
+    """Running totals for pages loaded with the lean profile."""
+
+    def __init__(self):
+        self.pages = 0
+        self.ready_seconds = 0.0
+        self.blocked = 0
+        self.compared = 0
+        self.saved_seconds = 0.0
+
+    def record(self, url: str, ready_s: float, blocked: int, baseline_s: float | None = None):
+        self.pages += 1
+        self.ready_seconds += ready_s
+        self.blocked += blocked
+        line = f"  Ready in {ready_s:.2f}s ({blocked} requests blocked)"
+        if baseline_s is not None:
+            saved = baseline_s - ready_s
+            self.compared += 1
+            self.saved_seconds += saved
+            line += f"; networkidle took {baseline_s:.2f}s, saved {saved:.2f}s"
+        print(line)
+
+    def report(self):
+        if not self.pages:
+            return
+        print(
+            f"Navigation: {self.pages} pages, avg ready {self.ready_seconds / self.pages:.2f}s, "
+            f"{self.blocked} requests blocked."
+        )
+        if self.compared:
+            print(
+                f"  vs networkidle: {self.saved_seconds:.1f}s saved over {self.compared} pages "
+                f"(avg {self.saved_seconds / self.compared:.2f}s per page)."
+            )
+
+
+NAV_STATS = NavStats()
+
+# Aborted-request counters per routed Page/BrowserContext
+_blocked_counts = weakref.WeakKeyDictionary()
+
+
+def should_block(resource_type: str, url: str) -> bool:
+    if resource_type in BLOCKED_RESOURCE_TYPES:
+        return True
+    host = urlparse(url).hostname or ""
+    if host in site_hosts():
+        return False
+    return not (host == FIRST_PARTY_SUFFIX or host.endswith("." + FIRST_PARTY_SUFFIX))
+
+
+async def install_blocking(target):
+    """
+    Route all requests of a BrowserContext or Page through the blocker.
+    Requests it lets through fall back to any route installed before it
+    (e.g. netarchive's record/replay), or go to the network.
+    """
+    _blocked_counts[target] = 0
+
+    async def handle(route):
+        request = route.request
+        if should_block(request.resource_type, request.url):
+            _blocked_counts[target] += 1
+            await route.abort()
+        else:
+            await route.fallback()
+
+    await target.route("**/*", handle)
+
+
+def _blocked_count(page) -> int:
+    for target in (page, page.context):
+        if target in _blocked_counts:
+            return _blocked_counts[target]
+    return 0
+
+
+async def _baseline_seconds(page, url: str) -> float:
+    """Time a load of `url` the old way in a scratch, unrouted page."""
+    browser = page.context.browser
+    context = await browser.new_context()
+    try:
+        scratch = await context.new_page()
+        t0 = time.perf_counter()
+        await scratch.goto(url, wait_until="networkidle", timeout=NAV_TIMEOUT_MS)
+        return time.perf_counter() - t0
+    finally:
+        await context.close()
+
+
+async def goto_ready(page, url: str, selector: str | None = None):
+    """
+    Navigate to `url`, waiting only for `domcontentloaded` and, if given,
+    for `selector` to be attached. The selector wait also covers challenge
+    pages that reload into the real page. A 404 (e.g. a non-sitting day) is
+    returned straight away, and a page that never shows the selector is
+    returned as-is once the wait times out; use page_ready() to tell these
+    apart from a real page.
+    Returns the navigation response.
+    """
+    blocked_before = _blocked_count(page)
+    t0 = time.perf_counter()
+    response = await page.goto(url, wait_until="domcontentloaded", timeout=NAV_TIMEOUT_MS)
+    if selector and (response is None or response.status not in (404, 410)):
+        try:
+            await page.wait_for_selector(selector, state="attached", timeout=READY_TIMEOUT_MS)
+        except Exception:
+            print(f"  '{selector}' not found on {url} within {READY_TIMEOUT_MS} ms")
+    ready_s = time.perf_counter() - t0
+
+    baseline_s = None
+    if COMPARE:
+        try:
+            baseline_s = await _baseline_seconds(page, url)
+        except Exception as e:
+            print(f"  Baseline timing failed for {url}: {e}")
+
+    NAV_STATS.record(url, ready_s, _blocked_count(page) - blocked_before, baseline_s)
+    return response
+
+
+async def page_ready(page, response, selector: str) -> bool:
+    """
+    True if a goto_ready() load ended on the real page: `selector` is
+    attached and the status was 2xx, or a challenge status whose page
+    reloaded into the real one. False for error pages, and for challenge
+    pages that never got past the challenge.
+    """
+    if response is None or await page.query_selector(selector) is None:
+        return False
+    return 200 <= response.status < 300 or response.status in CHALLENGE_STATUSES
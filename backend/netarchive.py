@@ -0,0 +1,183 @@
+"""
+netarchive.py
+
+Record-and-replay of all network traffic, so a full pipeline run can be
+replayed offline (in seconds, and with reproducible timings).
+
+    NZPT_NET_MODE=record  every request/response made through the Fetcher's
+                          HTTP client or a routed Playwright context/page is
+                          stored in the archive
+    NZPT_NET_MODE=replay  the same requests are answered from the archive;
+                          nothing goes to the network. A request that was
+                          never recorded gets a 404 (and is logged)
+
+The archive is a compact SQLite file (NZPT_NET_ARCHIVE, default
+netarchive.sqlite3), one row per (method, URL) with the status, headers and
+the zlib-compressed, already-decoded body -- the same shape whether it was
+recorded over httpx or through Chromium, so either path can replay it.
+
+The Fetcher wires this in by itself. Scripts that drive their own pages call
+install_archive_routing() before navprofile.install_blocking().
+"""
+import json
+import os
+import sqlite3
+import time
+import zlib
+
+import httpx
+
+MODE = os.environ.get("NZPT_NET_MODE", "").lower()
+ARCHIVE_PATH = os.environ.get("NZPT_NET_ARCHIVE", "netarchive.sqlite3")
+
+RECORD = "record"
+REPLAY = "replay"
+
+# The stored body is decoded, so these no longer describe it
+_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+def _clean_headers(headers) -> dict:
+    return {k.lower(): v for k, v in headers.items() if k.lower() not in _DROP_HEADERS}
+
+
+class NetArchive:
+    """(method, url) -> status, headers, compressed body."""
+
+    def __init__(self, path: str = ARCHIVE_PATH, mode: str = MODE):
+        self.path = path
+        self.mode = mode
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS exchanges (
+                method TEXT,
+                url TEXT,
+                status INTEGER,
+                headers TEXT,
+                body BLOB,
+                recorded_at REAL,
+                PRIMARY KEY (method, url)
+            )
+        """)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def put(self, method: str, url: str, status: int, headers, body: bytes):
+        self.conn.execute(
+            """
+            INSERT INTO exchanges (method, url, status, headers, body, recorded_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(method, url) DO UPDATE SET
+                status = excluded.status,
+                headers = excluded.headers,
+                body = excluded.body,
+                recorded_at = excluded.recorded_at
+            """,
+            (method.upper(), url, status, json.dumps(_clean_headers(headers)),
+             zlib.compress(body, 6), time.time()),
+        )
+        self.conn.commit()
+        self.recorded += 1
+
+    def get(self, method: str, url: str):
+        """(status, headers, body) for a recorded exchange, or None."""
+        row = self.conn.execute(
+            "SELECT status, headers, body FROM exchanges WHERE method = ? AND url = ?",
+            (method.upper(), url),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            print(f"  Not in archive: {method.upper()} {url}")
+            return None
+        self.replayed += 1
+        status, headers, body = row
+        return status, json.loads(headers), zlib.decompress(body)
+
+    def report(self):
+        if self.mode == RECORD:
+            print(f"Archive: recorded {self.recorded} exchanges to {self.path}.")
+        else:
+            print(f"Archive: replayed {self.replayed} exchanges from {self.path} ({self.misses} missing).")
+
+
+def open_archive() -> NetArchive | None:
+    """The archive for the configured NZPT_NET_MODE, or None when it is off."""
+    if MODE not in (RECORD, REPLAY):
+        return None
+    print(f"Network {MODE} mode using {ARCHIVE_PATH}")
+    return NetArchive(ARCHIVE_PATH, MODE)
+
+
+# ---------------------------------------------------------------------------
+# httpx
+# ---------------------------------------------------------------------------
+class ArchiveTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport that records through `inner`, or replays without
+    touching the network.
+    """
+
+    def __init__(self, archive: NetArchive, inner: httpx.AsyncBaseTransport | None = None):
+        self.archive = archive
+        self.inner = inner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        url = str(request.url)
+        if self.archive.mode == REPLAY:
+            entry = self.archive.get(request.method, url)
+            if entry is None:
+                return httpx.Response(404, text="not in archive", request=request)
+            status, headers, body = entry
+            return httpx.Response(status, headers=headers, content=body, request=request)
+
+        response = await self.inner.handle_async_request(request)
+        # Read (and decode) the body here so it is archived uncompressed
+        body = await response.aread()
+        await response.aclose()
+        self.archive.put(request.method, url, response.status_code, response.headers, body)
+        return httpx.Response(
+            response.status_code, headers=_clean_headers(response.headers),
+            content=body, request=request,
+        )
+
+    async def aclose(self):
+        if self.inner is not None:
+            await self.inner.aclose()
+
+
+# ---------------------------------------------------------------------------
+# Playwright
+# ---------------------------------------------------------------------------
+async def install_archive_routing(target, archive: NetArchive | None):
+    """
+    Route a BrowserContext or Page through the archive. Install it before
+    navprofile.install_blocking so blocked requests never reach it.
+    Does nothing when `archive` is None.
+    """
+    if archive is None:
+        return
+
+    async def handle(route):
+        request = route.request
+        if archive.mode == REPLAY:
+            entry = archive.get(request.method, request.url)
+            if entry is None:
+                await route.fulfill(status=404, body="not in archive")
+                return
+            status, headers, body = entry
+            await route.fulfill(status=status, headers=headers, body=body)
+            return
+
+        response = await route.fetch()
+        body = await response.body()
+        archive.put(request.method, request.url, response.status, response.headers, body)
+        await route.fulfill(status=response.status, headers=_clean_headers(response.headers), body=body)
+
+    await target.route("**/*", handle)
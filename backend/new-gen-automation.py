@@ -8,11 +8,17 @@ This tool does the following:
 2. Runs billcounter.py
 3. Runs billsaffected.py
 4. Runs billdetails.py
-5. Runs shareimagegenerator.py
-SOON: 6. Sends a nzpt-bot message with the daily urgency status.
+5. Runs statsbuilder.py (headline figures for the website and share image)
+6. Runs shareimagegenerator.py
+SOON: 7. Sends a nzpt-bot message with the daily urgency status.
 
 All stdout/stderr (including print() calls from the imported subscripts) are
 mirrored to DIR/logs/urgency.log as well as the console.
+
+Steps 1-4 share one BrowserManager and one Fetcher per nightly run, so
+Chromium is launched at most once (only if a page needs the browser) and the
+steps share warm HTTP connections, the response cache and cookies. Each step
+still gets its own browser contexts.
 """
 
 # Import time/date
@@ -20,6 +26,7 @@ import asyncio
 import os
 import sys
 from datetime import datetime
+from functools import partial
 
 # ---------------------------------------------------------------------------
 # Logging setup
@@ -72,7 +79,10 @@ from scrapewebpage import main as scrapescript
 from billcounter import main as billcounter
 from billsaffected import main as billsaffected
 from billdetails import scrape_all_bill_details as billdetails
+from statsbuilder import main as statsbuilder
 from shareimagegenerator import main as shareimagegenerator
+from browsermanager import BrowserManager
+from httpfetch import Fetcher
 
 
 # ---------------------------------------------------------------------------
@@ -94,12 +104,30 @@ async def run_step(name, coro_or_func, is_coro=True):
     return True
 
 
+async def run_browser_steps():
+    """Run the scraping steps with one shared browser and fetcher."""
+    async with BrowserManager() as browsers, Fetcher(browsers=browsers) as fetcher:
+        for name, step in (
+            ("scrapewebpage.py", scrapescript),
+            ("billcounter.py", billcounter),
+            ("billsaffected.py", billsaffected),
+            ("billdetails.py", billdetails),
+        ):
+            await run_step(name, partial(step, fetcher=fetcher))
+            # Fresh contexts for the next step; cookies carry over
+            await fetcher.close_pages()
+        print(f"Browser launched {browsers.launches} time(s) this run.")
+
+
 async def schedule():
     while True:
-        await run_step("scrapewebpage.py", scrapescript)
-        await run_step("billcounter.py", billcounter)
-        await run_step("billsaffected.py", billsaffected)
-        await run_step("billdetails.py", billdetails)
+        try:
+            await run_browser_steps()
+        except Exception:
+            import traceback
+            print("ERROR: shared browser/fetcher failed:")
+            print(traceback.format_exc())
+        await run_step("statsbuilder.py", statsbuilder, is_coro=False)
         await run_step("shareimagegenerator.py", shareimagegenerator, is_coro=False)
 
         try:
@@ -0,0 +1,290 @@
+"""
+pagepipeline.py
+
+Single-pass processing of daily-progress pages.
+
+The same daily-progress page used to be loaded three times a night: by
+scrapewebpage.py (urgency phrase), billsaffected.py (bills in the Urgency
+section) and billcounter.py (bills in 'Introduction of bills'). Here each
+page is fetched once and every registered extractor runs over it. All the
+outputs of a run are upserted in one transaction (see schema.py):
+    - `in_urgency`       -> `urgency` (date, in_urgency)
+    - `urgency_bills`    -> `bills` (bill_name, url)
+    - `introduced_bills` -> `introduced_bills` (bill_id, url, first_seen)
+    - `procedural_flags` -> `procedural_flags` (date, flag), see procedural.py
+and the page is marked 'done' in the `sitting_days` frontier, so later steps
+can skip it. The page's markup version goes to `page_versions`
+(markupversions.py), and extractors with a parser for that version are
+dispatched straight to it.
+
+New extractors are added with @register_extractor(name, writer), where
+`writer(cursor, sitting_date, url, value)` stores the extractor's value.
+
+The extractors run in a parsestage.ParseStage (worker processes), not on
+the event loop, so parsing a page never holds up the fetches in flight.
+They must therefore be registered when this module (or a module it
+imports) is imported, so the workers have them too.
+"""
+from datetime import datetime, date
+from functools import partial
+from typing import Callable, NamedTuple
+
+from fetchpool import map_items
+from htmlextract import (
+    URGENCY_PHRASE,
+    extract_bills_from_urgency_section,
+    introduced_bill_hrefs,
+    normalise_bill_id,
+)
+from jsextractors import USE_JS, introduced_bill_hrefs_js
+from listingcrawler import init_frontier_table
+from markupversions import (
+    detect_version,
+    init_versions_table,
+    load_versions,
+    resolve_version,
+    write_version,
+)
+from navprofile import READY_DAILY_PROGRESS
+from parsestage import ParseStage
+from procedural import SCANNER, init_procedural_table, scan_page, write_flags
+from schema import (
+    connect,
+    init_bills_table,
+    init_introduced_bills_table,
+    init_tables,
+    init_urgency_table,
+    upsert_bills,
+    upsert_urgency,
+)
+
+DB_PATH = "urgency.sqlite3"
+
+
+class Extractor(NamedTuple):
+    name: str
+    extract: Callable  # (html, url) -> value
+    write: Callable    # (cursor, sitting_date, url, value) -> None
+
+
+EXTRACTORS: list[Extractor] = []
+
+
+def register_extractor(name: str, write: Callable):
+    """Register `fn(html, url)` as a pipeline extractor stored by `write`."""
+    def decorator(fn):
+        EXTRACTORS.append(Extractor(name, fn, write))
+        return fn
+    return decorator
+
+
+def init_pipeline_tables(db_path: str = DB_PATH):
+    """
+    Ensure every table the extractors write to exists.
+    """
+    init_frontier_table(db_path)
+    init_versions_table(db_path)
+    init_procedural_table(db_path)
+    init_tables(
+        init_urgency_table, init_bills_table, init_introduced_bills_table, db_path=db_path
+    )
+
+
+# ---------------------------------------------------------------------------
+# Extractors
+# ---------------------------------------------------------------------------
+def _write_urgency(cursor, sitting_date: date, url: str, in_urgency: int):
+    upsert_urgency(cursor, [(sitting_date.isoformat(), in_urgency)])
+
+
+def _write_urgency_bills(cursor, sitting_date: date, url: str, bills):
+    upsert_bills(cursor, bills)
+
+
+def write_introduced_bills(cursor, sitting_date: str, bills):
+    """
+    Upsert the (bill_id, url) bills introduced on a sitting day, keeping
+    the earliest date each bill was seen.
+    """
+    cursor.executemany(
+        """
+        INSERT INTO introduced_bills (bill_id, url, first_seen) VALUES (?, ?, ?)
+        ON CONFLICT(bill_id) DO UPDATE SET
+            first_seen = MIN(introduced_bills.first_seen, excluded.first_seen)
+        """,
+        [(bill_id, href, sitting_date) for bill_id, href in bills],
+    )
+
+
+def _write_introduced_bills(cursor, sitting_date: date, url: str, bills):
+    write_introduced_bills(cursor, sitting_date.isoformat(), bills)
+
+
+def _write_procedural_flags(cursor, sitting_date: date, url: str, flags):
+    write_flags(cursor, sitting_date.isoformat(), flags)
+
+
+@register_extractor("in_urgency", _write_urgency)
+def extract_urgency_flag(html: str, url: str) -> int:
+    if "urgency" not in SCANNER.needles:
+        return 1 if URGENCY_PHRASE in html else 0
+    # The procedural_flags extractor scans the same page; scan_page() keeps
+    # the result, so the urgency phrase is only searched for once
+    return 1 if "urgency" in scan_page(html) else 0
+
+
+@register_extractor("urgency_bills", _write_urgency_bills)
+def extract_urgency_bills(html: str, url: str):
+    return extract_bills_from_urgency_section(html)
+
+
+def _bills_from_hrefs(hrefs) -> list[tuple[str, str]]:
+    bills = []
+    for href in hrefs:
+        bill_id = normalise_bill_id(href)
+        if bill_id:
+            bills.append((bill_id, href))
+    return bills
+
+
+@register_extractor("introduced_bills", _write_introduced_bills)
+def extract_introduced_bills(html: str, url: str):
+    return _bills_from_hrefs(introduced_bill_hrefs(html, url))
+
+
+@register_extractor("procedural_flags", _write_procedural_flags)
+def extract_procedural_flags(html: str, url: str):
+    return scan_page(html)
+
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+def parse_page(html: str, url: str, version_hint: str | None = None) -> dict:
+    """
+    Run every extractor over one page. Returns {extractor name: value},
+    plus the page's markup version (markupversions) under "markup_version".
+
+    Extractors that the page's markup version has its own parser for go
+    straight to it; the generic extractor only runs when there is none or
+    it returns None (the hint or fingerprint was wrong).
+    """
+    version = resolve_version(html, version_hint)
+    values = {}
+    for extractor in EXTRACTORS:
+        try:
+            value = None
+            specific = version.extractors.get(extractor.name) if version else None
+            if specific is not None:
+                value = specific(html, url)
+                if value is None:
+                    # Not the markup we expected; record what it really is
+                    version = detect_version(html)
+            if value is None:
+                value = extractor.extract(html, url)
+            values[extractor.name] = value
+        except Exception as e:
+            print(f"  Extractor {extractor.name} failed on {url}: {e}")
+    values["markup_version"] = version.name if version else None
+    return values
+
+
+def parse_pages(pages) -> list[dict]:
+    """ParseStage batch function: parse_page() over [(html, url, version_hint)]."""
+    return [parse_page(html, url, hint) for html, url, hint in pages]
+
+
+async def process_page(fetcher, stage: ParseStage, version_hints: dict, item):
+    """
+    Fetch one sitting day and have the parse stage run every extractor
+    over it. Returns {extractor name: value}, or None if the page could not
+    be loaded or parsed. `version_hints` is load_versions().
+
+    With NZPT_JS_EXTRACTORS=1 the introduced bills are taken from the
+    JavaScript extractor (jsextractors.py) in a fallback page instead.
+    """
+    sitting_date, url = item
+    print(f"Processing {sitting_date} -> {url}")
+    try:
+        html = await fetcher.get_text(url, READY_DAILY_PROGRESS)
+    except Exception as e:
+        print(f"  Failed to load {url}: {e}")
+        return None
+
+    try:
+        values = await stage.parse(html, url, version_hints.get(sitting_date.isoformat()))
+        if USE_JS:
+            values["introduced_bills"] = _bills_from_hrefs(
+                await introduced_bill_hrefs_js(fetcher, url, html)
+            )
+        return values
+    except Exception as e:
+        print(f"  Failed to parse {url}: {e}")
+        return None
+
+
+def write_results(items, results, db_path: str = DB_PATH):
+    """
+    Write every extractor's output and the frontier fetch status for a run
+    in a single transaction. `results` line up with `items`.
+    """
+    now = datetime.now().isoformat(timespec="seconds")
+    conn = connect(db_path)
+    with conn:
+        cursor = conn.cursor()
+        for (sitting_date, url), values in zip(items, results):
+            status = "failed" if values is None else "done"
+            cursor.execute(
+                """
+                INSERT INTO sitting_days (date, url, status, fetched_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET status = excluded.status, fetched_at = excluded.fetched_at
+                """,
+                (sitting_date.isoformat(), url, status, now),
+            )
+            if values is None:
+                continue
+            for extractor in EXTRACTORS:
+                if extractor.name in values:
+                    extractor.write(cursor, sitting_date, url, values[extractor.name])
+            write_version(cursor, sitting_date.isoformat(), values.get("markup_version"))
+    conn.close()
+
+
+def processed_urls(db_path: str = DB_PATH) -> set[str]:
+    """URLs the pipeline has already extracted successfully."""
+    init_frontier_table(db_path)
+    conn = connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("SELECT url FROM sitting_days WHERE status = 'done'")
+    urls = {url for (url,) in cursor.fetchall()}
+    conn.close()
+    return urls
+
+
+async def run_pipeline(fetcher, items, db_path: str = DB_PATH,
+                       concurrency: int | None = None):
+    """
+    Fetch each (sitting_date, url) once, run all extractors and write the
+    results. Returns the per-item {extractor name: value} dicts (None for
+    failures) in item order.
+
+    `concurrency` caps the number of pages in flight (being fetched or
+    waiting to be parsed); by default it is enough to keep both the
+    fetcher's ceiling and every parse worker busy, and the per-host limiter
+    decides the actual pace of requests.
+    """
+    init_pipeline_tables(db_path)
+    version_hints = load_versions(db_path)
+    async with ParseStage(parse_pages) as stage:
+        in_flight = concurrency or max(fetcher.max_concurrency, stage.capacity)
+        results = await map_items(
+            items, partial(process_page, fetcher, stage, version_hints), in_flight
+        )
+    write_results(items, results, db_path=db_path)
+
+    ok = sum(1 for r in results if r is not None)
+    print(
+        f"Pipeline processed {ok}/{len(items)} sitting days with "
+        f"{len(EXTRACTORS)} extractors ({', '.join(e.name for e in EXTRACTORS)})."
+    )
+    return results
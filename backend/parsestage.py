@@ -0,0 +1,144 @@
+"""
+parsestage.py
+
+Runs CPU-bound page parsing in worker processes, off the event loop.
+
+A ParseStage collects pages from any number of coroutines and
+ships them to a ProcessPoolExecutor in batches:
+
+    async with ParseStage(parse_pages) as stage:
+        value = await stage.parse(html, url, version_hint)
+
+`parse_batch` must be a module-level function taking a list of pages (the
+argument tuples given to parse(), e.g. (html, url, version_hint)) and
+returning one result per page (pagepipeline.parse_pages), so that the
+workers can import it. A batch is sent when BATCH_SIZE pages are waiting or
+BATCH_LINGER seconds after its first page arrived, so the pickling and IPC
+cost is paid per batch. Fetching carries on while the workers parse, and
+the parse work scales with the number of cores.
+
+The number of workers can be changed with NZPT_PARSE_WORKERS (default: one
+per CPU); 0 parses inline on the event loop. NZPT_PARSE_BATCH sets the batch
+size.
+"""
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+PARSE_WORKERS = int(os.environ.get("NZPT_PARSE_WORKERS", str(os.cpu_count() or 1)))
+BATCH_SIZE = int(os.environ.get("NZPT_PARSE_BATCH", "16"))
+BATCH_LINGER = 0.05
+
+
+def _timed_batch(parse_batch, pages):
+    # Runs in the worker: also report how long the batch took to parse
+    t0 = time.perf_counter()
+    results = parse_batch(pages)
+    return results, time.perf_counter() - t0
+
+
+class ParseStage:
+    """Batches pages to a process pool and hands each result back to its caller."""
+
+    def __init__(self, parse_batch, workers: int = PARSE_WORKERS, batch_size: int = BATCH_SIZE):
+        self.parse_batch = parse_batch
+        self.workers = max(0, workers)
+        self.batch_size = max(1, batch_size)
+        self._executor = None
+        self._pending = []     # [(page, future)]
+        self._timer = None
+        self._in_flight = set()
+
+        self.pages = 0
+        self.batches = 0
+        self.parse_seconds = 0.0
+        self.started = time.perf_counter()
+
+    @property
+    def capacity(self) -> int:
+        """Pages worth having in flight to keep every worker busy."""
+        return self.workers * self.batch_size * 2
+
+    async def __aenter__(self):
+        if self.workers:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        self.started = time.perf_counter()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._dispatch()
+        if self._in_flight:
+            await asyncio.wait(list(self._in_flight))
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        self.report()
+
+    async def parse(self, *page):
+        """Parse one page, e.g. parse(html, url); returns what `parse_batch` returned for it."""
+        if self._executor is None:
+            t0 = time.perf_counter()
+            result = self.parse_batch([page])[0]
+            self.parse_seconds += time.perf_counter() - t0
+            self.pages += 1
+            self.batches += 1
+            return result
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((page, future))
+        if len(self._pending) >= self.batch_size:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = loop.call_later(BATCH_LINGER, self._dispatch)
+        return await future
+
+    def _dispatch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        loop = asyncio.get_running_loop()
+        task = loop.run_in_executor(
+            self._executor, _timed_batch, self.parse_batch, [page for page, _ in batch]
+        )
+        self._in_flight.add(task)
+        task.add_done_callback(partial(self._deliver, batch))
+
+    def _deliver(self, batch, task):
+        self._in_flight.discard(task)
+        if task.cancelled():
+            for _, future in batch:
+                future.cancel()
+            return
+        error = task.exception()
+        if error is not None:
+            # e.g. a worker process died; every page of the batch fails
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        results, seconds = task.result()
+        self.pages += len(batch)
+        self.batches += 1
+        self.parse_seconds += seconds
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def report(self):
+        if not self.pages:
+            return
+        elapsed = max(time.perf_counter() - self.started, 1e-6)
+        where = f"{self.workers} workers" if self.workers else "inline"
+        print(
+            f"Parse stage: {self.pages} pages in {self.batches} batches "
+            f"({where}), {self.parse_seconds:.2f}s CPU, "
+            f"{self.pages / elapsed:.1f} pages/s"
+        )
@@ -0,0 +1,176 @@
+"""
+procedural.py
+
+Per-day flags for procedural motions found in daily-progress pages:
+urgency, extended sittings, closure, skipped select committees and
+bipartisan urgency (BPUM).
+
+PhraseScanner looks for every configured phrase in one call per page.
+Each phrase is a plain substring test (the C string search behind the old
+`URGENCY_PHRASE in content` check), and a flag stops being searched for as
+soon as one of its phrases is found. A single regex alternation of the
+phrases steps through the page character by character and was several
+hundred times slower on real-sized pages, as would be an Aho-Corasick
+automaton written in Python.
+
+Most of a real page is site chrome (menus, footer), so the searches are
+bounded to the proceedings, the page's <main> element. Its two ends are
+found by searching back from the end of the page, so the footer is read
+once and the header menus not at all; the phrase searches then only read
+the proceedings. The committee_skip and bpum phrases ("agreed to
+unanimously" would otherwise match any unanimous motion) are only looked
+for in the Urgency section, on pages where the urgency flag was found.
+
+Phrases are matched case-sensitively except for their first letter, so
+"That the question be now put" is also found mid-sentence. The defaults
+can be replaced with a JSON file named by NZPT_PROCEDURAL_PHRASES:
+
+    {"urgency": ["That urgency be accorded"], "closure": ["closure motion"]}
+
+The pipeline stores the flags found for each sitting date in the
+`procedural_flags` table of urgency.sqlite3, and takes its `in_urgency`
+value from the urgency flag (scan_page()), so the urgency phrase is
+searched for once per page.
+"""
+import json
+import os
+
+from htmlextract import URGENCY_PHRASE, urgency_section_span
+from schema import connect
+
+DB_PATH = "urgency.sqlite3"
+
+PROCEDURAL_PHRASES = {
+    "urgency": [URGENCY_PHRASE, "That urgency be accorded"],
+    "extended_sitting": ["extended sitting", "That the House sit"],
+    "closure": ["closure motion", "That the question be now put"],
+    # Bills sent straight on without a select committee stage (the SKU tag)
+    "committee_skip": [
+        "without being referred to a select committee",
+        "not be referred to a select committee",
+    ],
+    # Urgency motions carried without opposition (the BPUM tag)
+    "bpum": ["agreed to unanimously", "agreed to without dissent"],
+}
+# Flags only looked for between the Urgency heading and the next Government
+# business heading
+URGENCY_SECTION_FLAGS = {"committee_skip", "bpum"}
+PHRASES_PATH = os.environ.get("NZPT_PROCEDURAL_PHRASES", "")
+
+
+def load_phrases(path: str = PHRASES_PATH) -> dict[str, list[str]]:
+    if not path:
+        return PROCEDURAL_PHRASES
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _needle(phrase: str) -> tuple[str, str]:
+    """
+    (first letter, rest) for a phrase starting with a letter, so one
+    search finds it in either case; ("", phrase) otherwise.
+    """
+    if phrase[:1].isalpha():
+        return phrase[0].lower(), phrase[1:]
+    return "", phrase
+
+
+def _contains(text: str, first: str, rest: str, start: int, end: int) -> bool:
+    i = text.find(rest, start + 1 if first else start, end)
+    while i != -1:
+        if not first or text[i - 1].lower() == first:
+            return True
+        i = text.find(rest, i + 1, end)
+    return False
+
+
+def proceedings_span(text: str) -> tuple[int, int]:
+    """
+    (start, end) offsets of the proceedings: the page's <main>, searched
+    for from the end so the header menus are never read. Without one, from
+    the first <h3> to the end of the page.
+    """
+    end = text.rfind("</main>")
+    if end == -1:
+        end = len(text)
+    start = text.rfind("<main", 0, end)
+    if start == -1:
+        start = max(text.find("<h3", 0, end), 0)
+    return start, end
+
+
+class PhraseScanner:
+    """Which flags' phrases occur in a page."""
+
+    def __init__(self, phrases: dict[str, list[str]] | None = None):
+        phrases = load_phrases() if phrases is None else phrases
+        self.needles = {
+            flag: [_needle(phrase) for phrase in flag_phrases]
+            for flag, flag_phrases in phrases.items()
+        }
+        self.page_flags = [f for f in self.needles if f not in URGENCY_SECTION_FLAGS]
+        self.section_flags = [f for f in self.needles if f in URGENCY_SECTION_FLAGS]
+
+    def _scan(self, flags, text: str, start: int, end: int, found: set[str]):
+        for flag in flags:
+            for first, rest in self.needles[flag]:
+                if _contains(text, first, rest, start, end):
+                    found.add(flag)
+                    break
+
+    def scan(self, text: str) -> list[str]:
+        """Flags with at least one phrase in `text`, in configuration order."""
+        found = set()
+        start, end = proceedings_span(text)
+        self._scan(self.page_flags, text, start, end, found)
+        if self.section_flags and ("urgency" in found or "urgency" not in self.needles):
+            section = urgency_section_span(text)
+            if section is not None:
+                self._scan(self.section_flags, text, *section, found)
+        return [flag for flag in self.needles if flag in found]
+
+
+SCANNER = PhraseScanner()
+
+# (page, flags) of the last scan_page() call
+_last_scan = (None, None)
+
+
+def scan_page(text: str) -> list[str]:
+    """
+    SCANNER.scan(text). The result for the last page is kept, so the
+    pipeline's in_urgency and procedural_flags extractors scan it once.
+    """
+    global _last_scan
+    page, flags = _last_scan
+    if page is not text:
+        flags = SCANNER.scan(text)
+        _last_scan = (text, flags)
+    return flags
+
+
+def init_procedural_table(db_path: str = DB_PATH):
+    """
+    Ensure the `procedural_flags` table exists: one row per flag found on a
+    sitting day.
+    """
+    conn = connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS procedural_flags (
+            date TEXT,
+            flag TEXT,
+            PRIMARY KEY (date, flag)
+        )
+    """)
+    conn.commit()
+    conn.close()
+
+
+def write_flags(cursor, sitting_date: str, flags):
+    """Replace the stored flags of one sitting day."""
+    cursor.execute("DELETE FROM procedural_flags WHERE date = ?", (sitting_date,))
+    cursor.executemany(
+        "INSERT INTO procedural_flags (date, flag) VALUES (?, ?)",
+        [(sitting_date, flag) for flag in flags],
+    )
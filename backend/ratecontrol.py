@@ -0,0 +1,177 @@
+"""
+ratecontrol.py
+
+Per-host adaptive concurrency and retry policy for the Fetcher.
+
+Each host (www3.parliament.nz, bills.parliament.nz, ...) gets its own
+HostLimiter, an AIMD controller:
+    - every healthy response (fast, not 429/5xx) raises the host's limit by
+      1/limit, i.e. roughly +1 concurrent request per round of requests,
+      up to MAX_CONCURRENCY;
+    - a 429/503 or a timeout halves it (at most once per DECREASE_COOLDOWN,
+      so one burst of throttled in-flight requests counts once), down to 1.
+
+Failed fetches are retried by the Fetcher with jittered exponential backoff
+(backoff_delay), and every limiter keeps throughput/error counters that are
+printed at the end of a run.
+
+The ceiling can be changed with NZPT_MAX_CONCURRENCY; the starting limit is
+the Fetcher's `concurrency` (NZPT_CONCURRENCY).
+"""
+import asyncio
+import os
+import random
+import time
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+
+from fetchpool import CONCURRENCY
+
+MAX_CONCURRENCY = int(os.environ.get("NZPT_MAX_CONCURRENCY", "8"))
+
+# Responses slower than this do not raise the limit
+SLOW_SECONDS = 5.0
+# Statuses that mean "back off"
+THROTTLE_STATUSES = {429, 503}
+# Statuses worth retrying after a pause
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+DECREASE_COOLDOWN = 2.0
+
+MAX_ATTEMPTS = 4
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
+
+
+def backoff_delay(attempt: int) -> float:
+    """
+    Full-jitter exponential backoff: a random delay in
+    [0, BACKOFF_BASE * 2**attempt], capped at BACKOFF_MAX.
+    `attempt` is the number of attempts made so far (1 after the first).
+    """
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def is_timeout(error: Exception) -> bool:
+    # httpx.TimeoutException subclasses and Playwright's TimeoutError
+    return isinstance(error, (asyncio.TimeoutError, TimeoutError)) or "Timeout" in type(error).__name__
+
+
+class Attempt:
+    """Filled in by the caller inside HostLimiter.slot()."""
+
+    def __init__(self):
+        self.status: int | None = None
+        self.bytes = 0
+
+
+class HostLimiter:
+    """AIMD concurrency limit and counters for one host."""
+
+    def __init__(self, host: str, initial: int = CONCURRENCY, ceiling: int = MAX_CONCURRENCY):
+        self.host = host
+        self.ceiling = max(1, ceiling)
+        self.limit = float(min(max(1, initial), self.ceiling))
+        self.initial = self.limit
+        self.peak = self.limit
+        self._in_flight = 0
+        self._cond = asyncio.Condition()
+        self._last_decrease = 0.0
+
+        self.requests = 0
+        self.ok = 0
+        self.throttled = 0
+        self.errors = 0
+        self.retries = 0
+        self.bytes = 0
+        self.busy_seconds = 0.0
+        self.started = time.perf_counter()
+
+    async def _acquire(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._in_flight < int(self.limit))
+            self._in_flight += 1
+
+    async def _release(self, seconds: float, status: int | None, timed_out: bool = False):
+        async with self._cond:
+            self._in_flight -= 1
+            self.requests += 1
+            self.busy_seconds += seconds
+
+            if timed_out or status in THROTTLE_STATUSES:
+                self.throttled += 1
+                now = time.perf_counter()
+                if now - self._last_decrease >= DECREASE_COOLDOWN:
+                    self.limit = max(1.0, self.limit / 2)
+                    self._last_decrease = now
+                    print(f"  {self.host}: throttled ({status or 'timeout'}), concurrency -> {int(self.limit)}")
+            elif status is None or status >= 500:
+                self.errors += 1
+            else:
+                self.ok += 1
+                if seconds < SLOW_SECONDS:
+                    self.limit = min(float(self.ceiling), self.limit + 1 / self.limit)
+                    self.peak = max(self.peak, self.limit)
+            self._cond.notify_all()
+
+    @asynccontextmanager
+    async def slot(self):
+        """
+        Hold one of the host's concurrent request slots. Set `.status` (and
+        `.bytes`) on the yielded Attempt; an exception counts as an error,
+        or as throttling if it is a timeout.
+        """
+        await self._acquire()
+        attempt = Attempt()
+        t0 = time.perf_counter()
+        try:
+            yield attempt
+        except asyncio.CancelledError:
+            # Work that was no longer needed; not a signal about the host
+            async with self._cond:
+                self._in_flight -= 1
+                self._cond.notify_all()
+            raise
+        except BaseException as e:
+            await self._release(time.perf_counter() - t0, None, timed_out=is_timeout(e))
+            raise
+        self.bytes += attempt.bytes
+        await self._release(time.perf_counter() - t0, attempt.status)
+
+    def report(self):
+        elapsed = max(time.perf_counter() - self.started, 1e-6)
+        avg = self.busy_seconds / self.requests if self.requests else 0.0
+        print(
+            f"  {self.host}: {self.requests} requests ({self.ok} ok, {self.throttled} throttled, "
+            f"{self.errors} errors, {self.retries} retries), {self.requests / elapsed:.2f} req/s, "
+            f"avg {avg:.2f}s, {self.bytes / 1e6:.1f} MB, "
+            f"concurrency {int(self.initial)} -> {int(self.limit)} (peak {int(self.peak)})"
+        )
+
+
+class RateController:
+    """One HostLimiter per host, created on first use."""
+
+    def __init__(self, initial: int = CONCURRENCY, ceiling: int = MAX_CONCURRENCY):
+        self.initial = initial
+        self.ceiling = max(initial, ceiling)
+        self.hosts: dict[str, HostLimiter] = {}
+
+    def limiter(self, url: str) -> HostLimiter:
+        host = urlparse(url).netloc
+        if host not in self.hosts:
+            self.hosts[host] = HostLimiter(host, self.initial, self.ceiling)
+        return self.hosts[host]
+
+    def slot(self, url: str):
+        return self.limiter(url).slot()
+
+    def record_retry(self, url: str):
+        self.limiter(url).retries += 1
+
+    def report(self):
+        if not self.hosts:
+            return
+        print("Per-host traffic:")
+        for host in sorted(self.hosts):
+            self.hosts[host].report()
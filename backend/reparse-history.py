@@ -0,0 +1,188 @@
+"""
+Re-run the pipeline extractors over every stored daily-progress page of the
+52nd, 53rd and 54th Parliaments, e.g. after a parser change.
+
+Nothing is fetched: the sitting days come from the `sitting_days` frontier
+and their HTML from the HTTP cache (httpcache.sqlite3). Days that are not
+in the cache are listed at the end; run the normal scrapers (or
+scrape-legacy.py) to fetch them. Parsing is spread over every core by the
+pipeline's parse stage (NZPT_PARSE_WORKERS, NZPT_PARSE_BATCH).
+
+The new results are compared with what the database holds:
+    - 54th Parliament: `urgency`, `bills`, `introduced_bills`
+    - 52nd/53rd:       `legacy`, `lbills`
+and the differences are printed. With --write they are applied: urgency
+flags are overwritten, bills and introduced bills are added, and each
+page's procedural flags and markup version are stored. Every write is an
+upsert (schema.py), so running it twice changes nothing the second time.
+
+Usage: python reparse-history.py [--write]
+"""
+import asyncio
+import sqlite3
+import sys
+import time
+from datetime import date
+from functools import partial
+
+from fetchpool import map_items
+from httpcache import ResponseCache
+from listingcrawler import frontier_items
+from markupversions import load_versions, write_version
+from pagepipeline import init_pipeline_tables, parse_pages, write_introduced_bills
+from parsestage import ParseStage
+from procedural import write_flags
+from schema import (
+    connect,
+    init_lbills_table,
+    init_legacy_table,
+    init_tables,
+    upsert_bills,
+    upsert_lbills,
+    upsert_legacy,
+    upsert_urgency,
+)
+
+DB_PATH = "urgency.sqlite3"
+
+# (pnum, first day, last day); the 54th is the current Parliament
+PARLIAMENTS = [
+    (52, date(2017, 11, 7), date(2020, 9, 6)),
+    (53, date(2020, 11, 25), date(2023, 9, 8)),
+    (54, date(2023, 12, 3), None),
+]
+
+
+def parliament_for_date(d: date) -> int | None:
+    for pnum, start, end in PARLIAMENTS:
+        if start <= d and (end is None or d <= end):
+            return pnum
+    return None
+
+
+def history_items(db_path: str = DB_PATH) -> list[tuple[date, str, int]]:
+    items = []
+    for sitting_date, url in frontier_items(PARLIAMENTS[0][1], db_path=db_path):
+        pnum = parliament_for_date(sitting_date)
+        if pnum is not None:
+            items.append((sitting_date, url, pnum))
+    return items
+
+
+async def reparse_day(cache: ResponseCache, stage: ParseStage, version_hints: dict,
+                      missing: list, item):
+    sitting_date, url, pnum = item
+    entry = cache.get(url)
+    if entry is None or entry.status != 200:
+        missing.append(item)
+        return None
+    return await stage.parse(entry.text, url, version_hints.get(sitting_date.isoformat()))
+
+
+def stored_flags(db_path: str = DB_PATH) -> dict[str, int]:
+    conn = connect(db_path)
+    cursor = conn.cursor()
+    flags = {}
+    for table in ("legacy", "urgency"):
+        try:
+            cursor.execute(f"SELECT date, in_urgency FROM {table}")
+        except sqlite3.OperationalError:
+            continue
+        flags.update(dict(cursor.fetchall()))
+    conn.close()
+    return flags
+
+
+def stored_bill_urls(db_path: str = DB_PATH) -> set[str]:
+    conn = connect(db_path)
+    cursor = conn.cursor()
+    urls = set()
+    for table in ("bills", "lbills"):
+        try:
+            cursor.execute(f"SELECT url FROM {table}")
+        except sqlite3.OperationalError:
+            continue
+        urls.update(url for (url,) in cursor.fetchall())
+    conn.close()
+    return urls
+
+
+def compare(items, results, db_path: str = DB_PATH):
+    """Print where the new results differ from the database."""
+    flags = stored_flags(db_path)
+    bill_urls = stored_bill_urls(db_path)
+    changed = 0
+    new_bills = 0
+    for (sitting_date, url, pnum), values in zip(items, results):
+        if values is None:
+            continue
+        key = sitting_date.isoformat()
+        flag = values.get("in_urgency")
+        if flag is not None and flags.get(key) != flag:
+            changed += 1
+            print(f"  {key} (P{pnum}): in_urgency {flags.get(key)} -> {flag}")
+        for bill_name, bill_url in values.get("urgency_bills", []):
+            if bill_url not in bill_urls:
+                new_bills += 1
+                bill_urls.add(bill_url)
+                print(f"  {key} (P{pnum}): new urgency bill {bill_name!r}")
+    print(f"{changed} urgency flags differ; {new_bills} urgency bills are not stored yet.")
+
+
+def write_history(items, results, db_path: str = DB_PATH):
+    """Apply the reparsed values in one transaction."""
+    conn = connect(db_path)
+    with conn:
+        cursor = conn.cursor()
+        for (sitting_date, url, pnum), values in zip(items, results):
+            if values is None:
+                continue
+            key = sitting_date.isoformat()
+            flag = values.get("in_urgency")
+            bills = values.get("urgency_bills", [])
+            if pnum == 54:
+                if flag is not None:
+                    upsert_urgency(cursor, [(key, flag)])
+                upsert_bills(cursor, bills)
+            else:
+                if flag is not None:
+                    upsert_legacy(cursor, [(key, flag, pnum)])
+                upsert_lbills(cursor, [(name, bill_url, pnum) for name, bill_url in bills])
+            if "introduced_bills" in values:
+                write_introduced_bills(cursor, key, values["introduced_bills"])
+            if "procedural_flags" in values:
+                write_flags(cursor, key, values["procedural_flags"])
+            write_version(cursor, key, values.get("markup_version"))
+    conn.close()
+    print("Wrote the reparsed values.")
+
+
+async def reparse_history(write: bool = False):
+    init_pipeline_tables(DB_PATH)
+    items = history_items()
+    print(f"{len(items)} sitting days in the 52nd-54th Parliaments.")
+
+    cache = ResponseCache()
+    missing = []
+    t0 = time.perf_counter()
+    async with ParseStage(parse_pages) as stage:
+        results = await map_items(
+            items, partial(reparse_day, cache, stage, load_versions(DB_PATH), missing),
+            max(1, stage.capacity),
+        )
+    cache.close()
+    print(f"Reparsed {len(items) - len(missing)} pages in {time.perf_counter() - t0:.1f}s.")
+
+    if missing:
+        print(f"{len(missing)} sitting days are not in the HTTP cache:")
+        for sitting_date, url, pnum in sorted(missing):
+            print(f"  {sitting_date} (P{pnum}) {url}")
+
+    compare(items, results)
+    if write:
+        init_tables(init_legacy_table, init_lbills_table, db_path=DB_PATH)
+        write_history(items, results)
+
+
+if __name__ == "__main__":
+    asyncio.run(reparse_history(write="--write" in sys.argv[1:]))
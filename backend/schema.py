@@ -0,0 +1,225 @@
+"""
+schema.py
+
+Connections and the core tables of urgency.sqlite3, shared by every
+backend script.
+
+The website's PHP pages read urgency.sqlite3 while the nightly scrapers
+write to it, so:
+    - connect() opens the database in WAL mode with a busy timeout. Readers
+      keep seeing the last committed state while a write is in progress
+      instead of waiting for it, and a writer that meets another writer
+      waits up to BUSY_TIMEOUT seconds rather than failing with "database
+      is locked".
+    - Every table with one row per sitting day or bill has a unique key,
+      and writers upsert on it (INSERT ... ON CONFLICT DO UPDATE), so
+      re-running any scraper updates its rows instead of adding copies:
+          urgency (date), legacy (date, pnum), bills (url), lbills (url)
+    - The init_*_table() functions create a table, or bring an older one up
+      to date: duplicate rows left by earlier plain INSERTs are removed
+      (keeping the newest) before the unique index is created.
+
+The busy timeout can be changed with NZPT_DB_BUSY_TIMEOUT (seconds).
+"""
+import os
+import sqlite3
+
+DB_PATH = "urgency.sqlite3"
+BUSY_TIMEOUT = float(os.environ.get("NZPT_DB_BUSY_TIMEOUT", "30"))
+
+
+def connect(db_path: str = DB_PATH) -> sqlite3.Connection:
+    """Open the database in WAL mode, waiting up to BUSY_TIMEOUT for locks."""
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT)
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+
+def _dedupe(cursor, table: str, key: str):
+    """Keep only the newest row for each value of `key`."""
+    cursor.execute(f"""
+        DELETE FROM {table}
+        WHERE id NOT IN (SELECT MAX(id) FROM {table} GROUP BY {key})
+    """)
+    if cursor.rowcount > 0:
+        print(f"Removed {cursor.rowcount} duplicate {table} rows")
+
+
+def init_urgency_table(cursor):
+    """54th Parliament sitting days: (date, in_urgency), unique on date."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS urgency (
+            id INTEGER PRIMARY KEY,
+            date TEXT,
+            in_urgency INTEGER
+        )
+    """)
+    _dedupe(cursor, "urgency", "date")
+    cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_urgency_date ON urgency(date)
+    """)
+
+
+def init_legacy_table(cursor):
+    """52nd/53rd Parliament sitting days: (date, in_urgency, pnum), unique on (date, pnum)."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS legacy (
+            id INTEGER PRIMARY KEY,
+            date TEXT,
+            in_urgency INTEGER,
+            pnum INTEGER
+        )
+    """)
+    _dedupe(cursor, "legacy", "date, pnum")
+    cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_legacy_date_pnum ON legacy(date, pnum)
+    """)
+
+
+def init_bills_table(cursor):
+    """Bills passed under urgency in the 54th Parliament, unique on url."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS bills (
+            id INTEGER PRIMARY KEY,
+            bill_name TEXT,
+            url TEXT
+        )
+    """)
+    _dedupe(cursor, "bills", "url")
+    cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_bills_url ON bills(url)
+    """)
+
+
+def init_lbills_table(cursor):
+    """
+    Bills passed under urgency in the 52nd/53rd Parliaments, unique on url.
+    Adds `pnum` to a table created before it existed.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS lbills (
+            id INTEGER PRIMARY KEY,
+            bill_name TEXT,
+            url TEXT,
+            pnum INTEGER
+        )
+    """)
+    cursor.execute("PRAGMA table_info(lbills)")
+    if "pnum" not in {row[1] for row in cursor.fetchall()}:
+        cursor.execute("ALTER TABLE lbills ADD COLUMN pnum INTEGER")
+    _dedupe(cursor, "lbills", "url")
+    cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_lbills_url ON lbills(url)
+    """)
+
+
+def init_introduced_bills_table(cursor):
+    """Bills introduced since the 54th Parliament: (bill_id, url, first_seen), keyed on bill_id."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS introduced_bills (
+            bill_id TEXT PRIMARY KEY,
+            url TEXT,
+            first_seen TEXT
+        )
+    """)
+
+
+def init_bill_count_table(cursor):
+    """
+    The introduced-bills total billcounter.py last counted for a
+    Parliament, and the date it was counted on, keyed on pnum.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS bill_count (
+            pnum INTEGER PRIMARY KEY,
+            total INTEGER,
+            counted_on TEXT
+        )
+    """)
+
+
+def init_tables(*init_fns, db_path: str = DB_PATH):
+    """Run the given init_*_table() functions in one transaction."""
+    conn = connect(db_path)
+    with conn:
+        cursor = conn.cursor()
+        for init_fn in init_fns:
+            init_fn(cursor)
+    conn.close()
+
+
+# ---------------------------------------------------------------------------
+# Upserts
+# ---------------------------------------------------------------------------
+def upsert_urgency(cursor, rows):
+    """rows: (date, in_urgency)"""
+    cursor.executemany(
+        """
+        INSERT INTO urgency (date, in_urgency) VALUES (?, ?)
+        ON CONFLICT(date) DO UPDATE SET in_urgency = excluded.in_urgency
+        """,
+        rows,
+    )
+
+
+def upsert_legacy(cursor, rows):
+    """rows: (date, in_urgency, pnum)"""
+    cursor.executemany(
+        """
+        INSERT INTO legacy (date, in_urgency, pnum) VALUES (?, ?, ?)
+        ON CONFLICT(date, pnum) DO UPDATE SET in_urgency = excluded.in_urgency
+        """,
+        rows,
+    )
+
+
+def upsert_bills(cursor, rows):
+    """rows: (bill_name, url). Details (mps, desc, tags) are kept."""
+    cursor.executemany(
+        """
+        INSERT INTO bills (bill_name, url) VALUES (?, ?)
+        ON CONFLICT(url) DO UPDATE SET bill_name = excluded.bill_name
+        """,
+        rows,
+    )
+
+
+def upsert_lbills(cursor, rows):
+    """
+    rows: (bill_name, url, pnum). A bill taken under urgency in both
+    Parliaments stays with the first of them.
+    """
+    cursor.executemany(
+        """
+        INSERT INTO lbills (bill_name, url, pnum) VALUES (?, ?, ?)
+        ON CONFLICT(url) DO UPDATE SET
+            bill_name = excluded.bill_name,
+            pnum = MIN(COALESCE(lbills.pnum, excluded.pnum), excluded.pnum)
+        """,
+        rows,
+    )
+
+
+def write_bill_count(cursor, pnum: int, total: int, counted_on: str):
+    """Record a finished introduced-bills count."""
+    cursor.execute(
+        """
+        INSERT INTO bill_count (pnum, total, counted_on) VALUES (?, ?, ?)
+        ON CONFLICT(pnum) DO UPDATE SET
+            total = excluded.total, counted_on = excluded.counted_on
+        """,
+        (pnum, total, counted_on),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Queries
+# ---------------------------------------------------------------------------
+def count_introduced_bills(since: str, db_path: str = DB_PATH) -> int:
+    """Count the unique bills in `introduced_bills` first seen on or after `since` (ISO date)."""
+    conn = connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM introduced_bills WHERE first_seen >= ?", (since,))
+    count = cursor.fetchone()[0]
+    conn.close()
+    return count
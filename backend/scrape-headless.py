@@ -5,38 +5,96 @@
     - `id` (INTEGER PRIMARY KEY): Unique identifier for each record.
     - `date` (TEXT): The date of the sitting.
     - `in_urgency` (INTEGER): Whether the government was in urgency (1) or not (0).
+    `date` is unique and rows are upserted, so re-running is harmless.
+
+    Ingestion is incremental: every feed entry that has been checked is kept in
+    `rss_seen` (link + the entry's pubDate). Only entries that are new, or whose
+    pubDate changed, are loaded, so a morning with no new sittings costs one
+    feed fetch and no page loads. A page that fails to load (an error status,
+    or a challenge page that never shows the page's headings) is left out of
+    both tables, so it is tried again next run. A feed that fails to load or
+    has no entries is an error, not "nothing new".
     
     NOTE: This tool is the main tool. If there is missing multiple entries, a full scrape can be manually triggered using scrape-webpage.py
     
 """
 
 import asyncio
-import sqlite3
 import xml.etree.ElementTree as ET
 from datetime import datetime, date
 
 from playwright.async_api import async_playwright
 
+from navprofile import (
+    NAV_STATS,
+    READY_DAILY_PROGRESS,
+    READY_FEED,
+    goto_ready,
+    install_blocking,
+    page_ready,
+)
+from netarchive import install_archive_routing, open_archive
+from schema import connect, init_tables, init_urgency_table, upsert_urgency
+from siteconfig import RSS_FEED_URL
+
 DB_PATH = "/var/www/nzpt/urgency/urgency.sqlite3"
-RSS_FEED_URL = "https://www3.parliament.nz/en/highvolumegenericlisting/rss/1667"
 CURRENT_GOV_START = date(2023, 12, 3)
 URGENCY_PHRASE = "A motion to accord urgency to the following business was agreed to"
 
 
+class FeedError(Exception):
+    """Raised when the RSS feed could not be loaded or had no entries."""
+
+
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
+    init_tables(init_urgency_table, db_path=DB_PATH)
+    conn = connect(DB_PATH)
     cursor = conn.cursor()
     cursor.execute("""
-        CREATE TABLE IF NOT EXISTS urgency (
-            id INTEGER PRIMARY KEY,
+        CREATE TABLE IF NOT EXISTS rss_seen (
+            link TEXT PRIMARY KEY,
             date TEXT,
-            in_urgency INTEGER
+            pub_date TEXT,
+            ingested_at TEXT
         )
     """)
     conn.commit()
     conn.close()
 
 
+def load_rss_cursor() -> dict[str, str]:
+    """link -> pubDate text of every feed entry already ingested."""
+    conn = connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute("SELECT link, pub_date FROM rss_seen")
+    seen = dict(cursor.fetchall())
+    conn.close()
+    return seen
+
+
+def save_results(results):
+    """
+    Upsert the urgency flags and advance the RSS cursor in one transaction.
+    `results` is a list of (sitting_date, link, pub_date, in_urgency).
+    """
+    now = datetime.now().isoformat(timespec="seconds")
+    conn = connect(DB_PATH)
+    with conn:
+        cursor = conn.cursor()
+        upsert_urgency(cursor, [(d.isoformat(), in_urgency) for d, _, _, in_urgency in results])
+        cursor.executemany(
+            """
+            INSERT INTO rss_seen (link, date, pub_date, ingested_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT(link) DO UPDATE SET
+                date = excluded.date,
+                pub_date = excluded.pub_date,
+                ingested_at = excluded.ingested_at
+            """,
+            [(link, d.isoformat(), pub_date, now) for d, link, pub_date, _ in results],
+        )
+    conn.close()
+
+
 def parse_date(text: str):
     text = text.strip()
     fmts = [
@@ -57,12 +115,19 @@ def parse_date(text: str):
 
 
 async def scrape_with_playwright():
+    archive = open_archive()
     async with async_playwright() as p:
         browser = await p.chromium.launch(headless=True)
         page = await browser.new_page()
+        await install_archive_routing(page, archive)
+        await install_blocking(page)
 
         print("Loading RSS feed via headless browser...")
-        await page.goto(RSS_FEED_URL, wait_until="networkidle")
+        response = await goto_ready(page, RSS_FEED_URL, READY_FEED)
+        if not await page_ready(page, response, READY_FEED):
+            status = response.status if response else "no response"
+            await browser.close()
+            raise FeedError(f"RSS feed did not load (HTTP {status}, or no <item>/<entry> appeared)")
         html = await page.content()
 
         if "<rss" not in html and "<feed" not in html:
@@ -74,7 +139,7 @@ async def scrape_with_playwright():
             print("Still not seeing RSS/Atom XML. Snippet:")
             print(xml_text[:1000])
             await browser.close()
-            return
+            raise FeedError("RSS feed is not RSS/Atom XML")
 
         try:
             root = ET.fromstring(xml_text)
@@ -82,7 +147,7 @@ async def scrape_with_playwright():
             print("XML parse error:", e)
             print(xml_text[:1000])
             await browser.close()
-            return
+            raise FeedError(f"RSS feed could not be parsed: {e}") from e
 
         entries = [
             el for el in root.iter()
@@ -92,7 +157,7 @@ async def scrape_with_playwright():
 
         if not entries:
             await browser.close()
-            return
+            raise FeedError("RSS feed has no entries")
         work_items = []
         for el in entries:
             pub_el = None
@@ -122,41 +187,46 @@ async def scrape_with_playwright():
             if not link_href:
                 continue
 
-            work_items.append((sitting_date, link_href))
+            work_items.append((sitting_date, link_href, pub_el.text.strip()))
 
         print(f"{len(work_items)} entries on/after {CURRENT_GOV_START}")
 
+        # Skip entries already ingested with the same pubDate
+        seen = load_rss_cursor()
+        new_items = [item for item in work_items if seen.get(item[1]) != item[2]]
+        print(f"{len(work_items) - len(new_items)} already ingested; {len(new_items)} new or updated")
+
         results = []
-        for sitting_date, url in work_items:
+        for sitting_date, url, pub_date in new_items:
             print(f"Checking {sitting_date} -> {url}")
             try:
-                await page.goto(url, wait_until="networkidle")
+                response = await goto_ready(page, url, READY_DAILY_PROGRESS)
+                if not await page_ready(page, response, READY_DAILY_PROGRESS):
+                    status = response.status if response else "no response"
+                    print(f"Failed to load {url} ({status}); will retry next run")
+                    continue
                 content = await page.content()
             except Exception as e:
                 print(f"Failed to load {url}: {e}")
                 continue
 
             in_urgency = 1 if URGENCY_PHRASE in content else 0
-            results.append((sitting_date.isoformat(), in_urgency))
+            results.append((sitting_date, url, pub_date, in_urgency))
 
         await browser.close()
 
+    NAV_STATS.report()
+    if archive is not None:
+        archive.report()
+
     if results:
         try:
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
-            cursor.executemany(
-            "INSERT INTO urgency (date, in_urgency) VALUES (?, ?)",
-            results,
-            )
-            conn.commit()
-            conn.close()
-            print(f"Inserted {len(results)} rows into {DB_PATH}")
+            save_results(results)
+            print(f"Upserted {len(results)} rows into {DB_PATH}")
         except Exception as e:
             print(f"No new results found: {e}")
         finally:
             open("lastupdate.txt", "w").write(datetime.now().isoformat())
-        print(f"Inserted {len(results)} rows into {DB_PATH}")
     else:
         print("No results to insert.")
 
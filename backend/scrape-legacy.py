@@ -11,14 +11,16 @@ Data preceeding the 52nd Parliament is not provided in the same format on the we
 """
 
 import asyncio
-import sqlite3
-from datetime import datetime, date
+from datetime import date
+from functools import partial
 
-from playwright.async_api import async_playwright
+from fetchpool import CONCURRENCY, map_items
+from httpfetch import Fetcher
+from navprofile import READY_DAILY_PROGRESS
+from listingcrawler import crawl_listing_ranges, frontier_items
+from schema import connect, init_legacy_table, init_tables, upsert_legacy
 
 DB_PATH = "urgency.sqlite3"
-BASE_URL = "https://www3.parliament.nz"
-LIST_URL = f"{BASE_URL}/en/pb/daily-progress-in-the-house"
 URGENCY_PHRASE = "A motion to accord urgency to the following business was agreed to"
 
 # Date ranges for parliaments we care about
@@ -29,41 +31,6 @@ PARLIAMENT_RANGES = [
 ]
 
 EARLIEST_DATE = min(r[1] for r in PARLIAMENT_RANGES)
-MAX_LIST_PAGES = 78
-
-
-def init_legacy_table():
-    """
-    Create the 'legacy' table if it does not exist.
-    This script is intended as a one‑off; no unique index is needed.
-    """
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute(
-        """
-        CREATE TABLE IF NOT EXISTS legacy (
-            id INTEGER PRIMARY KEY,
-            date TEXT,
-            in_urgency INTEGER,
-            pnum INTEGER
-        )
-        """
-    )
-    conn.commit()
-    conn.close()
-
-
-def parse_listing_date(date_text: str):
-    """
-    Dates on listing pages look like '17 December 2025' (with &nbsp;).
-    """
-    if not date_text:
-        return None
-    cleaned = date_text.replace("\xa0", " ").strip()
-    try:
-        return datetime.strptime(cleaned, "%d %B %Y").date()
-    except ValueError:
-        return None
 
 
 def parliament_for_date(d: date) -> int | None:
@@ -77,132 +44,62 @@ def parliament_for_date(d: date) -> int | None:
     return None
 
 
-async def collect_listing_items(page):
+async def collect_legacy_items(fetcher):
     """
-    Crawl the listing pages and return a list of (date, full_url, pnum)
-    for all sitting days in the 52nd and 53rd parliaments.
-
-    Stops once it hits dates older than EARLIEST_DATE.
+    Add the sitting days of each range in PARLIAMENT_RANGES to the shared
+    listing frontier (seeking straight to the listing pages that cover it)
+    and return a list of (date, full_url, pnum) for all sitting days in the
+    52nd and 53rd parliaments.
     """
-    items: list[tuple[date, str, int]] = []
-
-    for page_num in range(1, MAX_LIST_PAGES + 1):
-        if page_num == 1:
-            url = LIST_URL
-        else:
-            url = f"{LIST_URL}?page={page_num}"
-
-        print(f"Listing page {page_num}: {url}")
-        await page.goto(url, wait_until="networkidle")
-
-        rows = await page.evaluate(
-            """
-            () => {
-              const rows = Array.from(
-                document.querySelectorAll("table.table--list tbody tr.list__row")
-              );
-              return rows.map(row => {
-                const link = row.querySelector("a.list__cell-heading");
-                const cells = row.querySelectorAll("td.list__cell");
-                const dateCell = cells.length > 1 ? cells[1] : null;
-                return {
-                  href: link ? link.getAttribute("href") : null,
-                  dateText: dateCell ? dateCell.textContent.trim() : null
-                };
-              });
-            }
-            """
-        )
-
-        if not rows:
-            print("No rows found on this listing page; assuming end of results.")
-            break
-
-        reached_before_earliest = False
-
-        for r in rows:
-            href = r.get("href")
-            date_text = r.get("dateText")
-            if not href or not date_text:
-                continue
-
-            sitting_date = parse_listing_date(date_text)
-            if not sitting_date:
-                continue
-
-
-            if sitting_date < EARLIEST_DATE:
-                reached_before_earliest = True
-                continue
-
-            pnum = parliament_for_date(sitting_date)
-            if pnum is None:
-
-                continue
-
-            full_url = BASE_URL + href
-            items.append((sitting_date, full_url, pnum))
-
-        if reached_before_earliest:
-            print("Reached dates earlier than earliest target; stopping pagination.")
-            break
-
-
-    seen = set()
-    unique_items: list[tuple[date, str, int]] = []
-    for d, u, p in items:
-        key = (d, u)
-        if key in seen:
-            continue
-        seen.add(key)
-        unique_items.append((d, u, p))
-
-    print(f"Collected {len(unique_items)} legacy listing items (52nd & 53rd).")
-    return unique_items
+    await crawl_listing_ranges(
+        fetcher, [(start, end) for _, start, end in PARLIAMENT_RANGES], db_path=DB_PATH
+    )
 
+    legacy_items: list[tuple[date, str, int]] = []
+    for pnum, start, end in PARLIAMENT_RANGES:
+        for sitting_date, url in frontier_items(start, end, db_path=DB_PATH):
+            legacy_items.append((sitting_date, url, pnum))
 
-async def scrape_legacy():
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
+    print(f"Collected {len(legacy_items)} legacy listing items (52nd & 53rd).")
+    return legacy_items
 
 
-        work_items = await collect_listing_items(page)
+async def check_legacy_day(fetcher, item):
+    """Return 1/0 for the urgency phrase on one legacy sitting day, or None on failure."""
+    sitting_date, url, pnum = item
+    print(f"Checking {sitting_date} (P{pnum}) -> {url}")
+    try:
+        content = await fetcher.get_text(url, READY_DAILY_PROGRESS)
+    except Exception as e:
+        print(f"Failed to load {url}: {e}")
+        return None
 
+    return 1 if URGENCY_PHRASE in content else 0
 
-        results: list[tuple[str, int, int]] = []
 
-        for sitting_date, url, pnum in work_items:
-            print(f"Checking {sitting_date} (P{pnum}) -> {url}")
-            try:
-                await page.goto(url, wait_until="networkidle")
-                content = await page.content()
-            except Exception as e:
-                print(f"Failed to load {url}: {e}")
-                continue
+async def scrape_legacy(concurrency: int = CONCURRENCY):
+    async with Fetcher(db_path=DB_PATH, concurrency=concurrency) as fetcher:
+        work_items = await collect_legacy_items(fetcher)
+        flags = await map_items(work_items, partial(check_legacy_day, fetcher), fetcher.max_concurrency)
 
-            in_urgency = 1 if URGENCY_PHRASE in content else 0
+    results: list[tuple[str, int, int]] = []
+    for (sitting_date, url, pnum), in_urgency in zip(work_items, flags):
+        if in_urgency is not None:
             results.append((sitting_date.isoformat(), in_urgency, pnum))
 
-        await browser.close()
-
-
     if results:
-        conn = sqlite3.connect(DB_PATH)
+        conn = connect(DB_PATH)
         cursor = conn.cursor()
-        cursor.executemany(
-            "INSERT INTO legacy (date, in_urgency, pnum) VALUES (?, ?, ?)",
-            results,
-        )
+        upsert_legacy(cursor, results)
         conn.commit()
         conn.close()
-        print(f"Inserted {len(results)} rows into legacy table.")
+        print(f"Upserted {len(results)} rows into legacy table.")
     else:
         print("No legacy results to insert.")
 
 
 async def main():
-    init_legacy_table()
+    init_tables(init_legacy_table, db_path=DB_PATH)
     await scrape_legacy()
 
 
@@ -12,9 +12,10 @@
 
 # Imports
 import os
-import sqlite3
 import requests
 
+from schema import connect, init_tables, init_urgency_table, upsert_urgency
+
 # Constants
 DB_PATH = "urgency.sqlite3"
 RSS_FEED_URL = "https://www3.parliament.nz/en/highvolumegenericlisting/rss/1667"
@@ -22,17 +23,7 @@ CURRENT_GOV_START = "2023-12-03"
 
 # Function to initialize the SQLite database
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS urgency (
-            id INTEGER PRIMARY KEY,
-            date TEXT,
-            in_urgency INTEGER
-        )
-    """)
-    conn.commit()
-    conn.close()
+    init_tables(init_urgency_table, db_path=DB_PATH)
     
 # Function to scrape the RSS feed and analyze urgency
 def scrape_and_analyze():
@@ -62,7 +53,7 @@ def scrape_and_analyze():
     feed_data = response.text
     entries = feed_data.split('<entry>')[1:]  # Split into individual items
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect(DB_PATH)
     cursor = conn.cursor()
 
     for entry in entries:
@@ -86,7 +77,7 @@ def scrape_and_analyze():
         content_text = content_response.text
         in_urgency = 1 if "A motion to accord urgency to the following business was agreed to" in content_text else 0
 
-        cursor.execute("INSERT INTO urgency (date, in_urgency) VALUES (?, ?)", (date_str, in_urgency))
+        upsert_urgency(cursor, [(date_str, in_urgency)])
 
     conn.commit()
     conn.close()
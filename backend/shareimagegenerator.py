@@ -1,12 +1,12 @@
-import sqlite3
 from PIL import Image, ImageDraw, ImageFont, ImageFilter, ImageEnhance
 from datetime import datetime
 import urllib.request
 import os
 
+from schema import connect
+
 # Database paths
 DB_PATH = '/var/www/nzpt/urgency.sqlite3'
-BILLCOUNTER_PATH = '/var/www/nzpt/billcounter.txt'
 LASTUPDATE_PATH = '/var/www/nzpt/lastupdate.txt'
 
 # Image settings — 1024x1024 square
@@ -68,31 +68,23 @@ def load_bg():
 
 
 def get_data():
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect(DB_PATH)
     c = conn.cursor()
 
-    c.execute('SELECT COUNT(id) FROM urgency')
-    num_days_sat = c.fetchone()[0]
-
-    c.execute('SELECT COUNT(id) FROM urgency WHERE in_urgency = 1')
-    num_days_urgency = c.fetchone()[0]
-
-    percent_urgency = round((num_days_urgency / num_days_sat) * 100, 1) if num_days_sat > 0 else 0
-
-    c.execute('SELECT COUNT(id) FROM bills')
-    count_bills_urgent = c.fetchone()[0]
-
+    # Written by statsbuilder.py at the end of each pipeline run
+    c.execute(
+        'SELECT days_sat, days_urgent, bills_urgent, total_bills, total_bills_as_of '
+        'FROM stats WHERE pnum = 54'
+    )
+    row = c.fetchone()
     conn.close()
+    if row is None:
+        raise LookupError("no stats for the 54th Parliament yet; run statsbuilder.py")
+    num_days_sat, num_days_urgency, count_bills_urgent, count_bills_all, billcounter_date = row
+    count_bills_all = count_bills_all or 0
+    billcounter_date = billcounter_date or 'N/A'
 
-    try:
-        with open(BILLCOUNTER_PATH, 'r') as f:
-            billcounter = f.read().strip()
-        count_bills_all, billcounter_date = billcounter.split(',')
-        count_bills_all = int(count_bills_all)
-    except Exception:
-        count_bills_all = 0
-        billcounter_date = 'N/A'
-
+    percent_urgency = round((num_days_urgency / num_days_sat) * 100, 1) if num_days_sat > 0 else 0
     percent_bills_urgent = round((count_bills_urgent / count_bills_all) * 100, 1) if count_bills_all > 0 else 0
 
     values = [
@@ -0,0 +1,53 @@
+"""
+siteconfig.py
+
+Where the backend scripts find parliament.nz.
+
+Everything is built from these two base URLs, so the whole pipeline can be
+pointed at another copy of the site, e.g. the local stand-in server in
+fakeparliament.py:
+
+    NZPT_BASE_URL=http://127.0.0.1:8765 NZPT_BILLS_URL=http://127.0.0.1:8765/bills \\
+        python billcounter.py
+"""
+import os
+from datetime import date
+from urllib.parse import urlparse
+
+# Daily progress, listing pages and the RSS feed
+BASE_URL = os.environ.get("NZPT_BASE_URL", "https://www3.parliament.nz").rstrip("/")
+# Bill pages (links to these are what the bill extractors look for)
+BILLS_URL = os.environ.get("NZPT_BILLS_URL", "https://bills.parliament.nz").rstrip("/")
+
+BILLS_HOST = urlparse(BILLS_URL).netloc
+
+LIST_URL = f"{BASE_URL}/en/pb/daily-progress-in-the-house"
+RSS_FEED_URL = f"{BASE_URL}/en/highvolumegenericlisting/rss/1667"
+
+
+def build_daily_progress_url(d: date) -> str:
+    """
+    Build the daily progress URL from a date, e.g.:
+
+    date(2025, 12, 9) ->
+      https://www3.parliament.nz/en/pb/daily-progress-in-the-house/
+      daily-progress-for-tuesday-9-december-2025
+    """
+    weekday = d.strftime("%A").lower()      # 'tuesday'
+    day = str(d.day)                        # '9' (no leading zero)
+    month = d.strftime("%B").lower()        # 'december'
+    year = d.year                           # 2025
+
+    slug = f"daily-progress-for-{weekday}-{day}-{month}-{year}"
+    return f"{LIST_URL}/{slug}"
+
+
+def is_bill_url(href: str) -> bool:
+    """True if `href` points at a bill page (bills.parliament.nz by default)."""
+    parsed = urlparse(href)
+    return BILLS_HOST in parsed.netloc and parsed.path.startswith(urlparse(BILLS_URL).path)
+
+
+def site_hosts() -> set[str]:
+    """Host names of the configured site, for the navigation blocker."""
+    return {urlparse(BASE_URL).hostname or "", urlparse(BILLS_URL).hostname or ""}
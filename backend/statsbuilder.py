@@ -0,0 +1,191 @@
+"""
+statsbuilder.py
+
+Headline figures for every Parliament, computed once per pipeline run and
+stored in the `stats` table of urgency.sqlite3, one row per Parliament
+(keyed by pnum):
+    - days_sat, days_urgent, percent_urgent
+    - bills_urgent, total_bills, percent_bills_urgent
+    - last_urgent_day, total_bills_as_of (date of the total_bills count)
+
+web/index.php, web/bills/index.php, web/historical/index.php and
+shareimagegenerator.py read these rows instead of counting the tables and
+reading billcounter.txt on every page view.
+
+Sources:
+    - 54th:      `urgency`, `bills`, and for the total the count
+                 billcounter.py last finished (`bill_count`), dated to the
+                 day it was counted rather than the day of this run
+    - 52nd/53rd: `legacy`, `lbills`, and TOTAL_BILLS for the total
+    - 48th-51st: PDF_STATS, counted from the Sessional Journals
+
+Percentages are rounded to 2 places, as the pages did. Run at the end of
+new-gen-automation.py's nightly run, or by hand: python statsbuilder.py
+"""
+from datetime import datetime
+
+from schema import (
+    connect,
+    init_bill_count_table,
+    init_bills_table,
+    init_lbills_table,
+    init_legacy_table,
+    init_tables,
+    init_urgency_table,
+)
+
+DB_PATH = "urgency.sqlite3"
+
+CURRENT_PNUM = 54
+LEGACY_PNUMS = (53, 52)
+
+# Official bill totals of finished Parliaments
+TOTAL_BILLS = {
+    53: 275,
+    52: 283,
+}
+
+# pnum: (days sat, days in urgency, bills under urgency, total bills),
+# from the Sessional Journals PDFs (legacy-journals/)
+PDF_STATS = {
+    51: (251, 12, 44, 305),
+    50: (227, 26, 68, 300),
+    49: (230, 36, 144, 352),
+    48: (246, 26, 66, 294),
+}
+
+
+def init_stats_table(db_path: str = DB_PATH):
+    """
+    Ensure the `stats` table exists.
+    """
+    conn = connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS stats (
+            pnum INTEGER PRIMARY KEY,
+            days_sat INTEGER,
+            days_urgent INTEGER,
+            percent_urgent REAL,
+            bills_urgent INTEGER,
+            total_bills INTEGER,
+            percent_bills_urgent REAL,
+            last_urgent_day TEXT,
+            total_bills_as_of TEXT,
+            updated_at TEXT
+        )
+    """)
+    conn.commit()
+    conn.close()
+
+
+def percent(part: int, whole: int | None) -> float:
+    return round(part / whole * 100, 2) if whole else 0
+
+
+def stats_row(pnum: int, days_sat: int, days_urgent: int, bills_urgent: int,
+              total_bills: int | None, last_urgent_day: str | None = None,
+              total_bills_as_of: str | None = None) -> tuple:
+    return (
+        pnum,
+        days_sat,
+        days_urgent,
+        percent(days_urgent, days_sat),
+        bills_urgent,
+        total_bills,
+        percent(bills_urgent, total_bills),
+        last_urgent_day,
+        total_bills_as_of,
+    )
+
+
+def build_stats(db_path: str = DB_PATH) -> list[tuple]:
+    """One stats_row() per Parliament, newest first."""
+    conn = connect(db_path)
+    cursor = conn.cursor()
+    rows = []
+
+    cursor.execute("""
+        SELECT COUNT(id), COUNT(CASE WHEN in_urgency = 1 THEN 1 END),
+               MAX(CASE WHEN in_urgency = 1 THEN date END)
+        FROM urgency
+    """)
+    days_sat, days_urgent, last_urgent_day = cursor.fetchone()
+    cursor.execute("SELECT COUNT(id) FROM bills")
+    bills_urgent = cursor.fetchone()[0]
+    cursor.execute("SELECT total, counted_on FROM bill_count WHERE pnum = ?", (CURRENT_PNUM,))
+    total_bills, counted_on = cursor.fetchone() or (None, None)
+    if total_bills is None:
+        print(f"No bill count recorded for P{CURRENT_PNUM}; run billcounter.py.")
+    rows.append(stats_row(
+        CURRENT_PNUM, days_sat, days_urgent, bills_urgent,
+        total_bills, last_urgent_day, counted_on,
+    ))
+
+    for pnum in LEGACY_PNUMS:
+        cursor.execute(
+            """
+            SELECT COUNT(id), COUNT(CASE WHEN in_urgency = 1 THEN 1 END),
+                   MAX(CASE WHEN in_urgency = 1 THEN date END)
+            FROM legacy WHERE pnum = ?
+            """,
+            (pnum,),
+        )
+        days_sat, days_urgent, last_urgent_day = cursor.fetchone()
+        cursor.execute("SELECT COUNT(id) FROM lbills WHERE pnum = ?", (pnum,))
+        bills_urgent = cursor.fetchone()[0]
+        rows.append(stats_row(
+            pnum, days_sat, days_urgent, bills_urgent, TOTAL_BILLS[pnum], last_urgent_day,
+        ))
+
+    conn.close()
+
+    for pnum, (days_sat, days_urgent, bills_urgent, total_bills) in PDF_STATS.items():
+        rows.append(stats_row(pnum, days_sat, days_urgent, bills_urgent, total_bills))
+    return rows
+
+
+def write_stats(rows, db_path: str = DB_PATH):
+    now = datetime.now().isoformat(timespec="seconds")
+    conn = connect(db_path)
+    with conn:
+        conn.executemany(
+            """
+            INSERT INTO stats (
+                pnum, days_sat, days_urgent, percent_urgent, bills_urgent, total_bills,
+                percent_bills_urgent, last_urgent_day, total_bills_as_of, updated_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(pnum) DO UPDATE SET
+                days_sat = excluded.days_sat,
+                days_urgent = excluded.days_urgent,
+                percent_urgent = excluded.percent_urgent,
+                bills_urgent = excluded.bills_urgent,
+                total_bills = excluded.total_bills,
+                percent_bills_urgent = excluded.percent_bills_urgent,
+                last_urgent_day = excluded.last_urgent_day,
+                total_bills_as_of = excluded.total_bills_as_of,
+                updated_at = excluded.updated_at
+            """,
+            [row + (now,) for row in rows],
+        )
+    conn.close()
+
+
+def main(db_path: str = DB_PATH):
+    init_tables(
+        init_urgency_table, init_bills_table, init_legacy_table, init_lbills_table,
+        init_bill_count_table, db_path=db_path,
+    )
+    init_stats_table(db_path)
+    rows = build_stats(db_path)
+    write_stats(rows, db_path)
+    for pnum, days_sat, days_urgent, pct, bills_urgent, total_bills, *_ in rows:
+        print(
+            f"P{pnum}: {days_urgent}/{days_sat} days in urgency ({pct}%), "
+            f"{bills_urgent}/{total_bills} bills"
+        )
+    print(f"Wrote stats for {len(rows)} Parliaments.")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,15 +7,56 @@
 # Output: append lines like
 #   48,11,125
 # to results.txt
+#
+# Text extraction is the slow part, so the pages to extract are split into
+# units of SHARD_PAGES pages and the units of all four Parliaments are
+# extracted at once across a process pool (WORKERS processes, one per CPU
+# by default).
+#
+# Only a few pages matter: those with an urgency motion and the pages around
+# them. So extraction has two tiers: pypdfium2 reads the raw text of every
+# page (about 2ms a page), and pdfplumber's layout-aware extraction (about
+# 100ms a page) runs only on the pages that mention urgency, the pages an
+# urgency motion carries over onto, and their neighbours. The other pages
+# use the raw text. `--full` uses pdfplumber for every page, and `--check`
+# runs both and reports any sitting day on which the results differ.
+#
+# Extracted page text is kept in a content-addressed cache (pagetextcache.py,
+# pagetext.sqlite3), so only new or changed PDFs are read again, and
+# re-running after a change to the patterns below takes seconds.
+#
+# Each Parliament's pages are then read back one at a time, in order, and
+# split into sitting days at their date headings as they stream past
+# (DaySegmenter), so only one day's text is held at a time.
 
 import os
 import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import NamedTuple
+
 import pdfplumber
+import pypdfium2
 
+from pagetextcache import PageTextCache, file_hash
 
 PDF_DIR = "pdf"
 RESULTS_PATH = "results.txt"
 
+# Worker processes for text extraction, and pages per unit of work. Each
+# unit re-opens its PDF, which costs pdfplumber about as much as extracting
+# 10 pages (it walks the whole page tree), so units are fairly large.
+WORKERS = os.cpu_count() or 1
+SHARD_PAGES = 100
+
+# Names how page text is extracted, as part of the page text cache key:
+# change it (or upgrade pdfplumber) and every page is extracted again.
+EXTRACTOR_VERSION = f"pdfplumber-{pdfplumber.__version__}/extract_text"
+
+# The fast extractor for the first tier (see layout_pages()), keyed the same way.
+FAST_EXTRACTOR_VERSION = f"pypdfium2-{pypdfium2.version.PYPDFIUM_INFO}/get_text_range"
+
 # Parliament -> list of PDF filenames (relative to PDF_DIR)
 PARLIAMENT_PDFS = {
     48: ["48-1.pdf", "48-2.pdf"],   # 48th split across two files
@@ -33,6 +74,11 @@ DATE_PATTERN = re.compile(
 # Phrase signalling an urgency motion
 URGENCY_PHRASE_PATTERN = re.compile(r"That urgency be accorded", re.IGNORECASE)
 
+# Pages whose fast text matches this get layout extraction. Looser than the
+# phrase itself, so a motion whose words the fast text spaces or breaks
+# differently is still caught.
+URGENCY_SCAN_PATTERN = re.compile(r"urgency", re.IGNORECASE)
+
 # Within an urgency block, approximate bill titles:
 # capture sentences/clauses containing "Bill" up to a semicolon, newline, or period.
 BILL_TITLE_PATTERN = re.compile(
@@ -40,85 +86,416 @@ BILL_TITLE_PATTERN = re.compile(
     re.IGNORECASE,
 )
 
+# One urgency block: from an occurrence of the phrase to the next one or the
+# end of the day
+URGENCY_BLOCK_PATTERN = re.compile(
+    r"(That urgency be accorded.*?)(?=That urgency be accorded|$)",
+    re.IGNORECASE | re.DOTALL,
+)
+
+# Longest stretch of text a date heading can take up; days are only cut at
+# headings followed by at least this much text, so one broken across a page
+# is never missed.
+HEADING_MARGIN = 200
+
 
-def extract_text_for_parliament(pnum: int) -> str:
+def pdf_paths(pnum: int) -> list[str]:
     """
-    Concatenate text from all PDFs for a parliament into a single string.
+    Paths of a parliament's PDFs, raising FileNotFoundError if any is missing.
     """
-    pdf_files = PARLIAMENT_PDFS[pnum]
-    chunks = []
-
-    for fname in pdf_files:
+    paths = []
+    for fname in PARLIAMENT_PDFS[pnum]:
         path = os.path.join(PDF_DIR, fname)
         if not os.path.exists(path):
             raise FileNotFoundError(f"Missing PDF for Parliament {pnum}: {path}")
-        print(f"Reading {path} ...")
-        with pdfplumber.open(path) as pdf:
-            for page in pdf.pages:
-                txt = page.extract_text() or ""
-                chunks.append(txt)
+        paths.append(path)
+    return paths
+
 
-    return "\n".join(chunks)
+def page_count(path: str) -> int:
+    pdf = pypdfium2.PdfDocument(path)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
 
 
-def analyze_parliament(pnum: int):
+def extract_pages(path: str, pages: list[int]) -> list[str]:
     """
-    Return (urgency_days, distinct_bill_count) for a parliament.
-    Deduplicates bills by title string within that parliament.
+    Layout-aware text of the given pages of one PDF. Runs in a worker process.
     """
-    text = extract_text_for_parliament(pnum)
+    with pdfplumber.open(path) as pdf:
+        return [(pdf.pages[i].extract_text() or "") for i in pages]
 
-    # Find all date markers (one per Daily Progress section)
-    matches = list(DATE_PATTERN.finditer(text))
-    if not matches:
-        print(f"Warning: no date headings found for Parliament {pnum}")
-        return 0, 0
 
-    urgency_days = 0
-    bills_seen = set()
+def fast_extract_pages(path: str, pages: list[int]) -> list[str]:
+    """
+    Raw text of the given pages of one PDF from pdfium's text layer: the
+    same words and lines, without pdfplumber's layout analysis, at about
+    2ms a page. Runs in a worker process.
+    """
+    pdf = pypdfium2.PdfDocument(path)
+    try:
+        texts = []
+        for i in pages:
+            text = pdf[i].get_textpage().get_text_range()
+            texts.append("\n".join(line.rstrip() for line in text.splitlines()))
+        return texts
+    finally:
+        pdf.close()
+
+
+EXTRACTORS = {
+    EXTRACTOR_VERSION: extract_pages,
+    FAST_EXTRACTOR_VERSION: fast_extract_pages,
+}
 
-    for i, m in enumerate(matches):
-        start = m.end()
-        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
-        day_text = text[start:end]
 
-        if not URGENCY_PHRASE_PATTERN.search(day_text):
-            continue  # no urgency that day
+class Progress:
+    """Pages extracted so far, with throughput and an estimate of the time left."""
 
-        urgency_days += 1
+    def __init__(self, total_pages: int):
+        self.total = total_pages
+        self.done = 0
+        self.started = time.perf_counter()
 
-        # For each urgency block that day, extract bills
-        # We take text from each occurrence of the phrase until the next one or end of the day.
-        day_urgency_pattern = re.compile(
-            r"(That urgency be accorded.*?)(?=That urgency be accorded|$)",
-            re.IGNORECASE | re.DOTALL,
+    def update(self, pages: int):
+        self.done += pages
+        elapsed = time.perf_counter() - self.started
+        rate = self.done / elapsed if elapsed else 0.0
+        eta = (self.total - self.done) / rate if rate else 0.0
+        print(
+            f"  {self.done}/{self.total} pages "
+            f"({rate:.1f} pages/s, about {eta:.0f}s left)"
         )
 
-        for urg_match in day_urgency_pattern.finditer(day_text):
-            block = urg_match.group(1)
+    def report(self):
+        elapsed = time.perf_counter() - self.started
+        rate = self.done / elapsed if elapsed else 0.0
+        print(f"Extracted {self.done} pages in {elapsed:.1f}s ({rate:.1f} pages/s).")
+
+
+def extract_missing(pool, cache: PageTextCache, extractor: str, wanted) -> set[int]:
+    """
+    Extract the pages in `wanted`, [(pnum, path, pdf hash, page numbers)],
+    that are not cached for `extractor` yet, SHARD_PAGES pages per unit of
+    work, storing each unit as it finishes. Returns the parliaments for
+    which a unit failed.
+    """
+    shards = []   # (pnum, path, content hash, page numbers)
+    for pnum, path, pdf_hash, pages in wanted:
+        cached = cache.cached_pages(pdf_hash, extractor)
+        todo = [page for page in pages if page not in cached]
+        print(f"Reading {path} ({len(pages)} pages, {len(todo)} to extract) ...")
+        shards.extend(
+            (pnum, path, pdf_hash, todo[i:i + SHARD_PAGES]) for i in range(0, len(todo), SHARD_PAGES)
+        )
+
+    failed = set()
+    if not shards:
+        return failed
+    progress = Progress(sum(len(pages) for *_, pages in shards))
+    futures = {
+        pool.submit(EXTRACTORS[extractor], path, pages): (pnum, path, pdf_hash, pages)
+        for pnum, path, pdf_hash, pages in shards
+    }
+    for future in as_completed(futures):
+        pnum, path, pdf_hash, pages = futures[future]
+        try:
+            texts = future.result()
+        except Exception as e:
+            print(f"Error analyzing Parliament {pnum}: {path} from page {pages[0] + 1}: {e}")
+            failed.add(pnum)
+            continue
+        cache.put_pages(pdf_hash, extractor, zip(pages, texts))
+        progress.update(len(texts))
+    progress.report()
+    return failed
+
+
+def layout_pages(cache: PageTextCache, pdfs) -> dict[str, list[int]]:
+    """
+    The pages of a parliament's PDFs, [(pdf hash, page count)], that need
+    layout extraction, judged from their fast text: pages mentioning
+    urgency, pages an urgency motion carries over onto (up to the next page
+    with a date heading, which ends that day), and the page either side of
+    each. Returns {pdf hash: page numbers}.
+    """
+    keys = [(pdf_hash, page) for pdf_hash, n_pages in pdfs for page in range(n_pages)]
+    flagged = set()
+    carrying = False
+    for i, (pdf_hash, page) in enumerate(keys):
+        text = cache.get_page(pdf_hash, FAST_EXTRACTOR_VERSION, page)
+        mentions = list(URGENCY_SCAN_PATTERN.finditer(text))
+        if mentions:
+            flagged.add(i)
+            carrying = DATE_PATTERN.search(text, mentions[-1].end()) is None
+        elif carrying:
+            flagged.add(i)
+            carrying = DATE_PATTERN.search(text) is None
+
+    selected = {j for i in flagged for j in (i - 1, i, i + 1) if 0 <= j < len(keys)}
+    pages = {pdf_hash: [] for pdf_hash, _ in pdfs}
+    for j in sorted(selected):
+        pdf_hash, page = keys[j]
+        pages[pdf_hash].append(page)
+    return pages
+
+
+def extract_parliaments(pnums, cache: PageTextCache, workers: int = WORKERS,
+                        two_tier: bool = True) -> dict[int, list[tuple[str, int, list | None]]]:
+    """
+    Make sure the text of the given parliaments' PDFs is in the page text
+    cache, extracting whatever is missing concurrently.
+
+    With `two_tier`, every page is first extracted with the fast extractor
+    and only the pages picked by layout_pages() with pdfplumber; otherwise
+    every page is extracted with pdfplumber.
+
+    Returns {pnum: [(pdf hash, page count, layout-extracted page numbers, or
+    None for all of them) for each of its PDFs]} for the parliaments whose
+    pages are all cached; ones with a missing PDF or a failed unit of work
+    are reported and left out.
+    """
+    jobs = []     # (pnum, path, content hash)
+    for pnum in pnums:
+        try:
+            paths = pdf_paths(pnum)
+        except FileNotFoundError as e:
+            print(f"Error analyzing Parliament {pnum}: {e}")
+            continue
+        jobs.extend((pnum, path, file_hash(path)) for path in paths)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        uncounted = [(path, pdf_hash) for _, path, pdf_hash in jobs
+                     if cache.page_count(pdf_hash) is None]
+        for (path, pdf_hash), n_pages in zip(
+            uncounted, pool.map(page_count, [path for path, _ in uncounted])
+        ):
+            cache.set_page_count(pdf_hash, n_pages)
+        counts = {pdf_hash: cache.page_count(pdf_hash) for _, _, pdf_hash in jobs}
+
+        failed = set()
+        layout = {pdf_hash: None for pdf_hash in counts}
+        if two_tier:
+            print("Fast text pass ...")
+            failed |= extract_missing(pool, cache, FAST_EXTRACTOR_VERSION, [
+                (pnum, path, pdf_hash, range(counts[pdf_hash])) for pnum, path, pdf_hash in jobs
+            ])
+            for pnum in {pnum for pnum, _, _ in jobs} - failed:
+                layout.update(layout_pages(cache, [
+                    (pdf_hash, counts[pdf_hash]) for p, _, pdf_hash in jobs if p == pnum
+                ]))
+            print("Layout pass ...")
+        failed |= extract_missing(pool, cache, EXTRACTOR_VERSION, [
+            (pnum, path, pdf_hash,
+             range(counts[pdf_hash]) if layout[pdf_hash] is None else layout[pdf_hash])
+            for pnum, path, pdf_hash in jobs if pnum not in failed
+        ])
+
+    pdfs = {}
+    for pnum, path, pdf_hash in jobs:
+        if pnum not in failed:
+            pdfs.setdefault(pnum, []).append((pdf_hash, counts[pdf_hash], layout[pdf_hash]))
+    return pdfs
+
+
+def parliament_pages(cache: PageTextCache, pdfs):
+    """
+    Yield the text of each page of a parliament's PDFs, in order, straight
+    from the page text cache (see extract_parliaments()): the layout
+    extraction where there is one, the fast text elsewhere.
+    """
+    for pdf_hash, n_pages, layout in pdfs:
+        layout = None if layout is None else set(layout)
+        for page in range(n_pages):
+            extractor = (
+                EXTRACTOR_VERSION if layout is None or page in layout else FAST_EXTRACTOR_VERSION
+            )
+            yield cache.get_page(pdf_hash, extractor, page)
+
+
+class SittingDay(NamedTuple):
+    heading: str          # e.g. "Wednesday, 21 December 2011"
+    in_urgency: bool
+    bills: list[str]      # distinct bill titles in that day's urgency motions
+
+
+def urgency_bills(day_text: str) -> list[str]:
+    """Distinct bill titles in one day's urgency motions, in order."""
+    titles = []
+    for urg_match in URGENCY_BLOCK_PATTERN.finditer(day_text):
+        block = urg_match.group(1)
+
+        # Find bill-like phrases
+        for bill_match in BILL_TITLE_PATTERN.finditer(block):
+            raw_title = bill_match.group(1)
+            if not raw_title:
+                continue
+
+            # Normalise whitespace and trailing punctuation
+            title = " ".join(raw_title.split()).strip(" ;:,.")
+            # Require 'bill' in the title to reduce false positives
+            if "bill" not in title.lower():
+                continue
+
+            if title not in titles:
+                titles.append(title)
+    return titles
+
+
+def sitting_day(heading: str, day_text: str) -> SittingDay:
+    if not URGENCY_PHRASE_PATTERN.search(day_text):
+        return SittingDay(heading, False, [])  # no urgency that day
+    return SittingDay(heading, True, urgency_bills(day_text))
+
+
+class DaySegmenter:
+    """
+    Splits a stream of page texts into sitting days: feed() each page in
+    order and it returns the days closed by a date heading on that page;
+    finish() returns the last day.
+
+    The result is the same as joining all pages with newlines and cutting
+    the text at every DATE_PATTERN match, but only the current day's text
+    is held. A heading can run across a page break, so one is accepted only
+    once HEADING_MARGIN characters follow it, and the last HEADING_MARGIN
+    characters are searched again when the next page arrives.
+    """
+
+    def __init__(self):
+        self.text = None      # text since the current heading (all text before the first)
+        self.heading = None   # None until the first heading
+        self.scan_from = 0    # no heading can start before this offset in `text`
+
+    def feed(self, page: str) -> list[SittingDay]:
+        self.text = page if self.text is None else self.text + "\n" + page
+        return self._split(len(self.text) - HEADING_MARGIN)
+
+    def finish(self) -> list[SittingDay]:
+        if self.text is None:
+            return []
+        days = self._split(len(self.text))
+        if self.heading is not None:
+            days.append(sitting_day(self.heading, self.text))
+        self.text, self.heading, self.scan_from = None, None, 0
+        return days
 
-            # Find bill-like phrases
-            for bill_match in BILL_TITLE_PATTERN.finditer(block):
-                raw_title = bill_match.group(1)
-                if not raw_title:
-                    continue
+    def _split(self, limit: int) -> list[SittingDay]:
+        """Close a day at every heading that ends by offset `limit`."""
+        days = []
+        while True:
+            m = DATE_PATTERN.search(self.text, self.scan_from)
+            if m is None or m.end() > limit:
+                break
+            if self.heading is not None:
+                days.append(sitting_day(self.heading, self.text[:m.start()]))
+            self.heading = m.group(0)
+            self.text = self.text[m.end():]
+            limit -= m.end()
+            self.scan_from = 0
+        # Nothing can start a heading before `limit`, except a heading
+        # found there that needs the next page to be confirmed
+        self.scan_from = max(self.scan_from, limit if m is None else min(m.start(), limit))
+        return days
 
-                # Normalise whitespace and trailing punctuation
-                title = " ".join(raw_title.split()).strip(" ;:,.")
-                # Require 'bill' in the title to reduce false positives
-                if "bill" not in title.lower():
-                    continue
 
-                bills_seen.add(title)
+def sitting_days(pages):
+    """Yield a SittingDay for each date heading in a stream of page texts."""
+    segmenter = DaySegmenter()
+    for page in pages:
+        yield from segmenter.feed(page)
+    yield from segmenter.finish()
 
+
+def analyze_parliament(pnum: int, pages=None):
+    """
+    Return (urgency_days, distinct_bill_count) for a parliament, from an
+    iterable of its page texts (by default read through the page text cache,
+    extracting them first if needed).
+    Deduplicates bills by title string within that parliament.
+    """
+    if pages is None:
+        cache = PageTextCache()
+        try:
+            pdfs = extract_parliaments([pnum], cache)
+            if pnum not in pdfs:
+                raise RuntimeError(f"could not extract the text of Parliament {pnum}")
+            return analyze_parliament(pnum, parliament_pages(cache, pdfs[pnum]))
+        finally:
+            cache.close()
+
+    days = 0
+    urgency_days = 0
+    bills_seen = set()
+    for day in sitting_days(pages):
+        days += 1
+        if day.in_urgency:
+            urgency_days += 1
+            bills_seen.update(day.bills)
+
+    if not days:
+        print(f"Warning: no date headings found for Parliament {pnum}")
+        return 0, 0
     return urgency_days, len(bills_seen)
 
 
-def main():
-    for pnum in [48, 49, 50, 51]:
+def check_two_tier(pnums) -> bool:
+    """
+    Accuracy check for two-tier extraction: analyze each parliament from
+    both two-tier and full layout extraction, and print the result of each
+    and every urgency day on which they differ. True if none do.
+    """
+    cache = PageTextCache()
+    full = extract_parliaments(pnums, cache, two_tier=False)
+    two_tier = extract_parliaments(pnums, cache)
+
+    matches = True
+    for pnum in pnums:
+        if pnum not in full or pnum not in two_tier:
+            continue
+        expected = [day for day in sitting_days(parliament_pages(cache, full[pnum]))
+                    if day.in_urgency]
+        got = [day for day in sitting_days(parliament_pages(cache, two_tier[pnum]))
+               if day.in_urgency]
+        n_pages = sum(n for _, n, _ in two_tier[pnum])
+        n_layout = sum(len(layout) for _, _, layout in two_tier[pnum])
+        print(
+            f"Parliament {pnum}: layout extraction on {n_layout} of {n_pages} pages; "
+            f"full {analyze_parliament(pnum, parliament_pages(cache, full[pnum]))}, "
+            f"two-tier {analyze_parliament(pnum, parliament_pages(cache, two_tier[pnum]))}"
+        )
+        for day in expected:
+            if day not in got:
+                matches = False
+                print(f"  only in full extraction: {day.heading}: {day.bills}")
+        for day in got:
+            if day not in expected:
+                matches = False
+                print(f"  only in two-tier extraction: {day.heading}: {day.bills}")
+
+    cache.close()
+    print("Two-tier extraction matches." if matches else "Two-tier extraction differs.")
+    return matches
+
+
+def main(args):
+    pnums = [48, 49, 50, 51]
+    if "--check" in args:
+        sys.exit(0 if check_two_tier(pnums) else 1)
+
+    print(f"Extracting Parliaments {pnums[0]}–{pnums[-1]} with {WORKERS} workers ...")
+    cache = PageTextCache()
+    pdfs = extract_parliaments(pnums, cache, two_tier="--full" not in args)
+
+    for pnum in pnums:
+        if pnum not in pdfs:
+            continue
         print(f"Analyzing Parliament {pnum} ...")
         try:
-            urgency_days, bill_count = analyze_parliament(pnum)
+            urgency_days, bill_count = analyze_parliament(
+                pnum, parliament_pages(cache, pdfs[pnum])
+            )
         except Exception as e:
             print(f"Error analyzing Parliament {pnum}: {e}")
             continue
@@ -130,6 +507,9 @@ def main():
         with open(RESULTS_PATH, "a", encoding="utf-8") as f:
             f.write(line)
 
+    cache.report()
+    cache.close()
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(sys.argv[1:])
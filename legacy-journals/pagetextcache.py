@@ -0,0 +1,109 @@
+# pagetextcache.py
+#
+# Persistent cache of the text extracted from journal PDF pages, used by
+# historical_urgency.py so unchanged journals are never extracted twice.
+#
+# Entries are content-addressed:
+#     - a PDF is identified by the SHA-256 of its bytes, so renaming or
+#       re-downloading an identical file still hits the cache, and a changed
+#       file misses it;
+#     - `pages` holds the zlib-compressed text of each page, keyed by
+#       (pdf hash, page number, extractor version). The extractor version
+#       names the library and options used, so changing either just stops
+#       the old entries from being used;
+#     - `pdfs` holds each PDF's page count, so a fully cached PDF is not
+#       opened with pdfplumber at all.
+#
+# The location can be changed with NZPT_PAGE_TEXT_CACHE.
+
+import hashlib
+import os
+import sqlite3
+import zlib
+
+CACHE_PATH = os.environ.get("NZPT_PAGE_TEXT_CACHE", "pagetext.sqlite3")
+
+
+def file_hash(path: str) -> str:
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class PageTextCache:
+    """(pdf hash, page, extractor version) -> page text."""
+
+    def __init__(self, path: str = CACHE_PATH):
+        self.path = path
+        self.hits = 0
+        self.stores = 0
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS pdfs (
+                pdf_hash TEXT PRIMARY KEY,
+                pages INTEGER
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                pdf_hash TEXT,
+                page INTEGER,
+                extractor TEXT,
+                text BLOB,
+                PRIMARY KEY (pdf_hash, page, extractor)
+            )
+        """)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def page_count(self, pdf_hash: str) -> int | None:
+        row = self.conn.execute(
+            "SELECT pages FROM pdfs WHERE pdf_hash = ?", (pdf_hash,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def set_page_count(self, pdf_hash: str, pages: int):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO pdfs (pdf_hash, pages) VALUES (?, ?)", (pdf_hash, pages)
+        )
+        self.conn.commit()
+
+    def cached_pages(self, pdf_hash: str, extractor: str) -> set[int]:
+        """Page numbers of one PDF that are in the cache."""
+        rows = self.conn.execute(
+            "SELECT page FROM pages WHERE pdf_hash = ? AND extractor = ?",
+            (pdf_hash, extractor),
+        ).fetchall()
+        return {page for (page,) in rows}
+
+    def get_page(self, pdf_hash: str, extractor: str, page: int) -> str | None:
+        row = self.conn.execute(
+            "SELECT text FROM pages WHERE pdf_hash = ? AND page = ? AND extractor = ?",
+            (pdf_hash, page, extractor),
+        ).fetchone()
+        if row is None:
+            return None
+        self.hits += 1
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def put_pages(self, pdf_hash: str, extractor: str, pages):
+        """Store (page number, text) pairs."""
+        rows = [
+            (pdf_hash, page, extractor, zlib.compress(text.encode("utf-8")))
+            for page, text in pages
+        ]
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO pages (pdf_hash, page, extractor, text) VALUES (?, ?, ?, ?)",
+            rows,
+        )
+        self.conn.commit()
+        self.stores += len(rows)
+
+    def report(self):
+        print(f"Page text cache: {self.hits} pages loaded, {self.stores} pages extracted and stored.")
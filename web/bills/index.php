@@ -2,14 +2,17 @@
 
 // Load data from urgency.sqlite3
 $db = new SQLite3('../urgency.sqlite3');
-$num_days_sat = $db->querySingle('SELECT COUNT(id) FROM urgency');
-$num_days_urgency = $db->querySingle('SELECT COUNT(id) FROM urgency WHERE in_urgency = 1');
-$percent_urgency = $num_days_sat > 0 ? round(($num_days_urgency / $num_days_sat) * 100, 2) : 0;
-$last_day_urgent = $db->querySingle('SELECT date FROM urgency WHERE in_urgency = 1 ORDER BY date DESC LIMIT 1');
+$db->busyTimeout(5000);
+// Headline figures, written by backend/statsbuilder.py
+$stats = $db->querySingle('SELECT * FROM stats WHERE pnum = 54', true) ?: [];
+$num_days_sat = $stats['days_sat'] ?? 0;
+$num_days_urgency = $stats['days_urgent'] ?? 0;
+$percent_urgency = $stats['percent_urgent'] ?? 0;
+$last_day_urgent = $stats['last_urgent_day'] ?? null;
 $last_day_urgent_readable = $last_day_urgent ? (new DateTime($last_day_urgent))->format('d M Y') : 'N/A';
 $days_since_urgency = $last_day_urgent ? (new DateTime())->diff(new DateTime($last_day_urgent))->days : 'N/A';
 $last_updated = file_get_contents('../lastupdate.txt');
-$count_bills_affected = $db->querySingle('SELECT COUNT(id) FROM bills');
+$count_bills_affected = $stats['bills_urgent'] ?? 0;
 $allBills = $db->query('SELECT tags, mps FROM bills');
 $tagCounts = [
     'PUU'  => 0, // Passed
@@ -2,69 +2,33 @@
 
 // Load data from urgency.sqlite3
 $db = new SQLite3('../urgency.sqlite3');
+$db->busyTimeout(5000);
+
+// Headline figures of every Parliament, written by backend/statsbuilder.py
+// (the 48th-51st from the Sessional Journals PDFs). Every figure shown
+// below is $stats[pnum][column]; it is 0 if the stats table is missing,
+// has no row for that Parliament or the value is NULL.
+$stats = [];
+$result = @$db->query('SELECT * FROM stats');
+while ($result && ($row = $result->fetchArray(SQLITE3_ASSOC))) {
+    $stats[$row['pnum']] = array_filter($row, 'is_scalar');
+}
+$stats_defaults = [
+    'days_sat' => 0,
+    'days_urgent' => 0,
+    'percent_urgent' => 0,
+    'bills_urgent' => 0,
+    'total_bills' => 0,
+    'percent_bills_urgent' => 0,
+];
+foreach (range(48, 54) as $p) {
+    $stats[$p] = ($stats[$p] ?? []) + $stats_defaults;
+}
 
-// 54th Parliament Stats
-$num_days_sat_54 = $db->querySingle('SELECT COUNT(id) FROM urgency');
-$num_days_urgency_54 = $db->querySingle('SELECT COUNT(id) FROM urgency WHERE in_urgency = 1');
-$percent_urgency_54 = $num_days_sat_54 > 0 ? round(($num_days_urgency_54 / $num_days_sat_54) * 100, 2) : 0;
 $last_updated_54 = file_get_contents('../lastupdate.txt');
-$count_bills_affected_54 = $db->querySingle('SELECT COUNT(id) FROM bills');
-$count_total_bills_54 = (int)explode(',', (file_get_contents('../billcounter.txt')))[0];
-$ratio_urgent_54 = $count_total_bills_54 > 0 ? round(($count_bills_affected_54 / $count_total_bills_54) * 100, 2) : 0;
-
-// 53rd Parliament Stats
-$num_days_sat_53 = $db->querySingle('SELECT COUNT(id) FROM legacy WHERE pnum = 53');
-$num_days_urgency_53 = $db->querySingle('SELECT COUNT(id) FROM legacy WHERE pnum = 53 AND in_urgency = 1');
-$percent_urgency_53 = $num_days_sat_53 > 0 ? round(($num_days_urgency_53 / $num_days_sat_53) * 100, 2) : 0;
-$count_bills_affected_53 = $db->querySingle('SELECT COUNT(id) FROM lbills WHERE pnum = 53');
-$count_total_bills_53 = '275';
-$ratio_urgent_53 = $count_total_bills_53 > 0 ? round(($count_bills_affected_53 / $count_total_bills_53) * 100, 2) : 0;
 $last_scraped_53 = 'December 24th 2025';
-
-
-// 52nd Parliament Stats
-$num_days_sat_52 = $db->querySingle('SELECT COUNT(id) FROM legacy WHERE pnum = 52');
-$num_days_urgency_52 = $db->querySingle('SELECT COUNT(id) FROM legacy WHERE pnum = 52 AND in_urgency = 1');
-$percent_urgency_52 = $num_days_sat_52 > 0 ? round(($num_days_urgency_52 / $num_days_sat_52) * 100, 2) : 0;
-$count_bills_affected_52 = $db->querySingle('SELECT COUNT(id) FROM lbills WHERE pnum = 52');
-$count_total_bills_52 = '283';
-$ratio_urgent_52 = $count_total_bills_52 > 0 ? round(($count_bills_affected_52 / $count_total_bills_52) * 100, 2) : 0;
 $last_scraped_52 = 'December 24th 2025';
 
-// START pdf-scraped data
-
-// 51st Parliament Stats
-$num_days_sat_51 = '251';
-$num_days_urgency_51 = '12';
-$percent_urgency_51 = $num_days_sat_51 > 0 ? round(($num_days_urgency_51 / $num_days_sat_51) * 100, 2) : 0;
-$count_bills_affected_51 = '44';
-$count_total_bills_51 = '305';
-$ratio_urgent_51 = $count_total_bills_51 > 0 ? round(($count_bills_affected_51 / $count_total_bills_51) * 100, 2) : 0;
-
-// 50th Parliament Stats
-$num_days_sat_50 = '227';
-$num_days_urgency_50 = '26';
-$percent_urgency_50 = $num_days_sat_50 > 0 ? round(($num_days_urgency_50 / $num_days_sat_50) * 100, 2) : 0;
-$count_bills_affected_50 = '68';
-$count_total_bills_50 = '300';
-$ratio_urgent_50 = $count_total_bills_50 > 0 ? round(($count_bills_affected_50 / $count_total_bills_50) * 100, 2) : 0;
-
-// 49th Parliament Stats
-$num_days_sat_49 = '230';
-$num_days_urgency_49 = '36';
-$percent_urgency_49 = $num_days_sat_49 > 0 ? round(($num_days_urgency_49 / $num_days_sat_49) * 100, 2) : 0;
-$count_bills_affected_49 = '144';
-$count_total_bills_49 = '352';
-$ratio_urgent_49 = $count_total_bills_49 > 0 ? round(($count_bills_affected_49 / $count_total_bills_49) * 100, 2) : 0; 
-
-// 48th Parliament Stats
-$num_days_sat_48 = '246';
-$num_days_urgency_48 = '26';
-$percent_urgency_48 = $num_days_sat_48 > 0 ? round(($num_days_urgency_48 / $num_days_sat_48) * 100, 2) : 0;
-$count_bills_affected_48 = '66';
-$count_total_bills_48 = '294';
-$ratio_urgent_48 = $count_total_bills_48 > 0 ? round(($count_bills_affected_48 / $count_total_bills_48) * 100, 2) : 0;  
-
 
 // STATIC
 $PAGE_UPDATED = "April 8th 2026";
@@ -84,19 +48,19 @@ $PAGE_UPDATED = "April 8th 2026";
     <link rel="icon" type="image/ico" href="https://nzpt.cjs.nz/assets/favicon.ico">
     <script src="assets/script.js"></script>
     <!-- META TAGS -->
-    <meta name="description" content="The 54th Parliament of New Zealand has passed <?php echo $count_bills_affected_54; ?> bills under urgency. How does this compare?">
+    <meta name="description" content="The 54th Parliament of New Zealand has passed <?php echo $stats[54]['bills_urgent']; ?> bills under urgency. How does this compare?">
     <meta name="author" content="CJ Sandall">
     <!-- TWITTER CARD META -->
     <meta name="twitter:card" content="summary_large_image">
     <meta name="twitter:creator" content="@ohitshammy">
     <meta name="twitter:title" content="New Zealand Politics Tracker">
-    <meta name="twitter:description" content="The NZ Govt has passed <?php echo $count_bills_affected_54; ?> bills under urgency! How does this compare?">
+    <meta name="twitter:description" content="The NZ Govt has passed <?php echo $stats[54]['bills_urgent']; ?> bills under urgency! How does this compare?">
     <meta name="twitter:image" content="https://nzpt.cjs.nz/assets/nzpt-bannertype.png">
     <!-- OPEN GRAPH META -->
     <meta property="og:title" content="Historical Data">
     <meta property="og:site_name" content="New Zealand Politics Tracker">
     <meta property="og:url" content="https://nzpt.cjs.nz/urgency">
-    <meta property="og:description" content="The NZ Govt has passed <?php echo $count_bills_affected_54; ?> bills under urgency! How does this compare?">
+    <meta property="og:description" content="The NZ Govt has passed <?php echo $stats[54]['bills_urgent']; ?> bills under urgency! How does this compare?">
     <meta property="og:type" content="website">
     <meta property="og:image" content="https://nzpt.cjs.nz/assets/nzpt-bannertype.png">
     <!-- Privacy Analytics -->
@@ -134,12 +98,12 @@ $PAGE_UPDATED = "April 8th 2026";
             <h3 class="stats-card__title">54th Parliament of New Zealand (2023 -> Present)</h3>
             <em>(As of <?php echo $last_updated_54; ?>)</em>
             <ul>
-                <li><strong>Total Days Sat:</strong> <?php echo $num_days_sat_54; ?></li>
-                <li><strong>Total Days in Urgency:</strong> <?php echo $num_days_urgency_54; ?></li>
-                <li><strong>Percentage of Days in Urgency:</strong> <?php echo $percent_urgency_54; ?>%</li>
-                <li><strong>Total Bills Urgent:</strong> <?php echo $count_bills_affected_54; ?></li>
-                <li><strong>Total Bills:</strong> <?php echo $count_total_bills_54; ?> <span title="The official bill count is not published until after a Parliament term has concluded. The number displayed on NZPT is calculated daily by scraping the Parliament website. This number includes Government Bills, Local Bills, and Member Bills."><i class="fa-solid fa-circle-info"></i></span></small></li>
-                <li><strong>Ratio of urgent bills:</strong> <?php echo $ratio_urgent_54; ?>% </li>
+                <li><strong>Total Days Sat:</strong> <?php echo $stats[54]['days_sat']; ?></li>
+                <li><strong>Total Days in Urgency:</strong> <?php echo $stats[54]['days_urgent']; ?></li>
+                <li><strong>Percentage of Days in Urgency:</strong> <?php echo $stats[54]['percent_urgent']; ?>%</li>
+                <li><strong>Total Bills Urgent:</strong> <?php echo $stats[54]['bills_urgent']; ?></li>
+                <li><strong>Total Bills:</strong> <?php echo $stats[54]['total_bills']; ?> <span title="The official bill count is not published until after a Parliament term has concluded. The number displayed on NZPT is calculated daily by scraping the Parliament website. This number includes Government Bills, Local Bills, and Member Bills."><i class="fa-solid fa-circle-info"></i></span></small></li>
+                <li><strong>Ratio of urgent bills:</strong> <?php echo $stats[54]['percent_bills_urgent']; ?>% </li>
                 <li class="party-icon"><i><img src="https://upload.wikimedia.org/wikipedia/commons/thumb/8/85/New_Zealand_National_Party_logo_%282017%E2%80%93present%29.svg/120px-New_Zealand_National_Party_logo_%282017%E2%80%93present%29.svg.png" alt="national-logo"> <img src="https://upload.wikimedia.org/wikipedia/commons/thumb/3/3f/ACT_New_Zealand_CMYK.svg/120px-ACT_New_Zealand_CMYK.svg.png" alt="act-logo"> <img src="https://upload.wikimedia.org/wikipedia/commons/thumb/0/09/New_Zealand_First_logo_2017.svg/120px-New_Zealand_First_logo_2017.svg.png" alt="first-logo"></i></li>
             </ul>
         </article>
@@ -147,72 +111,72 @@ $PAGE_UPDATED = "April 8th 2026";
         <article class="stats-card">
             <h3 class="stats-card__title">53rd Parliament of New Zealand (2020 -> 2023)</h3>
             <ul>
-            <li><strong>Total Days Sat:</strong> <?php echo $num_days_sat_53; ?></li>
-            <li><strong>Total Days in Urgency:</strong> <?php echo $num_days_urgency_53; ?></li>
-            <li><strong>Percentage of Days in Urgency:</strong> <?php echo $percent_urgency_53; ?>%</li>
-            <li><strong>Total Bills Urgent:</strong> <?php echo $count_bills_affected_53; ?></li>
-            <li><strong>Total Bills:</strong> <?php echo $count_total_bills_53; ?></li>
-            <li><strong>Ratio of urgent bills:</strong> <?php echo $ratio_urgent_53; ?>%</li>
+            <li><strong>Total Days Sat:</strong> <?php echo $stats[53]['days_sat']; ?></li>
+            <li><strong>Total Days in Urgency:</strong> <?php echo $stats[53]['days_urgent']; ?></li>
+            <li><strong>Percentage of Days in Urgency:</strong> <?php echo $stats[53]['percent_urgent']; ?>%</li>
+            <li><strong>Total Bills Urgent:</strong> <?php echo $stats[53]['bills_urgent']; ?></li>
+            <li><strong>Total Bills:</strong> <?php echo $stats[53]['total_bills']; ?></li>
+            <li><strong>Ratio of urgent bills:</strong> <?php echo $stats[53]['percent_bills_urgent']; ?>%</li>
             <li class="party-icon"><i><img src="https://upload.wikimedia.org/wikipedia/commons/thumb/4/49/New_Zealand_Labour_Party_logo_%28January_2016%E2%80%93present%29.svg/120px-New_Zealand_Labour_Party_logo_%28January_2016%E2%80%93present%29.svg.png" alt="labour-logo"></i></li>
         </ul>
         </article>
         <article class="stats-card">
             <h3 class="stats-card__title">52nd Parliament of New Zealand (2017 -> 2020)</h3>
         <ul>
-            <li><strong>Total Days Sat:</strong> <?php echo $num_days_sat_52; ?></li>
-            <li><strong>Total Days in Urgency:</strong> <?php echo $num_days_urgency_52; ?></li>
-            <li><strong>Percentage of Days in Urgency:</strong> <?php echo $percent_urgency_52; ?>%</li>
-            <li><strong>Total Bills Urgent:</strong> <?php echo $count_bills_affected_52; ?></li>
-            <li><strong>Total Bills:</strong> <?php echo $count_total_bills_52; ?></li>
-            <li><strong>Ratio of urgent bills:</strong> <?php echo $ratio_urgent_52; ?>%</li>
+            <li><strong>Total Days Sat:</strong> <?php echo $stats[52]['days_sat']; ?></li>
+            <li><strong>Total Days in Urgency:</strong> <?php echo $stats[52]['days_urgent']; ?></li>
+            <li><strong>Percentage of Days in Urgency:</strong> <?php echo $stats[52]['percent_urgent']; ?>%</li>
+            <li><strong>Total Bills Urgent:</strong> <?php echo $stats[52]['bills_urgent']; ?></li>
+            <li><strong>Total Bills:</strong> <?php echo $stats[52]['total_bills']; ?></li>
+            <li><strong>Ratio of urgent bills:</strong> <?php echo $stats[52]['percent_bills_urgent']; ?>%</li>
             <li class="party-icon"><i><img src="https://upload.wikimedia.org/wikipedia/commons/thumb/4/49/New_Zealand_Labour_Party_logo_%28January_2016%E2%80%93present%29.svg/120px-New_Zealand_Labour_Party_logo_%28January_2016%E2%80%93present%29.svg.png" alt="labour-logo"> <img src="https://upload.wikimedia.org/wikipedia/commons/thumb/0/09/New_Zealand_First_logo_2017.svg/120px-New_Zealand_First_logo_2017.svg.png" alt="first-logo"><img src="https://upload.wikimedia.org/wikipedia/commons/thumb/d/d3/Green_Party_of_Aotearoa_New_Zealand_logo.svg/120px-Green_Party_of_Aotearoa_New_Zealand_logo.svg.png" alt="Greens Logo"></i></li>
         </ul>
         </article>
         <article class="stats-card">
             <h3 class="stats-card__title">51st Parliament of New Zealand (2014 -> 2017)</h3>
         <ul>
-            <li><strong>Total Days Sat:</strong> <?php echo $num_days_sat_51; ?></li>
-            <li><strong>Total Days in Urgency:</strong> <?php echo $num_days_urgency_51; ?></li>
-            <li><strong>Percentage of Days in Urgency:</strong> <?php echo $percent_urgency_51; ?>%</li>
-            <li><strong>Total Bills Urgent:</strong> <?php echo $count_bills_affected_51; ?></li>
-            <li><strong>Total Bills:</strong> <?php echo $count_total_bills_51; ?></li>
-            <li><strong>Ratio of urgent bills:</strong> <?php echo $ratio_urgent_51; ?>%</li>
+            <li><strong>Total Days Sat:</strong> <?php echo $stats[51]['days_sat']; ?></li>
+            <li><strong>Total Days in Urgency:</strong> <?php echo $stats[51]['days_urgent']; ?></li>
+            <li><strong>Percentage of Days in Urgency:</strong> <?php echo $stats[51]['percent_urgent']; ?>%</li>
+            <li><strong>Total Bills Urgent:</strong> <?php echo $stats[51]['bills_urgent']; ?></li>
+            <li><strong>Total Bills:</strong> <?php echo $stats[51]['total_bills']; ?></li>
+            <li><strong>Ratio of urgent bills:</strong> <?php echo $stats[51]['percent_bills_urgent']; ?>%</li>
             <li class="party-icon"><i><img src="https://upload.wikimedia.org/wikipedia/commons/thumb/8/85/New_Zealand_National_Party_logo_%282017%E2%80%93present%29.svg/120px-New_Zealand_National_Party_logo_%282017%E2%80%93present%29.svg.png" alt="New Zealand National Party Logo"> <img src="https://upload.wikimedia.org/wikipedia/commons/thumb/0/01/Logo_of_the_ACT_New_Zealand.svg/120px-Logo_of_the_ACT_New_Zealand.svg.png" alt="New Zealand ACT Party Logo"> <img src="https://upload.wikimedia.org/wikipedia/en/thumb/e/e8/Te_P%C4%81ti_M%C4%81ori_logo.svg/250px-Te_P%C4%81ti_M%C4%81ori_logo.svg.png" alt="New Zealand Maori Party Logo"></i></li>
         </ul>
         </article>
         <article class="stats-card">
             <h3 class="stats-card__title">50th Parliament of New Zealand (2011 -> 2014)</h3>
         <ul>
-            <li><strong>Total Days Sat:</strong> <?php echo $num_days_sat_50; ?></li>
-            <li><strong>Total Days in Urgency:</strong> <?php echo $num_days_urgency_50; ?></li>
-            <li><strong>Percentage of Days in Urgency:</strong> <?php echo $percent_urgency_50; ?>%</li>
-            <li><strong>Total Bills Urgent:</strong> <?php echo $count_bills_affected_50; ?></li>
-            <li><strong>Total Bills:</strong> <?php echo $count_total_bills_50; ?></li>
-            <li><strong>Ratio of urgent bills:</strong> <?php echo $ratio_urgent_50; ?>%</li>
+            <li><strong>Total Days Sat:</strong> <?php echo $stats[50]['days_sat']; ?></li>
+            <li><strong>Total Days in Urgency:</strong> <?php echo $stats[50]['days_urgent']; ?></li>
+            <li><strong>Percentage of Days in Urgency:</strong> <?php echo $stats[50]['percent_urgent']; ?>%</li>
+            <li><strong>Total Bills Urgent:</strong> <?php echo $stats[50]['bills_urgent']; ?></li>
+            <li><strong>Total Bills:</strong> <?php echo $stats[50]['total_bills']; ?></li>
+            <li><strong>Ratio of urgent bills:</strong> <?php echo $stats[50]['percent_bills_urgent']; ?>%</li>
             <li class="party-icon"><i><img src="https://upload.wikimedia.org/wikipedia/commons/thumb/8/85/New_Zealand_National_Party_logo_%282017%E2%80%93present%29.svg/120px-New_Zealand_National_Party_logo_%282017%E2%80%93present%29.svg.png" alt="New Zealand National Party Logo"> <img src="https://upload.wikimedia.org/wikipedia/commons/thumb/0/01/Logo_of_the_ACT_New_Zealand.svg/120px-Logo_of_the_ACT_New_Zealand.svg.png" alt="New Zealand ACT Party Logo"> <img src="https://upload.wikimedia.org/wikipedia/en/thumb/e/e8/Te_P%C4%81ti_M%C4%81ori_logo.svg/250px-Te_P%C4%81ti_M%C4%81ori_logo.svg.png" alt="New Zealand Maori Party Logo"></i></li>
         </ul>
         </article>
         <article class="stats-card">
             <h3 class="stats-card__title">49th Parliament of New Zealand (2008 -> 2011)</h3>
         <ul>
-            <li><strong>Total Days Sat:</strong> <?php echo $num_days_sat_49; ?></li>
-            <li><strong>Total Days in Urgency:</strong> <?php echo $num_days_urgency_49; ?></li>
-            <li><strong>Percentage of Days in Urgency:</strong> <?php echo $percent_urgency_49; ?>%</li>
-            <li><strong>Total Bills Urgent:</strong> <?php echo $count_bills_affected_49; ?></li>
-            <li><strong>Total Bills:</strong> <?php echo $count_total_bills_49; ?></li>
-            <li><strong>Ratio of urgent bills:</strong> <?php echo $ratio_urgent_49; ?>%</li>
+            <li><strong>Total Days Sat:</strong> <?php echo $stats[49]['days_sat']; ?></li>
+            <li><strong>Total Days in Urgency:</strong> <?php echo $stats[49]['days_urgent']; ?></li>
+            <li><strong>Percentage of Days in Urgency:</strong> <?php echo $stats[49]['percent_urgent']; ?>%</li>
+            <li><strong>Total Bills Urgent:</strong> <?php echo $stats[49]['bills_urgent']; ?></li>
+            <li><strong>Total Bills:</strong> <?php echo $stats[49]['total_bills']; ?></li>
+            <li><strong>Ratio of urgent bills:</strong> <?php echo $stats[49]['percent_bills_urgent']; ?>%</li>
             <li class="party-icon"><i><img src="https://upload.wikimedia.org/wikipedia/commons/thumb/8/85/New_Zealand_National_Party_logo_%282017%E2%80%93present%29.svg/120px-New_Zealand_National_Party_logo_%282017%E2%80%93present%29.svg.png" alt="New Zealand National Party Logo"> <img src="https://upload.wikimedia.org/wikipedia/commons/thumb/0/01/Logo_of_the_ACT_New_Zealand.svg/120px-Logo_of_the_ACT_New_Zealand.svg.png" alt="New Zealand ACT Party Logo"> <img src="https://upload.wikimedia.org/wikipedia/en/thumb/e/e8/Te_P%C4%81ti_M%C4%81ori_logo.svg/250px-Te_P%C4%81ti_M%C4%81ori_logo.svg.png" alt="New Zealand Maori Party Logo"></i></li>
         </ul>
         </article>
         <article class="stats-card">
             <h3 class="stats-card__title">48th Parliament of New Zealand (2005 -> 2008)</h3>
         <ul>
-            <li><strong>Total Days Sat:</strong> <?php echo $num_days_sat_48; ?></li>
-            <li><strong>Total Days in Urgency:</strong> <?php echo $num_days_urgency_48; ?></li>
-            <li><strong>Percentage of Days in Urgency:</strong> <?php echo $percent_urgency_48; ?>%</li>
-            <li><strong>Total Bills Urgent:</strong> <?php echo $count_bills_affected_48; ?></li>
-            <li><strong>Total Bills:</strong> <?php echo $count_total_bills_48; ?></li>
-            <li><strong>Ratio of urgent bills:</strong> <?php echo $ratio_urgent_48; ?>%</li>
+            <li><strong>Total Days Sat:</strong> <?php echo $stats[48]['days_sat']; ?></li>
+            <li><strong>Total Days in Urgency:</strong> <?php echo $stats[48]['days_urgent']; ?></li>
+            <li><strong>Percentage of Days in Urgency:</strong> <?php echo $stats[48]['percent_urgent']; ?>%</li>
+            <li><strong>Total Bills Urgent:</strong> <?php echo $stats[48]['bills_urgent']; ?></li>
+            <li><strong>Total Bills:</strong> <?php echo $stats[48]['total_bills']; ?></li>
+            <li><strong>Ratio of urgent bills:</strong> <?php echo $stats[48]['percent_bills_urgent']; ?>%</li>
             <li class="party-icon"><i><img src="https://upload.wikimedia.org/wikipedia/commons/thumb/1/10/New_Zealand_Labour_Party_logo_%282001%E2%80%93early_2011%29.svg/120px-New_Zealand_Labour_Party_logo_%282001%E2%80%93early_2011%29.svg.png" alt="New Zealand Labour Party Logo"> <img src="https://upload.wikimedia.org/wikipedia/commons/thumb/5/51/Logo_New_Zealand_First.svg/960px-Logo_New_Zealand_First.svg.png?_=20161109214512" alt="NZ First Logo"> <img src="https://upload.wikimedia.org/wikipedia/commons/thumb/c/c1/United_New_Zealand_logo.svg/120px-United_New_Zealand_logo.svg.png" alt="United Future Logo"> <img src="https://upload.wikimedia.org/wikipedia/en/d/df/NewZealandProgressivePartyLogo.png" alt="Progressive Logo"></i></li>
         </ul>
         </article>
@@ -245,12 +209,12 @@ $PAGE_UPDATED = "April 8th 2026";
       labels: ['Parliament 48 (2005-2008)', 'Parliament 49 (2008 - 2011)', 'Parliament 50 (2011 - 2014)', 'Parliament 51 (2014 - 2017)', 'Parliament 52 (2017 - 2020)', 'Parliament 53 (2020 - 2023)', 'Parliament 54 (2023 - Present)'],
       datasets: [{
         label: 'Percentage of Bills Passed Under Urgency',
-        data: [<?php echo $ratio_urgent_48; ?>, <?php echo $ratio_urgent_49; ?>, <?php echo $ratio_urgent_50; ?>, <?php echo $ratio_urgent_51; ?>, <?php echo $ratio_urgent_52; ?>, <?php echo $ratio_urgent_53; ?>, <?php echo $ratio_urgent_54; ?>],
+        data: [<?php echo $stats[48]['percent_bills_urgent']; ?>, <?php echo $stats[49]['percent_bills_urgent']; ?>, <?php echo $stats[50]['percent_bills_urgent']; ?>, <?php echo $stats[51]['percent_bills_urgent']; ?>, <?php echo $stats[52]['percent_bills_urgent']; ?>, <?php echo $stats[53]['percent_bills_urgent']; ?>, <?php echo $stats[54]['percent_bills_urgent']; ?>],
         borderWidth: 1
       },
     {
         label: 'Percentage of Urgent Sitting Days',
-        data: [<?php echo $percent_urgency_48; ?>, <?php echo $percent_urgency_49; ?>, <?php echo $percent_urgency_50; ?>, <?php echo $percent_urgency_51; ?>, <?php echo $percent_urgency_52; ?>, <?php echo $percent_urgency_53; ?>, <?php echo $percent_urgency_54; ?>],
+        data: [<?php echo $stats[48]['percent_urgent']; ?>, <?php echo $stats[49]['percent_urgent']; ?>, <?php echo $stats[50]['percent_urgent']; ?>, <?php echo $stats[51]['percent_urgent']; ?>, <?php echo $stats[52]['percent_urgent']; ?>, <?php echo $stats[53]['percent_urgent']; ?>, <?php echo $stats[54]['percent_urgent']; ?>],
         borderWidth: 1
       }
     ]
@@ -3,19 +3,21 @@
 
 // Load data from urgency.sqlite3
 $db = new SQLite3('urgency.sqlite3');
+$db->busyTimeout(5000);
+// Headline figures, written by backend/statsbuilder.py
+$stats = $db->querySingle('SELECT * FROM stats WHERE pnum = 54', true) ?: [];
 // Days Sat Info
-$num_days_sat = $db->querySingle('SELECT COUNT(id) FROM urgency');
-$num_days_urgency = $db->querySingle('SELECT COUNT(id) FROM urgency WHERE in_urgency = 1');
-$percent_urgency = $num_days_sat > 0 ? round(($num_days_urgency / $num_days_sat) * 100, 2) : 0;
-$last_day_urgent = $db->querySingle('SELECT date FROM urgency WHERE in_urgency = 1 ORDER BY date DESC LIMIT 1');
+$num_days_sat = $stats['days_sat'] ?? 0;
+$num_days_urgency = $stats['days_urgent'] ?? 0;
+$percent_urgency = $stats['percent_urgent'] ?? 0;
+$last_day_urgent = $stats['last_urgent_day'] ?? null;
 $last_day_urgent_readable = $last_day_urgent ? (new DateTime($last_day_urgent))->format('d M Y') : 'N/A';
 $days_since_urgency = $last_day_urgent ? (new DateTime())->diff(new DateTime($last_day_urgent))->days : 'N/A';
 // Bills Info
-$count_bills_urgent = $db->querySingle('SELECT COUNT(id) FROM bills');
-$billcounter = file_get_contents('billcounter.txt');
-$count_bills_all = (int)explode(',', $billcounter)[0];
-$billcounter_date = explode(',', $billcounter)[1];
-$percent_bills_urgent = $count_bills_all > 0 ? round(($count_bills_urgent / $count_bills_all) * 100, 2) : 0;
+$count_bills_urgent = $stats['bills_urgent'] ?? 0;
+$count_bills_all = (int)($stats['total_bills'] ?? 0);
+$billcounter_date = $stats['total_bills_as_of'] ?? 'N/A';
+$percent_bills_urgent = $stats['percent_bills_urgent'] ?? 0;
 // Last Updated
 $last_updated = file_get_contents('lastupdate.txt');
 ?>